@@ -3,6 +3,7 @@
 import yfinance as yf
 from datetime import datetime
 import numpy as np
+import pandas as pd
 from scipy.stats import norm # pip install scipy
 
 # Definir función que simule el Modelo de Black-Scholes-Merton
@@ -26,6 +27,74 @@ def calcular_opcion_bsm(S: float, K: float, T: float, r: float, sigma: float, q:
         
     return precio
 
+def regresion_paridad(cadena, ventana=0.4, iteraciones=3, umbral=4.0, dias_minimos=30, min_strikes=20,
+                      tasa_maxima=0.20, tasa_respaldo=0.05):
+
+    """
+    Regresión de C - P contra K para cada vencimiento de la cadena (columnas Expiration, T, strike, Type, bid y
+    ask). Usa los strikes entre (1 - ventana)·F y F, donde el put americano está fuera del dinero y su prima de
+    ejercicio anticipado es despreciable, y descarta los residuos atípicos en cada iteración. Devuelve, por
+    vencimiento, el factor de descuento y el forward implícitos (vacía si no hay pares call-put cotizados).
+
+    La pendiente sólo es fiable con suficiente plazo y strikes: en los vencimientos cortos DF ≈ 1 y el error del
+    precio puede dar DF > 1 (tasas negativas). Los vencimientos con menos de 'dias_minimos', menos de
+    'min_strikes', DF fuera de (0, 1] o |r| > 'tasa_maxima' toman la tasa interpolada de los fiables ('tasa_respaldo'
+    si no hay ninguno), y su forward se recalcula con ese descuento como la mediana de K + (C - P)/DF.
+    """
+
+    # Alinear calls y puts con cotización en ambas puntas
+    cotizados = cadena[(cadena["bid"] > 0) & (cadena["ask"] > cadena["bid"])].copy()
+    cotizados["mid"] = (cotizados["bid"] + cotizados["ask"]) / 2
+    pares = cotizados.pivot_table(values="mid", index=["Expiration", "strike"], columns="Type")
+    pares = pares.reindex(columns=["call", "put"]).dropna().reset_index()
+    if pares.empty:
+        return pd.DataFrame(columns=["T", "Descuento", "Forward", "Strikes", "Fiable"])
+    pares["T"] = pares["Expiration"].map(cadena.groupby("Expiration")["T"].first())
+    pares["y"] = pares["call"] - pares["put"]
+
+    # Forward inicial (DF ≈ 1) para ubicar la ventana de strikes
+    forward = pares.groupby("Expiration").apply(lambda x: np.median(x["strike"] + x["y"]), include_groups=False)
+    usar = np.ones(len(pares), dtype=bool)
+
+    for _ in range(iteraciones):
+        moneyness = (pares["strike"] / pares["Expiration"].map(forward)).values
+        usar &= (moneyness > 1 - ventana) & (moneyness <= 1)
+
+        # Mínimos cuadrados por vencimiento con sumas por grupo (todos los vencimientos a la vez)
+        w = usar.astype(float)
+        sumas = pd.DataFrame({"Expiration": pares["Expiration"], "w": w, "wx": w * pares["strike"], "wy": w * pares["y"],
+                              "wxx": w * pares["strike"] ** 2, "wxy": w * pares["strike"] * pares["y"]}
+                             ).groupby("Expiration").sum()
+        media_x = sumas["wx"] / sumas["w"]
+        media_y = sumas["wy"] / sumas["w"]
+        pendiente = (sumas["wxy"] / sumas["w"] - media_x * media_y) / (sumas["wxx"] / sumas["w"] - media_x ** 2)
+        ordenada = media_y - pendiente * media_x
+        forward = -ordenada / pendiente
+
+        # Descartar residuos atípicos (más de 'umbral' desviaciones absolutas medianas)
+        residuo = pares["y"] - pares["Expiration"].map(ordenada) - pares["Expiration"].map(pendiente) * pares["strike"]
+        escala = residuo.where(usar).abs().groupby(pares["Expiration"]).transform("median") * 1.4826
+        usar &= (residuo.abs() <= umbral * np.maximum(escala, 1e-4)).values
+
+    # Marcar los vencimientos con una pendiente fiable
+    curva = pd.DataFrame({"T": pares.groupby("Expiration")["T"].first(), "Descuento": -pendiente,
+                          "Forward": forward, "Strikes": sumas["w"].astype(int)})
+    tasa = -np.log(curva["Descuento"].where(curva["Descuento"] > 0)) / curva["T"]
+    curva["Fiable"] = ((curva["T"] >= dias_minimos / 365) & (curva["Strikes"] >= min_strikes) &
+                       (curva["Descuento"] <= 1) & (tasa.abs() <= tasa_maxima))
+
+    # Sustituir la tasa de los no fiables (interpolada en T, constante fuera del rango) y recalcular su forward
+    fiables = curva[curva["Fiable"]].sort_values("T")
+    if len(fiables):
+        tasa_sustituta = np.interp(curva["T"], fiables["T"], tasa[fiables.index])
+    else:
+        tasa_sustituta = np.full(len(curva), tasa_respaldo)
+    curva["Descuento"] = np.where(curva["Fiable"], curva["Descuento"], np.exp(-tasa_sustituta * curva["T"]))
+    forward_fijo = (pares["strike"] + pares["y"] / pares["Expiration"].map(curva["Descuento"])).where(usar)
+    curva["Forward"] = curva["Forward"].where(curva["Fiable"], forward_fijo.groupby(pares["Expiration"]).median())
+
+    return curva
+
 # Parámetros
 S = 100
 K = 100
@@ -69,7 +138,7 @@ try:
     # Calcular el tiempo restante hasta el vencimiento
     fecha_hoy = datetime.now()
     fecha_vencimiento = datetime.strptime(fecha_objetivo, "%Y-%m-%d")
-    T_real = ((fecha_vencimiento - fecha_hoy).days) / 365
+    T_real = ((fecha_vencimiento.date() - fecha_hoy.date()).days + 1) / 365
     
     # Obtener Volatilidades Implícitas (Volatilidad Esperada en el Futuro)
     call_volatility = call_seleccionado["impliedVolatility"].iloc[0]
@@ -78,8 +147,18 @@ try:
     # Suponer que no hay dividendos (Tesla no paga dividendos)
     q = 0.0
     
-    # Tasa libre de riesgo (bonos 3 meses)
-    r = yf.Ticker(ticker="^IRX").history(period="1d")["Close"].iloc[-1] / 100
+    # Tasa libre de riesgo implícita en la paridad put-call de la misma cadena (C - P = DF·F - DF·K), sin
+    # descargar "^IRX": la pendiente de C - P contra K es -DF (ver "08 - Forward, Tasa y Dividendo Implícitos").
+    # Si el vencimiento es corto o tiene pocos strikes, la pendiente no es fiable y se usa la tasa fija; si no
+    # quedan pares call-put con cotización, la curva sale vacía y también se usa la tasa fija
+    cadena = pd.concat([calls.assign(Type="call"), puts.assign(Type="put")]).assign(Expiration=fecha_objetivo, T=T_real)
+    curva = regresion_paridad(cadena, tasa_respaldo=r)
+    if curva.empty:
+        origen = "Fija (sin pares call-put para la paridad)"
+    else:
+        r = -np.log(curva["Descuento"].iloc[0]) / T_real
+        origen = "Paridad Put-Call" if curva["Fiable"].iloc[0] else "Fija (pendiente de la paridad no fiable)"
+    print(f"Tasa Libre de Riesgo: {r:.4f} | Origen: {origen}")
     
     # Calcular la Prima
     prima_call = calcular_opcion_bsm(S=precio_actual, K=call_seleccionado["strike"].iloc[0], T=T_real, 
@@ -98,7 +177,7 @@ try:
     print(f"Prima Calculada con el Modelo de BSM (put) para {ticker}: {prima_put:.4f}")
     print(f"Precio Real de la Prima (Put): {put_seleccionado['lastPrice'].iloc[0]:.4f}\n")
     
-except:
+except IndexError:
     print("No hay un contrato disponible con el mismo strike para los puts...")
 
 # Recordatorio:
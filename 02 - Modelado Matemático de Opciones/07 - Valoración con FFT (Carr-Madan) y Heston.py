@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+from scipy.optimize import least_squares
+from scipy.interpolate import CubicSpline
+import time
+
+# =====================================
+#  Funciones Características (ln S_T)
+# =====================================
+
+# El método de Carr-Madan no necesita una fórmula cerrada para el precio, sólo la función característica
+# del logaritmo del precio al vencimiento: φ(u) = E[exp(i·u·ln S_T)]. Cambiar de modelo es cambiar de función.
+
+def funcion_caracteristica_bsm(u, S, T, r, q, sigma):
+
+    """
+    Función característica de ln(S_T) bajo el Modelo de Black-Scholes-Merton.
+    """
+
+    # ln(S_T) ~ Normal(ln S + (r - q - σ²/2)·T, σ²·T)
+    media = np.log(S) + (r - q - 0.5 * sigma ** 2) * T
+
+    return np.exp(1j * u * media - 0.5 * sigma ** 2 * T * u ** 2)
+
+def funcion_caracteristica_heston(u, S, T, r, q, v0, kappa, theta, sigma_v, rho):
+
+    """
+    Función característica de ln(S_T) bajo el Modelo de Volatilidad Estocástica de Heston (formulación
+    "little trap" de Albrecher et al., estable para vencimientos largos).
+    """
+
+    # Términos auxiliares
+    iu = 1j * u
+    beta = kappa - rho * sigma_v * iu
+    d = np.sqrt(beta ** 2 + sigma_v ** 2 * (iu + u ** 2))
+    g = (beta - d) / (beta + d)
+    exp_dT = np.exp(-d * T)
+
+    # Componentes C(u, T) y D(u, T)
+    C = (r - q) * iu * T + kappa * theta / sigma_v ** 2 * ((beta - d) * T - 2 * np.log((1 - g * exp_dT) / (1 - g)))
+    D = (beta - d) / sigma_v ** 2 * (1 - exp_dT) / (1 - g * exp_dT)
+
+    return np.exp(C + D * v0 + iu * np.log(S))
+
+# ===========================
+#  Transformada Carr-Madan
+# ===========================
+
+def precios_call_fft(funcion_caracteristica, S, T, r, N=4096, eta=0.25, alpha=1.5):
+
+    """
+    Calcula con una sola FFT el precio de calls europeas para una malla de N strikes (espaciada en log-strike)
+    centrada en el precio actual. Devuelve la malla de strikes y los precios.
+    """
+
+    # Malla de integración (v) y de log-strikes (k), ligadas por eta·lambda = 2π/N
+    j = np.arange(N)
+    v = eta * j
+    lambda_ = 2 * np.pi / (N * eta)
+    k0 = np.log(S) - 0.5 * N * lambda_
+    k = k0 + lambda_ * j
+
+    # Transformada del precio amortiguado por exp(α·k)
+    psi = np.exp(-r * T) * funcion_caracteristica(v - (alpha + 1) * 1j) / \
+        (alpha ** 2 + alpha - v ** 2 + 1j * (2 * alpha + 1) * v)
+
+    # Pesos de la Regla de Simpson
+    pesos = (3 + (-1) ** (j + 1)) / 3
+    pesos[0] = 1 / 3
+
+    # Una sola FFT para toda la malla de strikes
+    x = np.exp(-1j * v * k0) * psi * eta * pesos
+    precios = np.exp(-alpha * k) / np.pi * np.real(np.fft.fft(x))
+
+    return np.exp(k), precios
+
+def valorar_cadena_fft(funcion_caracteristica, strikes, S, T, r, q=0, tipo="call", **kwargs):
+
+    """
+    Valora todos los strikes de un vencimiento con una sola FFT, interpolando (spline cúbico) sobre la malla de
+    log-strikes. Los puts se obtienen mediante la paridad put-call.
+    """
+
+    # Evaluar la malla completa
+    strikes = np.asarray(strikes, dtype=float)
+    malla_K, malla_precios = precios_call_fft(funcion_caracteristica, S, T, r, **kwargs)
+    log_malla, log_strikes = np.log(malla_K), np.log(strikes)
+
+    # Interpolar sólo en el tramo de la malla que cubre los strikes solicitados
+    i_min = max(np.searchsorted(log_malla, log_strikes.min()) - 3, 0)
+    i_max = min(np.searchsorted(log_malla, log_strikes.max()) + 3, len(log_malla))
+    calls = CubicSpline(log_malla[i_min:i_max], malla_precios[i_min:i_max])(log_strikes)
+
+    if tipo == "call":
+        return calls
+    elif tipo == "put":
+        return calls - S * np.exp(-q * T) + strikes * np.exp(-r * T)
+    else:
+        raise ValueError("Tipo de Opción no válido. Usar 'call' o 'put'.")
+
+# Función BSM (Fórmula Cerrada) para validar la FFT
+def calcular_opcion_bsm(S, K, T, r, sigma, q=0, tipo="call"):
+
+    """
+    Calcula el precio teórico de una opción europea usando el modelo de BSM.
+    """
+
+    # Obtener d1 y d2
+    d1 = (np.log(S / K) + (r - q + 0.5 * sigma ** 2) * T) / (sigma * np.sqrt(T))
+    d2 = d1 - sigma * np.sqrt(T)
+
+    # Calcular la Prima
+    if tipo == "call":
+        return S * np.exp(-q * T) * norm.cdf(d1) - K * np.exp(-r * T) * norm.cdf(d2)
+    else:
+        return K * np.exp(-r * T) * norm.cdf(-d2) - S * np.exp(-q * T) * norm.cdf(-d1)
+
+# Validar contra la fórmula cerrada (200 strikes con una sola FFT)
+S = 100
+T = 0.5
+r = 0.05
+q = 0.02
+sigma = 0.20
+strikes = np.linspace(60, 140, 200)
+
+phi_bsm = lambda u: funcion_caracteristica_bsm(u, S, T, r, q, sigma)
+inicio = time.perf_counter()
+calls_fft = valorar_cadena_fft(phi_bsm, strikes, S, T, r, q, tipo="call")
+tiempo_fft = time.perf_counter() - inicio
+calls_bsm = calcular_opcion_bsm(S, strikes, T, r, sigma, q, tipo="call")
+print(f"Error Máximo FFT vs BSM (200 strikes): {np.abs(calls_fft - calls_bsm).max():.2e}")
+print(f"Tiempo de la FFT: {tiempo_fft * 1000:.2f} ms")
+
+# Precios bajo Heston (la sonrisa aparece sin cambiar el pricer)
+params_heston = dict(v0=0.04, kappa=2.0, theta=0.04, sigma_v=0.5, rho=-0.7)
+phi_heston = lambda u: funcion_caracteristica_heston(u, S, T, r, q, **params_heston)
+calls_heston = valorar_cadena_fft(phi_heston, strikes, S, T, r, q, tipo="call")
+puts_heston = valorar_cadena_fft(phi_heston, strikes, S, T, r, q, tipo="put")
+print(f"Heston -> Call ATM: {np.interp(100, strikes, calls_heston):.4f} | Put ATM: {np.interp(100, strikes, puts_heston):.4f}")
+
+# ====================================================
+#  Calibración de Heston a la Cadena de datos/opciones
+# ====================================================
+
+# Leer Datos de Opciones (la fecha de valoración es la del último trade registrado)
+opciones_mercado = pd.read_csv("../datos/opciones.csv")
+fecha_datos = pd.to_datetime(opciones_mercado["lastTradeDate"]).max().tz_localize(None).normalize()
+opciones_mercado["T"] = ((pd.to_datetime(opciones_mercado["Expiration"]) - fecha_datos).dt.days + 1) / 365
+opciones_mercado["mid"] = (opciones_mercado["bid"] + opciones_mercado["ask"]) / 2
+opciones_mercado = opciones_mercado[opciones_mercado["bid"] > 0]
+tasa_libre_riesgo = 0.05
+
+def forward_paridad(cadena, T, r):
+
+    """
+    Estima el precio forward de un vencimiento con la paridad put-call: mediana de K + exp(rT)·(C - P) sobre
+    los strikes cotizados en ambas puntas (robusta a cotizaciones erróneas en las alas).
+    """
+
+    # Alinear calls y puts por strike
+    pares = cadena.pivot_table(values="mid", index="strike", columns="Type").dropna()
+
+    return np.median(pares.index + np.exp(r * T) * (pares["call"] - pares["put"]))
+
+# Seleccionar vencimientos entre 1 y 12 meses, quedándonos con las opciones OTM (más líquidas)
+vencimientos = sorted(opciones_mercado.loc[opciones_mercado["T"].between(1/12, 1), "Expiration"].unique())[::3]
+datos_calibracion = []
+for vencimiento in vencimientos:
+    cadena = opciones_mercado[opciones_mercado["Expiration"] == vencimiento]
+    T_venc = cadena["T"].iloc[0]
+    F = forward_paridad(cadena, T_venc, tasa_libre_riesgo)
+    otm = cadena[((cadena["Type"] == "call") & (cadena["strike"] >= F)) | ((cadena["Type"] == "put") & (cadena["strike"] < F))]
+    otm = otm[otm["strike"].between(0.8 * F, 1.2 * F)]
+    datos_calibracion.append((T_venc, F, otm["strike"].values, otm["Type"].values, otm["mid"].values))
+
+def residuos_heston(parametros):
+
+    """
+    Errores de valoración (relativos al precio de mercado) de Heston: una FFT por vencimiento.
+    """
+
+    v0, kappa, theta, sigma_v, rho = parametros
+    residuos = []
+    for T_venc, F, K, tipos, precios in datos_calibracion:
+        # Trabajar con S = F·exp(-rT) y q = 0 para respetar el forward observado
+        S_eff = F * np.exp(-tasa_libre_riesgo * T_venc)
+        phi = lambda u: funcion_caracteristica_heston(u, S_eff, T_venc, tasa_libre_riesgo, 0, v0, kappa, theta, sigma_v, rho)
+        calls = valorar_cadena_fft(phi, K, S_eff, T_venc, tasa_libre_riesgo, tipo="call")
+        modelo = np.where(tipos == "call", calls, calls - S_eff + K * np.exp(-tasa_libre_riesgo * T_venc))
+        residuos.append((modelo - precios) / np.maximum(precios, 0.05))
+
+    return np.concatenate(residuos)
+
+# Calibrar (v0, kappa, theta, sigma_v, rho)
+inicio = time.perf_counter()
+resultado = least_squares(residuos_heston, x0=[0.03, 2.0, 0.04, 0.5, -0.7],
+                          bounds=([1e-4, 0.05, 1e-4, 0.05, -0.99], [1.0, 15.0, 1.0, 3.0, 0.99]))
+tiempo_calibracion = time.perf_counter() - inicio
+
+total_contratos = sum(len(d[2]) for d in datos_calibracion)
+print(f"\nCalibración de Heston: {total_contratos} contratos en {len(vencimientos)} vencimientos")
+print(pd.Series(resultado.x, index=["v0", "kappa", "theta", "sigma_v", "rho"]).round(4))
+print(f"Error Relativo RMS: {np.sqrt(np.mean(resultado.fun ** 2)) * 100:.2f}%")
+print(f"Tiempo de Calibración: {tiempo_calibracion:.2f} segundos ({resultado.nfev} evaluaciones)")
+
+# Recordatorio:
+#   - El Método de Carr-Madan valora toda la malla de strikes de un vencimiento con una sola Transformada Rápida de
+#     Fourier (costo O(N log N)), por lo que basta con conocer la función característica del modelo.
+#   - El Modelo de Heston permite que la volatilidad sea estocástica y correlacionada con el precio (rho < 0), lo que
+#     genera el sesgo de volatilidad observado en el mercado y que el Modelo BSM con volatilidad constante no captura.
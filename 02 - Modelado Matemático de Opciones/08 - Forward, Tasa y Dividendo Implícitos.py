@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+import time
+
+# Los scripts anteriores usan r = 0.05 y q = 0 fijos, o descargan "^IRX" en cada ejecución. La paridad put-call
+# europea dice que, para todos los strikes de un mismo vencimiento:
+#
+#   C - P = DF·F - DF·K        (DF = exp(-rT) es el factor de descuento y F = S·exp((r - q)T) el forward)
+#
+# Por lo tanto, una regresión de C - P contra K da -DF como pendiente y DF·F como ordenada al origen. De ellos se
+# obtienen r = -ln(DF)/T y q = r - ln(F/S)/T. La regresión se hace para todos los vencimientos a la vez.
+
+def regresion_paridad(cadena, ventana=0.4, iteraciones=3, umbral=4.0, dias_minimos=30, min_strikes=20,
+                      tasa_maxima=0.20, tasa_respaldo=0.05):
+
+    """
+    Regresión de C - P contra K para cada vencimiento de la cadena (columnas Expiration, T, strike, Type, bid y
+    ask). Usa los strikes entre (1 - ventana)·F y F, donde el put americano está fuera del dinero y su prima de
+    ejercicio anticipado es despreciable, y descarta los residuos atípicos en cada iteración. Devuelve, por
+    vencimiento, el factor de descuento y el forward implícitos.
+
+    La pendiente sólo es fiable con suficiente plazo y strikes: en los vencimientos cortos DF ≈ 1 y el error del
+    precio puede dar DF > 1 (tasas negativas). Los vencimientos con menos de 'dias_minimos', menos de
+    'min_strikes', DF fuera de (0, 1] o |r| > 'tasa_maxima' toman la tasa interpolada de los fiables ('tasa_respaldo'
+    si no hay ninguno), y su forward se recalcula con ese descuento como la mediana de K + (C - P)/DF.
+    """
+
+    # Alinear calls y puts con cotización en ambas puntas
+    cotizados = cadena[(cadena["bid"] > 0) & (cadena["ask"] > cadena["bid"])].copy()
+    cotizados["mid"] = (cotizados["bid"] + cotizados["ask"]) / 2
+    pares = cotizados.pivot_table(values="mid", index=["Expiration", "strike"], columns="Type").dropna().reset_index()
+    pares["T"] = pares["Expiration"].map(cadena.groupby("Expiration")["T"].first())
+    pares["y"] = pares["call"] - pares["put"]
+
+    # Forward inicial (DF ≈ 1) para ubicar la ventana de strikes
+    forward = pares.groupby("Expiration").apply(lambda x: np.median(x["strike"] + x["y"]), include_groups=False)
+    usar = np.ones(len(pares), dtype=bool)
+
+    for _ in range(iteraciones):
+        moneyness = (pares["strike"] / pares["Expiration"].map(forward)).values
+        usar &= (moneyness > 1 - ventana) & (moneyness <= 1)
+
+        # Mínimos cuadrados por vencimiento con sumas por grupo (todos los vencimientos a la vez)
+        w = usar.astype(float)
+        sumas = pd.DataFrame({"Expiration": pares["Expiration"], "w": w, "wx": w * pares["strike"], "wy": w * pares["y"],
+                              "wxx": w * pares["strike"] ** 2, "wxy": w * pares["strike"] * pares["y"]}
+                             ).groupby("Expiration").sum()
+        media_x = sumas["wx"] / sumas["w"]
+        media_y = sumas["wy"] / sumas["w"]
+        pendiente = (sumas["wxy"] / sumas["w"] - media_x * media_y) / (sumas["wxx"] / sumas["w"] - media_x ** 2)
+        ordenada = media_y - pendiente * media_x
+        forward = -ordenada / pendiente
+
+        # Descartar residuos atípicos (más de 'umbral' desviaciones absolutas medianas)
+        residuo = pares["y"] - pares["Expiration"].map(ordenada) - pares["Expiration"].map(pendiente) * pares["strike"]
+        escala = residuo.where(usar).abs().groupby(pares["Expiration"]).transform("median") * 1.4826
+        usar &= (residuo.abs() <= umbral * np.maximum(escala, 1e-4)).values
+
+    # Marcar los vencimientos con una pendiente fiable
+    curva = pd.DataFrame({"T": pares.groupby("Expiration")["T"].first(), "Descuento": -pendiente,
+                          "Forward": forward, "Strikes": sumas["w"].astype(int)})
+    tasa = -np.log(curva["Descuento"].where(curva["Descuento"] > 0)) / curva["T"]
+    curva["Fiable"] = ((curva["T"] >= dias_minimos / 365) & (curva["Strikes"] >= min_strikes) &
+                       (curva["Descuento"] <= 1) & (tasa.abs() <= tasa_maxima))
+
+    # Sustituir la tasa de los no fiables (interpolada en T, constante fuera del rango) y recalcular su forward
+    fiables = curva[curva["Fiable"]].sort_values("T")
+    if len(fiables):
+        tasa_sustituta = np.interp(curva["T"], fiables["T"], tasa[fiables.index])
+    else:
+        tasa_sustituta = np.full(len(curva), tasa_respaldo)
+    curva["Descuento"] = np.where(curva["Fiable"], curva["Descuento"], np.exp(-tasa_sustituta * curva["T"]))
+    forward_fijo = (pares["strike"] + pares["y"] / pares["Expiration"].map(curva["Descuento"])).where(usar)
+    curva["Forward"] = curva["Forward"].where(curva["Fiable"], forward_fijo.groupby(pares["Expiration"]).median())
+
+    return curva
+
+def tasa_dividendo_implicitos(curva, spot=None):
+
+    """
+    Convierte el factor de descuento y el forward de cada vencimiento en tasa libre de riesgo y rendimiento por
+    dividendo (continuos). Si no se da el spot, se usa el forward del vencimiento más cercano.
+    """
+
+    curva = curva.sort_values("T").copy()
+    spot = curva["Forward"].iloc[0] if spot is None else spot
+    curva["Tasa"] = -np.log(curva["Descuento"]) / curva["T"]
+    curva["Dividendo"] = curva["Tasa"] - np.log(curva["Forward"] / spot) / curva["T"]
+
+    return curva, spot
+
+# Leer Datos de Opciones (la fecha de valoración es la del último trade registrado)
+opciones_mercado = pd.read_csv("../datos/opciones.csv")
+fecha_datos = pd.to_datetime(opciones_mercado["lastTradeDate"]).max().tz_localize(None).normalize()
+opciones_mercado["T"] = ((pd.to_datetime(opciones_mercado["Expiration"]) - fecha_datos).dt.days + 1) / 365
+
+# Estimar la estructura temporal de forwards, tasas y dividendos de toda la cadena
+inicio = time.perf_counter()
+curva, spot = tasa_dividendo_implicitos(regresion_paridad(opciones_mercado))
+print(f"{len(curva)} vencimientos en {(time.perf_counter() - inicio) * 1000:.1f} ms | Spot Implícito: {spot:.2f}\n")
+print(curva.round(4).to_string())
+
+# Los vencimientos cortos (DF ≈ 1) heredan la tasa de los fiables: resumir sólo los que tienen pendiente propia
+largos = curva[curva["Fiable"]]
+print(f"\nVencimientos con Tasa Propia: {len(largos)} | Con Tasa Interpolada: {(~curva['Fiable']).sum()}")
+print(f"Tasa Implícita Mediana (fiables): {largos['Tasa'].median():.4f}")
+print(f"Dividendo Implícito Mediano (fiables): {largos['Dividendo'].median():.4f}")
+
+# Graficar la estructura temporal
+fig, ax = plt.subplots(1, 2, figsize=(22, 6))
+ax[0].plot(largos["T"] * 365, largos["Tasa"] * 100, marker="o", label="Tasa Implícita")
+ax[0].axhline(5, color="gray", linestyle="--", label="Tasa Fija (5%)")
+ax[0].set_title("Tasa Libre de Riesgo Implícita")
+ax[1].plot(largos["T"] * 365, largos["Dividendo"] * 100, marker="o", color="green", label="Dividendo Implícito")
+ax[1].set_title("Rendimiento por Dividendo Implícito")
+for eje in ax:
+    eje.set_xlabel("Días al Vencimiento")
+    eje.set_ylabel("%")
+    eje.legend()
+    eje.grid()
+plt.show()
+
+# Recordatorio:
+#   - La paridad put-call permite obtener de la misma cadena la tasa y el dividendo que el mercado usa para valorar las
+#     opciones, de modo que todos los modelos reciben entradas consistentes sin descargar datos adicionales.
+#   - Para opciones americanas (como SPY) la paridad sólo se cumple aproximadamente: los puts dentro del dinero incluyen prima
+#     de ejercicio anticipado, así que la regresión usa sólo los strikes por debajo del forward para no sesgar el descuento.
+#   - En los vencimientos de pocos días la pendiente casi no contiene información sobre la tasa (DF ≈ 1), por eso se les
+#     asigna la tasa de los vencimientos más largos en lugar de aceptar tasas negativas o de tres dígitos.
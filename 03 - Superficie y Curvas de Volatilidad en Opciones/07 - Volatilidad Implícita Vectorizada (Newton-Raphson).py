@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+from scipy.optimize import minimize_scalar
+import time
+
+# En "02 - Volatilidad Implícita" se resuelve un contrato a la vez minimizando el error absoluto con
+# minimize_scalar, lo que requiere decenas de evaluaciones de BSM por contrato. Aquí se resuelve toda la cadena
+# a la vez con pasos de Newton-Raphson (usando la Vega como derivada), protegidos por un intervalo de bisección
+# por contrato, y con una máscara de convergencia para que los contratos resueltos dejen de costar trabajo.
+
+# Función BSM vectorizada (devuelve precio y vega con los mismos valores intermedios)
+def precio_y_vega(S, K, T, r, sigma, q=0, es_call=True):
+
+    """
+    Calcula el precio y la Vega de opciones europeas con el Modelo de BSM para arreglos de contratos.
+    """
+
+    # Obtener valores auxiliares
+    raiz_T = np.sqrt(T)
+    d1 = (np.log(S / K) + (r - q + 0.5 * sigma ** 2) * T) / (sigma * raiz_T)
+    d2 = d1 - sigma * raiz_T
+    descuento_S = S * np.exp(-q * T)
+    descuento_K = K * np.exp(-r * T)
+
+    # Calcular la Prima (Calls y Puts en el mismo arreglo)
+    call = descuento_S * norm.cdf(d1) - descuento_K * norm.cdf(d2)
+    put = descuento_K * norm.cdf(-d2) - descuento_S * norm.cdf(-d1)
+    precio = np.where(es_call, call, put)
+    vega = descuento_S * norm.pdf(d1) * raiz_T
+
+    return precio, vega
+
+def volatilidad_implicita_vectorizada(precios, S, K, T, r, q=0, tipo="call", tolerancia=1e-10, max_iter=100,
+                                      sigma_min=1e-4, sigma_max=5.0, sigma_inicial=None):
+
+    """
+    Encuentra la volatilidad implícita de todos los contratos a la vez. 'tipo' puede ser "call", "put" o un
+    arreglo con el tipo de cada contrato. Devuelve NaN en los contratos cuyo precio viola los límites de
+    no arbitraje, que no convergen o cuya volatilidad queda fuera de [sigma_min, sigma_max].
+    """
+
+    # Transmitir todas las entradas a arreglos del mismo tamaño
+    precios, S, K, T, r, q = np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in (precios, S, K, T, r, q)])
+    es_call = np.broadcast_to(np.asarray(tipo) == "call", precios.shape)
+    forma = precios.shape
+    precios, S, K, T, r, q, es_call = [x.ravel() for x in (precios, S, K, T, r, q, es_call)]
+
+    # Límites de no arbitraje: valor intrínseco descontado < precio < cota superior
+    descuento_S = S * np.exp(-q * T)
+    descuento_K = K * np.exp(-r * T)
+    intrinseco = np.where(es_call, np.maximum(descuento_S - descuento_K, 0), np.maximum(descuento_K - descuento_S, 0))
+    cota_superior = np.where(es_call, descuento_S, descuento_K)
+    validos = (precios > intrinseco) & (precios < cota_superior) & (T > 0)
+
+    # Valor Inicial: punto de inflexión de Manaster-Koehler, o Brenner-Subrahmanyam cerca del dinero
+    forward = descuento_S / descuento_K
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inicial = np.maximum(np.sqrt(2 * np.abs(np.log(forward)) / T),
+                             np.sqrt(2 * np.pi / T) * (precios - intrinseco) / descuento_S)
+    if sigma_inicial is not None:
+        inicial = np.broadcast_to(np.asarray(sigma_inicial, dtype=float), precios.shape).copy()
+    sigma = np.clip(np.nan_to_num(inicial, nan=0.2), sigma_min, sigma_max)
+
+    # Intervalo de bisección por contrato
+    bajo = np.full_like(sigma, sigma_min)
+    alto = np.full_like(sigma, sigma_max)
+    convergido = ~validos
+    activos = np.flatnonzero(validos)
+
+    for _ in range(max_iter):
+        if activos.size == 0:
+            break
+
+        # Evaluar sólo los contratos activos
+        precio, vega = precio_y_vega(S[activos], K[activos], T[activos], r[activos], sigma[activos],
+                                     q[activos], es_call[activos])
+        diferencia = precio - precios[activos]
+
+        # Actualizar el intervalo: el precio es creciente en sigma
+        alto[activos] = np.where(diferencia > 0, sigma[activos], alto[activos])
+        bajo[activos] = np.where(diferencia <= 0, sigma[activos], bajo[activos])
+
+        # Paso de Newton; si sale del intervalo (o la Vega es casi cero) usar bisección
+        with np.errstate(all="ignore"):
+            nuevo = sigma[activos] - diferencia / vega
+        fuera = ~((nuevo > bajo[activos]) & (nuevo < alto[activos]))
+        nuevo = np.where(fuera, 0.5 * (bajo[activos] + alto[activos]), nuevo)
+
+        # Marcar los contratos que ya convergieron (en precio o en el tamaño del paso). Si el paso se anula porque el
+        # intervalo colapsó sobre sigma_min o sigma_max sin reproducir el precio, la volatilidad está fuera del rango
+        precio_ok = np.abs(diferencia) < tolerancia * np.maximum(precios[activos], 1)
+        paso_ok = np.abs(nuevo - sigma[activos]) < tolerancia
+        en_limite = (nuevo <= sigma_min + tolerancia) | (nuevo >= sigma_max - tolerancia)
+        listos = precio_ok | paso_ok
+        sigma[activos] = np.where(precio_ok, sigma[activos], nuevo)
+        convergido[activos] = precio_ok | (paso_ok & ~en_limite)
+        activos = activos[~listos]
+
+    # Contratos inválidos o sin convergencia
+    sigma[~validos | ~convergido] = np.nan
+
+    return sigma.reshape(forma)
+
+# Validar: recuperar volatilidades conocidas a partir de precios teóricos
+S = 100
+K = np.array([80, 90, 100, 110, 120])
+T = 0.5
+r = 0.05
+vol_real = np.array([0.35, 0.28, 0.22, 0.19, 0.18])
+precios_teoricos, _ = precio_y_vega(S, K, T, r, vol_real)
+print("Volatilidades Recuperadas:", volatilidad_implicita_vectorizada(precios_teoricos, S, K, T, r).round(10))
+
+# ===========================================
+#  Invertir la cadena completa de opciones
+# ===========================================
+
+# Leer Datos de Opciones (la fecha de valoración es la del último trade registrado)
+opciones_mercado = pd.read_csv("../datos/opciones.csv")
+fecha_datos = pd.to_datetime(opciones_mercado["lastTradeDate"]).max().tz_localize(None).normalize()
+opciones_mercado["T"] = ((pd.to_datetime(opciones_mercado["Expiration"]) - fecha_datos).dt.days + 1) / 365
+opciones_mercado["mid"] = (opciones_mercado["bid"] + opciones_mercado["ask"]) / 2
+tasa_libre_riesgo = 0.05
+
+# Forward por vencimiento con la paridad put-call (S = F·exp(-rT) y q = 0 respetan el forward observado)
+def forward_paridad(cadena, r):
+
+    """
+    Estima el precio forward de un vencimiento con la paridad put-call: mediana de K + exp(rT)·(C - P) sobre
+    los strikes cotizados en ambas puntas (robusta a cotizaciones erróneas en las alas).
+    """
+
+    # Alinear calls y puts por strike
+    pares = cadena[cadena["bid"] > 0].pivot_table(values="mid", index="strike", columns="Type").dropna()
+
+    return np.median(pares.index + np.exp(r * cadena["T"].iloc[0]) * (pares["call"] - pares["put"]))
+
+forwards = opciones_mercado.groupby("Expiration").apply(forward_paridad, r=tasa_libre_riesgo)
+opciones_mercado["S"] = opciones_mercado["Expiration"].map(forwards) * np.exp(-tasa_libre_riesgo * opciones_mercado["T"])
+
+# Invertir toda la cadena (lastPrice, como en el script original) en una sola llamada
+inicio = time.perf_counter()
+opciones_mercado["IV Newton"] = volatilidad_implicita_vectorizada(opciones_mercado["lastPrice"].values,
+                                                                  opciones_mercado["S"].values,
+                                                                  opciones_mercado["strike"].values,
+                                                                  opciones_mercado["T"].values, tasa_libre_riesgo,
+                                                                  tipo=opciones_mercado["Type"].values)
+tiempo_vectorizado = time.perf_counter() - inicio
+print(f"\nContratos: {len(opciones_mercado)} | Resueltos: {opciones_mercado['IV Newton'].notna().sum()}")
+print(f"Tiempo Vectorizado: {tiempo_vectorizado * 1000:.1f} ms")
+
+# Comparar con el método original en una muestra de 200 contratos
+def volatilidad_implicita(precio_opcion_mercado, S, K, T, r, q=0, tipo="call"):
+
+    """
+    Método original: minimiza el error absoluto con minimize_scalar (un contrato a la vez).
+    """
+
+    error = lambda sigma: abs(precio_y_vega(S, K, T, r, sigma, q, tipo == "call")[0] - precio_opcion_mercado)
+    resultado = minimize_scalar(fun=error, bounds=(0.001, 5), method="bounded")
+
+    return resultado.x if resultado.success else np.nan
+
+muestra = opciones_mercado.dropna(subset=["IV Newton"]).sample(200, random_state=1)
+inicio = time.perf_counter()
+iv_original = [volatilidad_implicita(x["lastPrice"], x["S"], x["strike"], x["T"], tasa_libre_riesgo, tipo=x["Type"])
+               for _, x in muestra.iterrows()]
+tiempo_original = (time.perf_counter() - inicio) / len(muestra) * len(opciones_mercado)
+print(f"Tiempo Estimado del Método Original (cadena completa): {tiempo_original:.2f} segundos")
+print(f"Diferencia Mediana vs Método Original: {np.nanmedian(np.abs(muestra['IV Newton'] - iv_original)):.2e}")
+
+# Recordatorio:
+#   - El Método de Newton-Raphson converge cuadráticamente cerca de la raíz porque usa la derivada del precio respecto a
+#     la volatilidad (Vega). El intervalo de bisección lo protege en los contratos con Vega muy pequeña (alas y
+#     vencimientos cortos), donde un paso de Newton puede salir del rango válido.
+#   - Los contratos cuyo precio está fuera de los límites de no arbitraje no tienen volatilidad implícita y se reportan
+#     como NaN en lugar de forzar un valor sin sentido.
@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+from scipy.special import erfcx, ndtri
+import time
+
+# Newton-Raphson sobre el precio converge lento (o falla) en las alas con Vega casi nula y en vencimientos cortos.
+# Siguiendo a Peter Jäckel ("By Implication" y "Let's Be Rational"), el problema se plantea en forma normalizada:
+#
+#   x = ln(F / K),   s = σ·√T,   β = precio / (exp(-rT)·√(F·K))
+#
+# y se resuelve sobre una función objetivo transformada en cada región (logarítmica en las alas), partiendo del valor
+# inicial de "Let's Be Rational" (interpolación racional cúbica en cuatro ramas) y refinando con dos pasos de Householder
+# de tercer orden, todo de forma vectorizada.
+
+# Límites del parámetro de control de la interpolación racional cúbica (Delbourgo-Gregory)
+control_minimo = -(1 - np.sqrt(np.finfo(float).eps))
+control_maximo = 2 / np.finfo(float).eps ** 2
+
+def precio_black_normalizado(x, s):
+
+    """
+    Precio normalizado de un call fuera del dinero (x <= 0): b(x, s) = exp(x/2)·Φ(h+t) - exp(-x/2)·Φ(h-t),
+    con h = x/s y t = s/2. En el ala profunda se usa erfcx para evitar la cancelación numérica.
+    """
+
+    # Valores auxiliares
+    h = x / s
+    t = 0.5 * s
+
+    # Fórmula directa (cerca del dinero) y escalada con erfcx (ala profunda, h + t < 0)
+    with np.errstate(over="ignore", invalid="ignore"):
+        directa = np.exp(0.5 * x) * norm.cdf(h + t) - np.exp(-0.5 * x) * norm.cdf(h - t)
+        escalada = 0.5 * np.exp(-0.5 * (h * h + t * t)) * (erfcx(-(h + t) / np.sqrt(2)) - erfcx(-(h - t) / np.sqrt(2)))
+
+    return np.where(h + t < 0, escalada, directa)
+
+def complemento_black_normalizado(x, s):
+
+    """
+    Distancia a la cota superior, b_max - b(x, s) con b_max = exp(x/2), calculada sin cancelación.
+    """
+
+    h = x / s
+    t = 0.5 * s
+
+    return np.exp(0.5 * x) * norm.cdf(-(h + t)) + np.exp(-0.5 * x) * norm.cdf(h - t)
+
+def vega_black_normalizada(x, s):
+
+    """
+    Derivada de b(x, s) respecto a s.
+    """
+
+    return np.exp(-0.5 * ((x / s) ** 2 + 0.25 * s * s)) / np.sqrt(2 * np.pi)
+
+def cubica_racional(x, x_izq, x_der, y_izq, y_der, d_izq, d_der, r):
+
+    """
+    Interpolación racional cúbica entre (x_izq, y_izq) y (x_der, y_der) con pendientes d_izq y d_der en los extremos
+    y parámetro de control r (r = 3 es la cúbica de Hermite; r grande tiende a la recta).
+    """
+
+    h = x_der - x_izq
+    t = (x - x_izq) / h
+    u = 1 - t
+    with np.errstate(all="ignore"):
+        cubica = (y_der * t ** 3 + (r * y_der - h * d_der) * t * t * u + (r * y_izq + h * d_izq) * t * u * u +
+                  y_izq * u ** 3) / (1 + (r - 3) * t * u)
+
+    return np.where(r < control_maximo, cubica, y_der * t + y_izq * u)
+
+def control_cubica(x_izq, x_der, y_izq, y_der, d_izq, d_der, segunda, lado="izquierdo", conservar_forma=False):
+
+    """
+    Parámetro de control que reproduce la segunda derivada dada en un extremo, acotado por el mínimo que mantiene la
+    monotonía y la convexidad (o concavidad) de los datos.
+    """
+
+    h = x_der - x_izq
+    pendiente = (y_der - y_izq) / h
+    numerador = 0.5 * h * segunda + (d_der - d_izq)
+    denominador = pendiente - d_izq if lado == "izquierdo" else d_der - pendiente
+    with np.errstate(all="ignore"):
+        r = np.where(numerador == 0, 0.0, np.where(denominador == 0, np.where(numerador > 0, control_maximo, control_minimo),
+                                                    numerador / denominador))
+
+        # Mínimo que conserva la forma de los datos
+        monotona = (d_izq * pendiente >= 0) & (d_der * pendiente >= 0)
+        convexa = (d_izq <= pendiente) & (pendiente <= d_der)
+        concava = (d_izq >= pendiente) & (pendiente >= d_der)
+        sin_forma = control_maximo if conservar_forma else -np.inf
+        r1 = np.where(monotona, np.where(pendiente != 0, (d_der + d_izq) / pendiente, sin_forma), -np.inf)
+        degenerada = (pendiente == d_izq) | (pendiente == d_der)
+        r2 = np.where(degenerada, sin_forma, np.maximum(np.abs((d_der - d_izq) / (d_der - pendiente)),
+                                                         np.abs((d_der - d_izq) / (pendiente - d_izq))))
+        r2 = np.where(convexa | concava, r2, np.where(monotona, sin_forma, -np.inf))
+        minimo = np.where(monotona | convexa | concava, np.maximum(control_minimo, np.maximum(r1, r2)), control_minimo)
+
+    return np.maximum(r, minimo)
+
+def mapa_inferior(x, s):
+
+    """
+    Cambio de variable f(s) del ala inferior, casi lineal en β, con sus derivadas df/dβ y d²f/dβ².
+    """
+
+    ax = np.abs(x)
+    z = ax / (s * np.sqrt(3))
+    y = z * z
+    Phi = norm.cdf(-z)
+    with np.errstate(all="ignore"):
+        Phi_sobre_phi = np.sqrt(np.pi / 2) * erfcx(z / np.sqrt(2))
+        f = 2 * np.pi / np.sqrt(27) * ax * Phi ** 3
+        fp = 2 * np.pi * y * Phi ** 2 * np.exp(y + 0.125 * s * s)
+        fpp = np.pi / 6 * y / s ** 3 * Phi * (8 * np.sqrt(3) * s * ax + (3 * s * s * (s * s - 8) - 8 * x * x) *
+                                               Phi_sobre_phi) * np.exp(2 * y + 0.25 * s * s)
+
+    return f, fp, fpp
+
+def mapa_superior(x, s):
+
+    """
+    Cambio de variable f(s) = Φ(-s/2) del ala superior, con sus derivadas df/dβ y d²f/dβ².
+    """
+
+    w = (x / s) ** 2
+    with np.errstate(all="ignore"):
+        fp = -0.5 * np.exp(0.5 * w)
+        fpp = np.sqrt(np.pi / 2) * np.exp(w + 0.125 * s * s) * w / s
+
+    return norm.cdf(-0.5 * s), fp, fpp
+
+def volatilidad_implicita_racional(precios, S, K, T, r, q=0, tipo="call", iteraciones=2):
+
+    """
+    Volatilidad implícita al estilo de Jäckel para arreglos de contratos: valor inicial de "Let's Be Rational" y
+    'iteraciones' pasos de Householder de tercer orden sobre el objetivo de cada rama (1/ln(b) en el ala inferior,
+    b en el centro y ln(b_max - b) en el ala superior). Con 2 pasos se alcanza la precisión doble. Devuelve NaN en
+    precios fuera de los límites de no arbitraje.
+    """
+
+    # Transmitir las entradas a arreglos del mismo tamaño
+    precios, S, K, T, r, q = np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in (precios, S, K, T, r, q)])
+    theta = np.where(np.broadcast_to(np.asarray(tipo) == "call", precios.shape), 1.0, -1.0)
+
+    # Paso 1: Normalizar (precio sin descontar sobre √(F·K))
+    forward = S * np.exp((r - q) * T)
+    x = np.log(forward / K)
+    beta = precios * np.exp(r * T) / np.sqrt(forward * K)
+
+    # Paso 2: Reducir a un call fuera del dinero (restar el intrínseco y usar la simetría b(x, θ) = b(-x, -θ))
+    intrinseco = np.maximum(theta * (np.exp(0.5 * x) - np.exp(-0.5 * x)), 0)
+    beta = beta - intrinseco
+    x = -np.abs(x)
+    b_max = np.exp(0.5 * x)
+    validos = (beta > 0) & (beta < b_max) & (T > 0)
+    beta = np.where(validos, beta, 0.5 * b_max)
+
+    # Paso 3: Punto de inflexión s_c = √(2|x|) y los cortes de su tangente con b = 0 (s_l) y con b = b_max (s_u),
+    # que dividen el rango de β en cuatro ramas
+    s_c = np.maximum(np.sqrt(2 * np.abs(x)), 1e-12)
+    b_c = precio_black_normalizado(x, s_c)
+    v_c = vega_black_normalizada(x, s_c)
+    with np.errstate(all="ignore"):
+        s_l = np.maximum(s_c - b_c / v_c, 1e-12)
+        s_u = s_c + (b_max - b_c) / v_c
+    b_l, v_l = precio_black_normalizado(x, s_l), vega_black_normalizada(x, s_l)
+    b_u, v_u = precio_black_normalizado(x, s_u), vega_black_normalizada(x, s_u)
+    inferior = beta < b_l
+    superior = beta > b_u
+
+    # Paso 4: Valores iniciales ("Let's Be Rational"). En las ramas centrales s(β) se interpola con una cúbica racional
+    # entre los puntos de la tangente; en las alas se interpola el mapa f(β), casi lineal, y se invierte
+    with np.errstate(all="ignore"):
+        r_centro_inf = control_cubica(b_l, b_c, s_l, s_c, 1 / v_l, 1 / v_c, 0.0, lado="derecho")
+        r_centro_sup = control_cubica(b_c, b_u, s_c, s_u, 1 / v_c, 1 / v_u, 0.0, lado="izquierdo")
+        s_centro = np.where(beta <= b_c, cubica_racional(beta, b_l, b_c, s_l, s_c, 1 / v_l, 1 / v_c, r_centro_inf),
+                            cubica_racional(beta, b_c, b_u, s_c, s_u, 1 / v_c, 1 / v_u, r_centro_sup))
+
+        # Ala inferior: f va de (0, 0) a (b_l, f_l)
+        f_l, fp_l, fpp_l = mapa_inferior(x, s_l)
+        r_inf = control_cubica(0.0, b_l, 0.0, f_l, 1.0, fp_l, fpp_l, lado="derecho", conservar_forma=True)
+        f = cubica_racional(beta, 0.0, b_l, 0.0, f_l, 1.0, fp_l, r_inf)
+        t = beta / b_l
+        f = np.where(f > 0, f, (f_l * t + b_l * (1 - t)) * t)
+        s_inferior = np.abs(x / (np.sqrt(3) * ndtri(np.cbrt(f / (2 * np.pi / np.sqrt(27) * np.abs(x))))))
+
+        # Ala superior: f va de (b_u, f_u) a (b_max, 0)
+        f_u, fp_u, fpp_u = mapa_superior(x, s_u)
+        r_sup = control_cubica(b_u, b_max, f_u, 0.0, fp_u, -0.5, fpp_u, lado="izquierdo", conservar_forma=True)
+        f = np.where(np.isfinite(fpp_u), cubica_racional(beta, b_u, b_max, f_u, 0.0, fp_u, -0.5, r_sup), 0.0)
+        t = (beta - b_u) / (b_max - b_u)
+        f = np.where(f > 0, f, (f_u * (1 - t) + 0.5 * (b_max - b_u) * t) * (1 - t))
+        s_superior = -2 * ndtri(f)
+
+    s = np.where(inferior, s_inferior, np.where(superior, s_superior, s_centro))
+    s = np.where(np.isfinite(s) & (s > 0), s, s_c)
+
+    # Paso 5: Refinamiento de Householder (3er orden) sobre el objetivo de cada región
+    for _ in range(iteraciones):
+        b = precio_black_normalizado(x, s)
+        vega = vega_black_normalizada(x, s)
+        b2 = x * x / s ** 3 - 0.25 * s                 # b''/b'
+        b3 = b2 * b2 - 3 * x * x / s ** 4 - 0.25       # b'''/b'
+
+        # Objetivo g = G(b) - G(β): paso de Newton ν = -g/g' y razones G''/G', G'''/G' (según la región)
+        with np.errstate(all="ignore"):
+            ln_b = np.log(b)
+            complemento = complemento_black_normalizado(x, s)
+            # Región Inferior: G(b) = 1/ln(b)
+            nu_inf = (1 / ln_b - 1 / np.log(beta)) * b * ln_b ** 2 / vega
+            g2_inf = -(ln_b + 2) / (b * ln_b)
+            g3_inf = (2 * ln_b ** 2 + 6 * ln_b + 6) / (b * ln_b) ** 2
+            # Región Superior: G(b) = -ln(b_max - b)
+            nu_sup = -np.log((b_max - beta) / complemento) * complemento / vega
+            g2_sup = 1 / complemento
+            g3_sup = 2 / complemento ** 2
+            # Región Central: G(b) = b
+            nu_centro = (beta - b) / vega
+
+            nu = np.where(inferior, nu_inf, np.where(superior, nu_sup, nu_centro))
+            g2 = np.where(inferior, g2_inf, np.where(superior, g2_sup, 0.0))
+            g3 = np.where(inferior, g3_inf, np.where(superior, g3_sup, 0.0))
+
+            # Razones h2 = g''/g' y h3 = g'''/g' a partir de G y de las derivadas de b
+            h2 = g2 * vega + b2
+            h3 = g3 * vega ** 2 + 3 * g2 * vega * b2 + b3
+            paso = nu * (1 + 0.5 * h2 * nu) / (1 + nu * (h2 + h3 * nu / 6))
+        s_nuevo = s + np.where(np.isfinite(paso), paso, 0)
+        s = np.where(s_nuevo > 0, s_nuevo, 0.5 * s)
+
+    # Desnormalizar: σ = s / √T
+    sigma = s / np.sqrt(np.where(T > 0, T, np.nan))
+
+    return np.where(validos, sigma, np.nan)
+
+# Función BSM para generar precios de prueba
+def precio_opcion(S, K, T, r, sigma, q=0, tipo="call"):
+
+    """
+    Calcula el precio de una opción utilizando el Modelo de Black-Scholes-Merton.
+    """
+
+    # Obtener valores auxiliares
+    d1 = (np.log(S / K) + (r - q + 0.5 * sigma ** 2) * T) / (sigma * np.sqrt(T))
+    d2 = d1 - sigma * np.sqrt(T)
+
+    # Calcular la Prima de la Opción
+    if tipo == "call":
+        return S * np.exp(-q * T) * norm.cdf(d1) - K * np.exp(-r * T) * norm.cdf(d2)
+    else:
+        return K * np.exp(-r * T) * norm.cdf(-d2) - S * np.exp(-q * T) * norm.cdf(-d1)
+
+# Prueba de estrés: moneyness entre 0.5 y 2, vencimientos de 1 día a 3 años y volatilidades de 5% a 150%.
+# Se usan contratos fuera del dinero: los que están dentro se reducen a ellos restando el intrínseco, así que su
+# precisión depende de la del precio cotizado y no del método.
+np.random.seed(0)
+n = 200_000
+S = 100
+K = S * np.exp(np.random.uniform(np.log(0.5), np.log(2), n))
+T = np.random.uniform(1 / 365, 3, n)
+vol_real = np.random.uniform(0.05, 1.5, n)
+tipos = np.where(K > S * np.exp(0.05 * T), "call", "put")
+precios = np.where(tipos == "call", precio_opcion(S, K, T, 0.05, vol_real, tipo="call"),
+                   precio_opcion(S, K, T, 0.05, vol_real, tipo="put"))
+
+# Descartar contratos cuyo precio es menor a la precisión de la fórmula BSM (no hay información de volatilidad)
+con_informacion = precios > 1e-10 * S
+
+for iteraciones in [1, 2, 3]:
+    inicio = time.perf_counter()
+    vol_estimada = volatilidad_implicita_racional(precios, S, K, T, 0.05, tipo=tipos, iteraciones=iteraciones)
+    tiempo = time.perf_counter() - inicio
+    error = np.abs(vol_estimada - vol_real)[con_informacion] / vol_real[con_informacion]
+    print(f"Iteraciones: {iteraciones} | Error Relativo Máximo: {np.nanmax(error):.2e} | "
+          f"Percentil 99.9: {np.nanpercentile(error, 99.9):.2e} | Tiempo ({n:,} contratos): {tiempo * 1000:.0f} ms")
+
+# Aplicar a la cadena de datos/opciones (precio medio bid/ask)
+opciones_mercado = pd.read_csv("../datos/opciones.csv")
+fecha_datos = pd.to_datetime(opciones_mercado["lastTradeDate"]).max().tz_localize(None).normalize()
+opciones_mercado["T"] = ((pd.to_datetime(opciones_mercado["Expiration"]) - fecha_datos).dt.days + 1) / 365
+opciones_mercado["mid"] = (opciones_mercado["bid"] + opciones_mercado["ask"]) / 2
+tasa_libre_riesgo = 0.05
+
+# Forward por vencimiento: mediana de K + exp(rT)·(C - P) sobre los strikes cotizados en ambas puntas
+cotizados = opciones_mercado[opciones_mercado["bid"] > 0]
+pares = cotizados.pivot_table(values="mid", index=["Expiration", "strike"], columns="Type").dropna().reset_index()
+pares["T"] = pares["Expiration"].map(opciones_mercado.groupby("Expiration")["T"].first())
+pares["F"] = pares["strike"] + np.exp(tasa_libre_riesgo * pares["T"]) * (pares["call"] - pares["put"])
+opciones_mercado["F"] = opciones_mercado["Expiration"].map(pares.groupby("Expiration")["F"].median())
+
+inicio = time.perf_counter()
+opciones_mercado["IV Racional"] = volatilidad_implicita_racional(opciones_mercado["mid"].values,
+                                                                 opciones_mercado["F"].values * np.exp(-tasa_libre_riesgo * opciones_mercado["T"].values),
+                                                                 opciones_mercado["strike"].values,
+                                                                 opciones_mercado["T"].values, tasa_libre_riesgo,
+                                                                 tipo=opciones_mercado["Type"].values)
+print(f"\nCadena: {opciones_mercado['IV Racional'].notna().sum()} de {len(opciones_mercado)} contratos con IV "
+      f"en {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+# Recordatorio:
+#   - Normalizar el problema (x = ln(F/K), s = σ√T) permite tratar cualquier moneyness y vencimiento con las mismas
+#     fórmulas, y transformar el objetivo (con logaritmos en las alas) hace que la función sea casi lineal en s.
+#   - Con el valor inicial de "Let's Be Rational", los pasos de Householder de tercer orden alcanzan la precisión de
+#     máquina en dos iteraciones, sin necesidad de intervalos ni máscaras de convergencia: el costo es el mismo para cada contrato.
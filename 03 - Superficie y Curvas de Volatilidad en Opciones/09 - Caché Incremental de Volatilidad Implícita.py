@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+import time
+
+# Cuando se refresca una cadena de opciones, normalmente sólo una fracción de los bids/asks cambió. En lugar de
+# recalcular toda la volatilidad implícita, se guarda una caché por contrato con las entradas (precio, S, T, r, q)
+# redondeadas al tamaño de tick: sólo los contratos cuyas entradas cambiaron se vuelven a resolver, partiendo de
+# la volatilidad anterior como valor inicial.
+
+# Función BSM vectorizada (devuelve precio y vega con los mismos valores intermedios)
+def precio_y_vega(S, K, T, r, sigma, q=0, es_call=True):
+
+    """
+    Calcula el precio y la Vega de opciones europeas con el Modelo de BSM para arreglos de contratos.
+    """
+
+    # Obtener valores auxiliares
+    raiz_T = np.sqrt(T)
+    d1 = (np.log(S / K) + (r - q + 0.5 * sigma ** 2) * T) / (sigma * raiz_T)
+    d2 = d1 - sigma * raiz_T
+    descuento_S = S * np.exp(-q * T)
+    descuento_K = K * np.exp(-r * T)
+
+    # Calcular la Prima (Calls y Puts en el mismo arreglo)
+    call = descuento_S * norm.cdf(d1) - descuento_K * norm.cdf(d2)
+    put = descuento_K * norm.cdf(-d2) - descuento_S * norm.cdf(-d1)
+    precio = np.where(es_call, call, put)
+    vega = descuento_S * norm.pdf(d1) * raiz_T
+
+    return precio, vega
+
+def volatilidad_implicita_vectorizada(precios, S, K, T, r, q=0, tipo="call", tolerancia=1e-10, max_iter=100,
+                                      sigma_min=1e-4, sigma_max=5.0, sigma_inicial=None):
+
+    """
+    Encuentra la volatilidad implícita de todos los contratos a la vez. 'tipo' puede ser "call", "put" o un
+    arreglo con el tipo de cada contrato. Devuelve NaN en los contratos cuyo precio viola los límites de
+    no arbitraje o que no convergen.
+    """
+
+    # Transmitir todas las entradas a arreglos del mismo tamaño
+    precios, S, K, T, r, q = np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in (precios, S, K, T, r, q)])
+    es_call = np.broadcast_to(np.asarray(tipo) == "call", precios.shape)
+    forma = precios.shape
+    precios, S, K, T, r, q, es_call = [x.ravel() for x in (precios, S, K, T, r, q, es_call)]
+
+    # Límites de no arbitraje: valor intrínseco descontado < precio < cota superior
+    descuento_S = S * np.exp(-q * T)
+    descuento_K = K * np.exp(-r * T)
+    intrinseco = np.where(es_call, np.maximum(descuento_S - descuento_K, 0), np.maximum(descuento_K - descuento_S, 0))
+    cota_superior = np.where(es_call, descuento_S, descuento_K)
+    validos = (precios > intrinseco) & (precios < cota_superior) & (T > 0)
+
+    # Valor Inicial: punto de inflexión de Manaster-Koehler, o Brenner-Subrahmanyam cerca del dinero
+    forward = descuento_S / descuento_K
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inicial = np.maximum(np.sqrt(2 * np.abs(np.log(forward)) / T),
+                             np.sqrt(2 * np.pi / T) * (precios - intrinseco) / descuento_S)
+    if sigma_inicial is not None:
+        # Los contratos sin valor inicial propio (NaN) conservan el valor inicial heurístico
+        propuesto = np.broadcast_to(np.asarray(sigma_inicial, dtype=float), forma).ravel()
+        inicial = np.where(np.isnan(propuesto), inicial, propuesto)
+    sigma = np.clip(np.nan_to_num(inicial, nan=0.2), sigma_min, sigma_max)
+
+    # Intervalo de bisección por contrato
+    bajo = np.full_like(sigma, sigma_min)
+    alto = np.full_like(sigma, sigma_max)
+    convergido = ~validos
+    activos = np.flatnonzero(validos)
+
+    for _ in range(max_iter):
+        if activos.size == 0:
+            break
+
+        # Evaluar sólo los contratos activos
+        precio, vega = precio_y_vega(S[activos], K[activos], T[activos], r[activos], sigma[activos],
+                                     q[activos], es_call[activos])
+        diferencia = precio - precios[activos]
+
+        # Actualizar el intervalo: el precio es creciente en sigma
+        alto[activos] = np.where(diferencia > 0, sigma[activos], alto[activos])
+        bajo[activos] = np.where(diferencia <= 0, sigma[activos], bajo[activos])
+
+        # Paso de Newton; si sale del intervalo (o la Vega es casi cero) usar bisección
+        with np.errstate(all="ignore"):
+            nuevo = sigma[activos] - diferencia / vega
+        fuera = ~((nuevo > bajo[activos]) & (nuevo < alto[activos]))
+        nuevo = np.where(fuera, 0.5 * (bajo[activos] + alto[activos]), nuevo)
+
+        # Marcar los contratos que ya convergieron (en precio o en el tamaño del paso). Si el paso se anula porque el
+        # intervalo colapsó sobre sigma_min o sigma_max sin reproducir el precio, la volatilidad está fuera del rango
+        precio_ok = np.abs(diferencia) < tolerancia * np.maximum(precios[activos], 1)
+        paso_ok = np.abs(nuevo - sigma[activos]) < tolerancia
+        en_limite = (nuevo <= sigma_min + tolerancia) | (nuevo >= sigma_max - tolerancia)
+        listos = precio_ok | paso_ok
+        sigma[activos] = np.where(precio_ok, sigma[activos], nuevo)
+        convergido[activos] = precio_ok | (paso_ok & ~en_limite)
+        activos = activos[~listos]
+
+    # Contratos inválidos o sin convergencia
+    sigma[~validos | ~convergido] = np.nan
+
+    return sigma.reshape(forma)
+
+# Tamaño de tick por entrada (las variaciones menores no provocan un recálculo)
+ticks_por_defecto = {
+
+    "precio": 0.005,          # Medio centavo (el precio medio bid/ask cae a mitad de tick)
+    "S": 0.01,                # Centavo del subyacente
+    "T": 1 / (365 * 24 * 60), # Un minuto
+    "r": 1e-4,                # Un punto base
+    "q": 1e-4                 # Un punto base
+
+    }
+
+def cuantizar_entradas(cadena, ticks=ticks_por_defecto):
+
+    """
+    Redondea las entradas de la volatilidad implícita (precio, S, T, r, q) a múltiplos enteros de su tick
+    (los precios faltantes se marcan con -1).
+    """
+
+    return pd.DataFrame({columna: np.round(np.nan_to_num(cadena[columna].values / tick, nan=-1)).astype(np.int64)
+                         for columna, tick in ticks.items()}, index=cadena.index)
+
+def actualizar_iv_incremental(cadena, cache=None, ticks=ticks_por_defecto):
+
+    """
+    Calcula la volatilidad implícita de una cadena indexada por 'contractSymbol' (columnas precio, S, K, T, r, q,
+    Type), resolviendo sólo los contratos nuevos o cuyas entradas cuantizadas cambiaron respecto a la caché.
+    Devuelve la serie de volatilidades, la caché actualizada y el número de contratos recalculados.
+    """
+
+    # Entradas cuantizadas del nuevo snapshot
+    claves = cuantizar_entradas(cadena, ticks)
+
+    # Detectar contratos nuevos o con cambios (comparación vectorizada contra la caché alineada)
+    if cache is None:
+        cambiados = np.ones(len(cadena), dtype=bool)
+        iv_anterior = np.full(len(cadena), np.nan)
+    else:
+        # Si el snapshot trae los mismos contratos en el mismo orden, se evita buscar cada símbolo
+        mismo_orden = cache.index.equals(cadena.index)
+        nuevos = np.zeros(len(cadena), dtype=bool) if mismo_orden else ~cadena.index.isin(cache.index)
+        previa = cache if mismo_orden else cache.reindex(cadena.index)
+        cambiados = nuevos | (previa[claves.columns].values != claves.values).any(axis=1)
+        iv_anterior = previa["iv"].values
+
+    # Resolver sólo los contratos que cambiaron, con la volatilidad anterior como valor inicial (si existe)
+    iv = iv_anterior.copy()
+    if cambiados.any():
+        subconjunto = cadena[cambiados]
+        iv[cambiados] = volatilidad_implicita_vectorizada(subconjunto["precio"].values, subconjunto["S"].values,
+                                                          subconjunto["strike"].values, subconjunto["T"].values,
+                                                          subconjunto["r"].values, subconjunto["q"].values,
+                                                          tipo=subconjunto["Type"].values, sigma_inicial=iv_anterior[cambiados])
+
+    # Caché actualizada: claves cuantizadas + volatilidad (los contratos que ya no cotizan se descartan)
+    cache_nueva = claves.assign(iv=iv)
+
+    return pd.Series(iv, index=cadena.index, name="iv"), cache_nueva, int(cambiados.sum())
+
+# Leer Datos de Opciones (la fecha de valoración es la del último trade registrado)
+opciones_mercado = pd.read_csv("../datos/opciones.csv").set_index("contractSymbol")
+fecha_datos = pd.to_datetime(opciones_mercado["lastTradeDate"]).max().tz_localize(None).normalize()
+opciones_mercado["T"] = ((pd.to_datetime(opciones_mercado["Expiration"]) - fecha_datos).dt.days + 1) / 365
+opciones_mercado["precio"] = (opciones_mercado["bid"] + opciones_mercado["ask"]) / 2
+opciones_mercado["r"] = 0.05
+opciones_mercado["q"] = 0.0
+
+# Forward por vencimiento: mediana de K + exp(rT)·(C - P) sobre los strikes con ambas puntas (S = F·exp(-rT), q = 0)
+cotizados = opciones_mercado[opciones_mercado["bid"] > 0]
+pares = cotizados.pivot_table(values="precio", index=["Expiration", "strike"], columns="Type").dropna().reset_index()
+pares["T"] = pares["Expiration"].map(opciones_mercado.groupby("Expiration")["T"].first())
+pares["F"] = pares["strike"] + np.exp(0.05 * pares["T"]) * (pares["call"] - pares["put"])
+forward = opciones_mercado["Expiration"].map(pares.groupby("Expiration")["F"].median())
+opciones_mercado["S"] = forward * np.exp(-opciones_mercado["r"] * opciones_mercado["T"])
+
+# Universo de 20 subyacentes (réplicas de la cadena) para medir el efecto en cadenas grandes
+universo = pd.concat([opciones_mercado.rename(index=lambda x: f"{x}_{n}") for n in range(20)])
+
+# Snapshot inicial: se resuelve toda la cadena
+inicio = time.perf_counter()
+iv_inicial, cache, recalculados = actualizar_iv_incremental(universo)
+tiempo_completo = time.perf_counter() - inicio
+print(f"Snapshot Inicial: {recalculados} contratos resueltos en {tiempo_completo * 1000:.1f} ms")
+
+# Simular un refresco intradía: 5% de las cotizaciones se mueven 1-3 ticks, el resto se queda igual
+np.random.seed(7)
+refresco = universo.copy()
+movidos = np.random.rand(len(refresco)) < 0.05
+refresco.loc[movidos, "precio"] += np.random.choice([-3, -2, -1, 1, 2, 3], movidos.sum()) * 0.01
+refresco["precio"] = refresco["precio"].clip(lower=0.005)
+
+inicio = time.perf_counter()
+iv_refresco, cache, recalculados = actualizar_iv_incremental(refresco, cache)
+tiempo_incremental = time.perf_counter() - inicio
+print(f"Refresco Incremental: {recalculados} contratos resueltos en {tiempo_incremental * 1000:.1f} ms")
+
+# Verificar contra un recálculo completo del refresco
+iv_completa, _, _ = actualizar_iv_incremental(refresco)
+print(f"Diferencia Máxima vs Recálculo Completo: {np.nanmax(np.abs(iv_refresco - iv_completa)):.2e}")
+print(f"Aceleración: {tiempo_completo / tiempo_incremental:.1f}x")
+
+# Recordatorio:
+#   - La caché reutiliza la volatilidad implícita de los contratos cuyas entradas no cambiaron más allá de un tick, y
+#     usa la volatilidad anterior como valor inicial de los que sí cambiaron, por lo que convergen en menos iteraciones.
+#   - Un movimiento del subyacente (o del tiempo al vencimiento) mayor a su tick cambia las entradas de todos los contratos
+#     afectados: el ahorro es máximo cuando el subyacente está quieto y sólo se mueven algunas cotizaciones.
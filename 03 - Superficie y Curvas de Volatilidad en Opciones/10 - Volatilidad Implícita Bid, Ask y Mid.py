@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+import time
+
+# La columna "impliedVolatility" de Yahoo muestra valores sin sentido en contratos muy dentro del dinero (por
+# ejemplo 1.64 en los calls de strike 490 de datos/opciones.csv), y "02 - Volatilidad Implícita" sólo invierte
+# el lastPrice. Aquí se calcula la volatilidad implícita del bid, del ask y del precio medio a la vez, después de
+# descartar los contratos que nunca podrían converger.
+
+# Leer Datos de Opciones (la fecha de valoración es la del último trade registrado)
+opciones_mercado = pd.read_csv("../datos/opciones.csv")
+fecha_datos = pd.to_datetime(opciones_mercado["lastTradeDate"]).max()
+opciones_mercado["T"] = ((pd.to_datetime(opciones_mercado["Expiration"]) -
+                          fecha_datos.tz_localize(None).normalize()).dt.days + 1) / 365
+opciones_mercado["mid"] = (opciones_mercado["bid"] + opciones_mercado["ask"]) / 2
+tasa_libre_riesgo = 0.05
+
+# Forward por vencimiento: mediana de K + exp(rT)·(C - P) sobre los strikes cotizados en ambas puntas
+cotizados = opciones_mercado[opciones_mercado["bid"] > 0]
+pares = cotizados.pivot_table(values="mid", index=["Expiration", "strike"], columns="Type").dropna().reset_index()
+pares["T"] = pares["Expiration"].map(opciones_mercado.groupby("Expiration")["T"].first())
+pares["F"] = pares["strike"] + np.exp(tasa_libre_riesgo * pares["T"]) * (pares["call"] - pares["put"])
+opciones_mercado["S"] = opciones_mercado["Expiration"].map(pares.groupby("Expiration")["F"].median()) * \
+    np.exp(-tasa_libre_riesgo * opciones_mercado["T"])
+
+# =====================================
+#  Paso 1: Filtro de No Arbitraje
+# =====================================
+
+def filtro_no_arbitraje(cadena, r, q=0, fecha_datos=None, dias_sin_operar=5):
+
+    """
+    Devuelve, para cada contrato, el motivo por el que no puede tener volatilidad implícita ("" si es válido):
+    vencido, sin bid, cotización cruzada, fuera de los límites de no arbitraje o último trade desactualizado.
+    """
+
+    # Límites de no arbitraje: intrínseco descontado <= precio <= S·exp(-qT) (call) o K·exp(-rT) (put)
+    es_call = cadena["Type"].values == "call"
+    descuento_S = cadena["S"].values * np.exp(-q * cadena["T"].values)
+    descuento_K = cadena["strike"].values * np.exp(-r * cadena["T"].values)
+    intrinseco = np.where(es_call, np.maximum(descuento_S - descuento_K, 0), np.maximum(descuento_K - descuento_S, 0))
+    cota_superior = np.where(es_call, descuento_S, descuento_K)
+
+    # Condiciones (en orden de prioridad: la primera que se cumple es el motivo reportado)
+    condiciones = [
+
+        cadena["T"].values <= 0,
+        ~(cadena["bid"].values > 0),
+        cadena["bid"].values > cadena["ask"].values,
+        cadena["ask"].values <= intrinseco,
+        cadena["bid"].values >= cota_superior
+
+        ]
+    motivos = ["Vencido", "Sin Bid", "Cotización Cruzada", "Ask <= Intrínseco", "Bid >= Cota Superior"]
+
+    # Último trade desactualizado (opcional)
+    if fecha_datos is not None:
+        dias = (fecha_datos - pd.to_datetime(cadena["lastTradeDate"])).dt.days.values
+        condiciones.append(dias > dias_sin_operar)
+        motivos.append("Sin Operar")
+
+    return np.select(condiciones, motivos, default="")
+
+# =========================================================
+#  Paso 2: Volatilidad Implícita de Bid, Mid y Ask a la vez
+# =========================================================
+
+def volatilidad_bid_ask_mid(cadena, r, q=0, tolerancia=1e-10, max_iter=100, sigma_min=1e-4, sigma_max=5.0):
+
+    """
+    Resuelve la volatilidad implícita de bid, mid y ask en un solo arreglo (3 × contratos) con Newton-Raphson
+    protegido por bisección. Los términos que no dependen de sigma (log-moneyness forward, √T y descuentos) se
+    calculan una vez por contrato y se comparten entre las tres cotizaciones y todas las iteraciones.
+    """
+
+    # Intermedios compartidos (uno por contrato)
+    es_call = cadena["Type"].values == "call"
+    T = cadena["T"].values
+    raiz_T = np.sqrt(T)
+    descuento_S = cadena["S"].values * np.exp(-q * T)
+    descuento_K = cadena["strike"].values * np.exp(-r * T)
+    log_forward = np.log(descuento_S / descuento_K)
+    signo = np.where(es_call, 1.0, -1.0)
+    intrinseco = np.maximum(signo * (descuento_S - descuento_K), 0)
+    cota_superior = np.where(es_call, descuento_S, descuento_K)
+
+    # Cotizaciones apiladas: fila 0 = bid, fila 1 = mid, fila 2 = ask (columna = contrato)
+    precios = np.vstack([cadena["bid"].values, cadena["mid"].values, cadena["ask"].values])
+    columna = np.broadcast_to(np.arange(precios.shape[1]), precios.shape)
+    validos = (precios > intrinseco) & (precios < cota_superior) & (T > 0)
+
+    # Valor Inicial (Manaster-Koehler / Brenner-Subrahmanyam) e intervalo de bisección
+    with np.errstate(all="ignore"):
+        inicial = np.maximum(np.sqrt(2 * np.abs(log_forward) / T), np.sqrt(2 * np.pi / T) * (precios - intrinseco) / descuento_S)
+    sigma = np.clip(np.nan_to_num(inicial, nan=0.2), sigma_min, sigma_max).ravel()
+    bajo = np.full_like(sigma, sigma_min)
+    alto = np.full_like(sigma, sigma_max)
+    objetivo = precios.ravel()
+    columna = columna.ravel()
+    convergido = ~validos.ravel()
+    activos = np.flatnonzero(validos.ravel())
+
+    for _ in range(max_iter):
+        if activos.size == 0:
+            break
+
+        # Precio y Vega sólo de los activos, reutilizando los intermedios de su contrato
+        c = columna[activos]
+        s = sigma[activos]
+        d1 = (log_forward[c] + 0.5 * s * s * T[c]) / (s * raiz_T[c])
+        d2 = d1 - s * raiz_T[c]
+        precio = signo[c] * (descuento_S[c] * norm.cdf(signo[c] * d1) - descuento_K[c] * norm.cdf(signo[c] * d2))
+        vega = descuento_S[c] * norm.pdf(d1) * raiz_T[c]
+        diferencia = precio - objetivo[activos]
+
+        # Actualizar intervalo y dar paso de Newton (bisección si sale del intervalo)
+        alto[activos] = np.where(diferencia > 0, s, alto[activos])
+        bajo[activos] = np.where(diferencia <= 0, s, bajo[activos])
+        with np.errstate(all="ignore"):
+            nuevo = s - diferencia / vega
+        nuevo = np.where((nuevo > bajo[activos]) & (nuevo < alto[activos]), nuevo, 0.5 * (bajo[activos] + alto[activos]))
+
+        # Máscara de convergencia. Si el paso se anula porque el intervalo colapsó sobre sigma_min o sigma_max sin
+        # reproducir el precio, la volatilidad está fuera del rango y la cotización queda en NaN
+        precio_ok = np.abs(diferencia) < tolerancia * np.maximum(objetivo[activos], 1)
+        paso_ok = np.abs(nuevo - s) < tolerancia
+        en_limite = (nuevo <= sigma_min + tolerancia) | (nuevo >= sigma_max - tolerancia)
+        listos = precio_ok | paso_ok
+        sigma[activos] = np.where(precio_ok, s, nuevo)
+        convergido[activos] = precio_ok | (paso_ok & ~en_limite)
+        activos = activos[~listos]
+
+    sigma[~convergido | ~validos.ravel()] = np.nan
+    iv_bid, iv_mid, iv_ask = sigma.reshape(precios.shape)
+
+    return pd.DataFrame({"IV Bid": iv_bid, "IV Mid": iv_mid, "IV Ask": iv_ask}, index=cadena.index)
+
+# Aplicar el filtro y resolver sólo los contratos válidos
+inicio = time.perf_counter()
+opciones_mercado["Filtro"] = filtro_no_arbitraje(opciones_mercado, tasa_libre_riesgo, fecha_datos=fecha_datos)
+validos = opciones_mercado[opciones_mercado["Filtro"] == ""]
+opciones_mercado = opciones_mercado.join(volatilidad_bid_ask_mid(validos, tasa_libre_riesgo))
+tiempo = time.perf_counter() - inicio
+
+print("Contratos descartados por motivo:")
+print(opciones_mercado["Filtro"].replace("", "Válido").value_counts())
+print(f"\nBid, Mid y Ask de {len(validos)} contratos resueltos en {tiempo * 1000:.1f} ms")
+
+# Comparar con la volatilidad de Yahoo en los contratos muy dentro del dinero
+columnas = ["contractSymbol", "strike", "bid", "ask", "impliedVolatility", "IV Bid", "IV Mid", "IV Ask", "Filtro"]
+print("\nContratos Dentro del Dinero (Vencimiento Más Cercano):")
+print(opciones_mercado[(opciones_mercado["Expiration"] == opciones_mercado["Expiration"].min()) &
+                       opciones_mercado["inTheMoney"]][columnas].head(8).to_string())
+
+# El ancho del spread expresado en volatilidad: cuánto cuesta cruzar el spread en puntos de volatilidad
+opciones_mercado["Spread IV"] = opciones_mercado["IV Ask"] - opciones_mercado["IV Bid"]
+print("\nSpread Mediano en Volatilidad por Vencimiento (puntos %):")
+print((opciones_mercado.groupby("Expiration")["Spread IV"].median() * 100).round(2).head(10))
+
+# Recordatorio:
+#   - Un contrato cuyo ask está por debajo del valor intrínseco, o que no tiene bid, no tiene volatilidad implícita: filtrarlo
+#     antes de resolver evita iteraciones desperdiciadas y valores absurdos como los que reporta Yahoo en opciones ITM.
+#   - La diferencia entre la IV del ask y la del bid mide el costo de operar en puntos de volatilidad, y es una mejor
+#     referencia de liquidez que el spread en dólares cuando se comparan strikes y vencimientos distintos.
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+import time
+
+# Las opciones sobre acciones y ETFs de EE.UU. (como SPY) son americanas, pero "02 - Volatilidad Implícita" invierte
+# el Modelo BSM europeo. Invertir "arbol_binomial_opciones()" contrato por contrato (con bucles de Python) tarda cerca
+# de un segundo por strike, así que aquí se valoran todos los strikes de un vencimiento en un solo árbol vectorizado
+# por iteración, y cada strike parte de su volatilidad europea corregida por la prima de ejercicio anticipado.
+
+def arbol_binomial_vectorizado(S, K, T, r, sigma, n=200, q=0, opcion="put", tipo="americana"):
+
+    """
+    Valora con un árbol binomial (Cox-Ross-Rubinstein) todos los strikes K (con su propia sigma) de un mismo
+    vencimiento a la vez: cada paso de la retropropagación opera sobre el arreglo (strikes × nodos).
+    """
+
+    # Definir parámetros (uno por strike)
+    K = np.asarray(K, dtype=float)
+    sigma = np.asarray(sigma, dtype=float)
+    dt = T / n
+    paso_log = sigma * np.sqrt(dt)                                   # ln(u) de cada strike
+    p = (np.exp((r - q) * dt) - np.exp(-paso_log[:, None])) / \
+        (np.exp(paso_log[:, None]) - np.exp(-paso_log[:, None]))     # Probabilidad neutral al riesgo
+    descuento = np.exp(-r * dt)
+    signo = 1.0 if opcion == "call" else -1.0
+
+    # Tabla de potencias: precio en el nodo (i, j) = S·u^(i - 2j), con i - 2j ∈ [-n, n]
+    potencias = S * np.exp(paso_log[:, None] * np.arange(-n, n + 1)[None, :])
+
+    # Payoff en el último paso
+    valor = np.maximum(signo * (potencias[:, n + n - 2 * np.arange(n + 1)] - K[:, None]), 0)
+
+    # Retropropagación (vectorizada sobre strikes y nodos)
+    for i in range(n - 1, -1, -1):
+        valor = descuento * (p * valor[:, :-1] + (1 - p) * valor[:, 1:])
+        if tipo == "americana":
+            ejercicio = signo * (potencias[:, n + i - 2 * np.arange(i + 1)] - K[:, None])
+            valor = np.maximum(valor, ejercicio)
+
+    return valor[:, 0]
+
+# Funciones BSM (europeas) vectorizadas
+def precio_y_vega(S, K, T, r, sigma, q=0, es_call=True):
+
+    """
+    Calcula el precio y la Vega de opciones europeas con el Modelo de BSM para arreglos de contratos.
+    """
+
+    raiz_T = np.sqrt(T)
+    d1 = (np.log(S / K) + (r - q + 0.5 * sigma ** 2) * T) / (sigma * raiz_T)
+    d2 = d1 - sigma * raiz_T
+    call = S * np.exp(-q * T) * norm.cdf(d1) - K * np.exp(-r * T) * norm.cdf(d2)
+    put = K * np.exp(-r * T) * norm.cdf(-d2) - S * np.exp(-q * T) * norm.cdf(-d1)
+
+    return np.where(es_call, call, put), S * np.exp(-q * T) * norm.pdf(d1) * raiz_T
+
+def volatilidad_implicita_europea(precios, S, K, T, r, q=0, es_call=True, iteraciones=50):
+
+    """
+    Volatilidad implícita europea de todos los strikes a la vez (Newton-Raphson protegido por bisección).
+    """
+
+    sigma = np.full(len(K), 0.3)
+    bajo, alto = np.full(len(K), 1e-4), np.full(len(K), 5.0)
+    for _ in range(iteraciones):
+        precio, vega = precio_y_vega(S, K, T, r, sigma, q, es_call)
+        alto = np.where(precio > precios, sigma, alto)
+        bajo = np.where(precio <= precios, sigma, bajo)
+        with np.errstate(all="ignore"):
+            nuevo = sigma - (precio - precios) / vega
+        sigma = np.where((nuevo > bajo) & (nuevo < alto), nuevo, 0.5 * (bajo + alto))
+
+    return sigma
+
+def volatilidad_implicita_americana(precios, S, K, T, r, q=0, opcion="put", n=200, tolerancia=1e-6, max_iter=20):
+
+    """
+    Volatilidad implícita americana de todos los strikes de un vencimiento. Valor inicial: volatilidad europea
+    del precio sin la prima de ejercicio anticipado (estimada con un solo árbol). Después, pasos de secante sobre
+    un árbol vectorizado que sólo incluye los strikes que no han convergido. Devuelve NaN en los precios que no
+    superan el piso americano.
+    """
+
+    precios = np.asarray(precios, dtype=float)
+    K = np.asarray(K, dtype=float)
+    es_call = opcion == "call"
+
+    # Límite de no arbitraje: el precio debe superar el del árbol con volatilidad mínima (piso americano)
+    piso = arbol_binomial_vectorizado(S, K, T, r, np.full_like(K, 1e-4), n, q, opcion)
+    validos = precios > piso + tolerancia * np.maximum(precios, 1)
+
+    # Paso 1: Volatilidad europea y prima de ejercicio anticipado en esa volatilidad (un solo árbol)
+    sigma_europea = volatilidad_implicita_europea(precios, S, K, T, r, q, es_call)
+    prima_anticipada = arbol_binomial_vectorizado(S, K, T, r, sigma_europea, n, q, opcion) - \
+        arbol_binomial_vectorizado(S, K, T, r, sigma_europea, n, q, opcion, tipo="europea")
+
+    # Paso 2: Valor inicial = volatilidad europea del precio "europeizado"; si no existe, la del vecino
+    sigma = volatilidad_implicita_europea(np.maximum(precios - prima_anticipada, 1e-8), S, K, T, r, q, es_call)
+    sigma = pd.Series(np.where(sigma > 1e-3, sigma, np.nan)).ffill().bfill().fillna(0.2).to_numpy(copy=True)
+
+    # Paso 3: Secante sobre los precios del árbol (el primer paso usa la Vega europea), protegida por bisección
+    sigma_min, sigma_max = 1e-4, 5.0
+    bajo, alto = np.full_like(sigma, sigma_min), np.full_like(sigma, sigma_max)
+    fuera_de_rango = np.zeros(len(sigma), dtype=bool)
+    sigma_anterior, precio_anterior = np.full_like(sigma, np.nan), np.full_like(sigma, np.nan)
+    activos = np.flatnonzero(validos)
+    iteraciones = 0
+    while activos.size > 0 and iteraciones < max_iter:
+        iteraciones += 1
+        s = sigma[activos]
+        precio = arbol_binomial_vectorizado(S, K[activos], T, r, s, n, q, opcion)
+        diferencia = precio - precios[activos]
+
+        # Pendiente: secante con la iteración anterior; Vega europea si no existe o no es positiva
+        _, vega = precio_y_vega(S, K[activos], T, r, s, q, es_call)
+        with np.errstate(all="ignore"):
+            secante = (precio - precio_anterior[activos]) / (s - sigma_anterior[activos])
+        pendiente = np.where(secante > 0, secante, vega)
+
+        alto[activos] = np.where(diferencia > 0, s, alto[activos])
+        bajo[activos] = np.where(diferencia <= 0, s, bajo[activos])
+        with np.errstate(all="ignore"):
+            nuevo = s - diferencia / pendiente
+        nuevo = np.where((nuevo > bajo[activos]) & (nuevo < alto[activos]), nuevo, 0.5 * (bajo[activos] + alto[activos]))
+
+        # Convergencia en precio o en el tamaño del paso. Si el paso se anula porque el intervalo colapsó sobre
+        # sigma_min o sigma_max sin reproducir el precio, la volatilidad está fuera del rango
+        precio_ok = np.abs(diferencia) < tolerancia * np.maximum(precios[activos], 1)
+        paso_ok = np.abs(nuevo - s) < tolerancia
+        en_limite = (nuevo <= sigma_min + tolerancia) | (nuevo >= sigma_max - tolerancia)
+        listos = precio_ok | paso_ok
+        fuera_de_rango[activos] = ~precio_ok & paso_ok & en_limite
+        sigma_anterior[activos], precio_anterior[activos] = s, precio
+        sigma[activos] = np.where(precio_ok, s, nuevo)
+        activos = activos[~listos]
+
+    sigma[activos] = np.nan
+    sigma[fuera_de_rango | ~validos] = np.nan
+
+    return sigma, sigma_europea, iteraciones
+
+# Validar: recuperar la volatilidad de puts americanos valorados con el mismo árbol
+S = 100
+K = np.linspace(70, 130, 61)
+T = 0.5
+r = 0.05
+vol_real = 0.25 + 0.4 * (K / S - 1) ** 2
+precios_americanos = arbol_binomial_vectorizado(S, K, T, r, vol_real, n=200, opcion="put")
+vol_americana, vol_europea, iteraciones = volatilidad_implicita_americana(precios_americanos, S, K, T, r, opcion="put")
+print(f"Error Máximo (Americana): {np.nanmax(np.abs(vol_americana - vol_real)):.2e} en {iteraciones} iteraciones")
+print(f"Error Máximo si se usa la IV Europea: {np.nanmax(np.abs(vol_europea - vol_real)):.2e}")
+
+# ======================================================
+#  Cadena completa de un vencimiento de datos/opciones
+# ======================================================
+
+# Leer Datos de Opciones (la fecha de valoración es la del último trade registrado)
+opciones_mercado = pd.read_csv("../datos/opciones.csv")
+fecha_datos = pd.to_datetime(opciones_mercado["lastTradeDate"]).max().tz_localize(None).normalize()
+opciones_mercado["T"] = ((pd.to_datetime(opciones_mercado["Expiration"]) - fecha_datos).dt.days + 1) / 365
+opciones_mercado["mid"] = (opciones_mercado["bid"] + opciones_mercado["ask"]) / 2
+opciones_mercado = opciones_mercado[opciones_mercado["bid"] > 0]
+tasa_libre_riesgo = 0.05
+
+# Forward por vencimiento con la paridad put-call (mediana sobre los strikes cotizados en ambas puntas)
+pares = opciones_mercado.pivot_table(values="mid", index=["Expiration", "strike"], columns="Type").dropna().reset_index()
+pares["T"] = pares["Expiration"].map(opciones_mercado.groupby("Expiration")["T"].first())
+pares["F"] = pares["strike"] + np.exp(tasa_libre_riesgo * pares["T"]) * (pares["call"] - pares["put"])
+forwards = pares.groupby("Expiration")["F"].median()
+tiempos = opciones_mercado.groupby("Expiration")["T"].first()
+
+# Spot ≈ forward del vencimiento más cercano; el dividendo implícito sale del forward del vencimiento elegido
+vencimiento = tiempos[tiempos > 60 / 365].index[0]
+spot = forwards.iloc[0]
+T_venc = tiempos[vencimiento]
+dividendo = tasa_libre_riesgo - np.log(forwards[vencimiento] / spot) / T_venc
+print(f"\nVencimiento: {vencimiento} | Spot: {spot:.2f} | Dividendo Implícito: {dividendo:.4f}")
+
+# Resolver todos los puts y calls del vencimiento (precio medio)
+for opcion in ["put", "call"]:
+    cadena = opciones_mercado[(opciones_mercado["Expiration"] == vencimiento) & (opciones_mercado["Type"] == opcion)]
+    cadena = cadena[cadena["strike"].between(0.7 * spot, 1.3 * spot)].sort_values("strike")
+    inicio = time.perf_counter()
+    vol_americana, vol_europea, iteraciones = volatilidad_implicita_americana(cadena["mid"].values, spot,
+                                                                              cadena["strike"].values, T_venc,
+                                                                              tasa_libre_riesgo, dividendo, opcion)
+    tiempo = time.perf_counter() - inicio
+    diferencia = pd.Series(vol_europea - vol_americana, index=cadena["strike"].values)
+    print(f"{opcion.capitalize()}s: {len(cadena)} strikes en {tiempo:.2f} segundos ({iteraciones} iteraciones) | "
+          f"IV Europea - IV Americana (máx.): {diferencia.max() * 100:.3f} puntos % en strike {diferencia.idxmax()}")
+
+# Recordatorio:
+#   - Una opción americana vale al menos lo mismo que la europea equivalente, así que invertir su precio con BSM sobreestima
+#     la volatilidad implícita, sobre todo en puts dentro del dinero y en calls antes de dividendos.
+#   - Al valorar todos los strikes en un mismo árbol vectorizado y partir de la volatilidad europea corregida, bastan muy pocas
+#     iteraciones del árbol para toda la cadena.
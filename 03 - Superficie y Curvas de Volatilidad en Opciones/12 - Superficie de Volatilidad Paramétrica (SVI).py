@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+from scipy.optimize import least_squares
+import matplotlib.pyplot as plt
+import time
+
+# En "05 - Superficie de Volatilidad" la superficie es un pivot_table(...).dropna(): cualquier strike que falte en un
+# solo vencimiento se pierde, y sólo se puede consultar en los pares (strike, vencimiento) listados. Aquí cada
+# vencimiento se ajusta con el modelo SVI "raw" de Gatheral para la varianza total w = σ²·T:
+#
+#   w(k) = a + b·(ρ·(k - m) + √((k - m)² + s²))        con k = ln(K / F)
+#
+# y entre vencimientos se interpola linealmente la varianza total. Así la superficie se evalúa en cualquier
+# arreglo de (K, T) con operaciones vectorizadas.
+
+# ===================================
+#  Volatilidad Implícita de Mercado
+# ===================================
+
+def precio_y_vega(S, K, T, r, sigma, q=0, es_call=True):
+
+    """
+    Calcula el precio y la Vega de opciones europeas con el Modelo de BSM para arreglos de contratos.
+    """
+
+    raiz_T = np.sqrt(T)
+    d1 = (np.log(S / K) + (r - q + 0.5 * sigma ** 2) * T) / (sigma * raiz_T)
+    d2 = d1 - sigma * raiz_T
+    call = S * np.exp(-q * T) * norm.cdf(d1) - K * np.exp(-r * T) * norm.cdf(d2)
+    put = K * np.exp(-r * T) * norm.cdf(-d2) - S * np.exp(-q * T) * norm.cdf(-d1)
+
+    return np.where(es_call, call, put), S * np.exp(-q * T) * norm.pdf(d1) * raiz_T
+
+def volatilidad_implicita(precios, S, K, T, r, q=0, es_call=True, iteraciones=50):
+
+    """
+    Volatilidad implícita de todos los contratos a la vez (Newton-Raphson protegido por bisección).
+    """
+
+    sigma = np.full(len(precios), 0.3)
+    bajo, alto = np.full(len(precios), 1e-4), np.full(len(precios), 5.0)
+    for _ in range(iteraciones):
+        precio, vega = precio_y_vega(S, K, T, r, sigma, q, es_call)
+        alto = np.where(precio > precios, sigma, alto)
+        bajo = np.where(precio <= precios, sigma, bajo)
+        with np.errstate(all="ignore"):
+            nuevo = sigma - (precio - precios) / vega
+        sigma = np.where((nuevo > bajo) & (nuevo < alto), nuevo, 0.5 * (bajo + alto))
+
+    # Precios sin solución dentro del intervalo
+    return np.where((sigma > 1e-3) & (sigma < 4.99), sigma, np.nan)
+
+# Leer Datos de Opciones (la fecha de valoración es la del último trade registrado)
+opciones_mercado = pd.read_csv("../datos/opciones.csv")
+fecha_datos = pd.to_datetime(opciones_mercado["lastTradeDate"]).max().tz_localize(None).normalize()
+opciones_mercado["T"] = ((pd.to_datetime(opciones_mercado["Expiration"]) - fecha_datos).dt.days + 1) / 365
+opciones_mercado["mid"] = (opciones_mercado["bid"] + opciones_mercado["ask"]) / 2
+opciones_mercado = opciones_mercado[opciones_mercado["bid"] > 0]
+tasa_libre_riesgo = 0.05
+
+# Forward por vencimiento con la paridad put-call (mediana sobre los strikes cotizados en ambas puntas)
+pares = opciones_mercado.pivot_table(values="mid", index=["Expiration", "strike"], columns="Type").dropna().reset_index()
+pares["T"] = pares["Expiration"].map(opciones_mercado.groupby("Expiration")["T"].first())
+pares["F"] = pares["strike"] + np.exp(tasa_libre_riesgo * pares["T"]) * (pares["call"] - pares["put"])
+opciones_mercado["F"] = opciones_mercado["Expiration"].map(pares.groupby("Expiration")["F"].median())
+
+# Sólo opciones fuera del dinero (puts debajo del forward, calls arriba), que son las más líquidas
+otm = opciones_mercado[((opciones_mercado["Type"] == "put") & (opciones_mercado["strike"] < opciones_mercado["F"])) |
+                       ((opciones_mercado["Type"] == "call") & (opciones_mercado["strike"] >= opciones_mercado["F"]))].copy()
+otm["IV"] = volatilidad_implicita(otm["mid"].values, otm["F"].values * np.exp(-tasa_libre_riesgo * otm["T"].values),
+                                  otm["strike"].values, otm["T"].values, tasa_libre_riesgo,
+                                  es_call=otm["Type"].values == "call")
+otm = otm.dropna(subset=["IV"])
+otm["k"] = np.log(otm["strike"] / otm["F"])
+otm["w"] = otm["IV"] ** 2 * otm["T"]
+
+# ===================================
+#  Ajuste SVI y Superficie
+# ===================================
+
+def varianza_svi(k, a, b, rho, m, s):
+
+    """
+    Varianza total del modelo SVI raw (los parámetros pueden ser arreglos que se transmitan con k).
+    """
+
+    return a + b * (rho * (k - m) + np.sqrt((k - m) ** 2 + s ** 2))
+
+def ajustar_svi(k, w, inicial=None):
+
+    """
+    Ajusta los parámetros (a, b, ρ, m, s) de un vencimiento por mínimos cuadrados sobre la varianza total.
+    """
+
+    if inicial is None:
+        inicial = [0.5 * w.min(), 0.1, -0.5, 0.0, 0.1]
+    limites = ([-w.max(), 1e-6, -0.999, 2 * k.min(), 1e-4], [w.max(), 10, 0.999, 2 * k.max(), 5])
+    inicial = np.clip(inicial, limites[0], limites[1])
+    resultado = least_squares(lambda p: varianza_svi(k, *p) - w, inicial, bounds=limites)
+
+    return resultado.x
+
+class VolSurface:
+
+    """
+    Superficie de volatilidad paramétrica: un ajuste SVI por vencimiento y varianza total interpolada
+    linealmente en T (con k = ln(K/F) fijo). Todas las consultas aceptan arreglos de K y T.
+    """
+
+    def __init__(self, tiempos, forwards, parametros, r=0.0):
+
+        orden = np.argsort(tiempos)
+        self.tiempos = np.asarray(tiempos, dtype=float)[orden]
+        self.forwards = np.asarray(forwards, dtype=float)[orden]
+        self.parametros = np.asarray(parametros, dtype=float)[orden]
+        self.r = r
+
+    @classmethod
+    def ajustar(cls, cadena, r=0.0, min_contratos=8):
+
+        """
+        Ajusta la superficie a partir de una cadena con columnas Expiration, T, F, k y w (una fila por contrato).
+        """
+
+        tiempos, forwards, parametros = [], [], []
+        for _, rebanada in cadena.groupby("Expiration"):
+            if len(rebanada) < min_contratos:
+                continue
+            tiempos.append(rebanada["T"].iloc[0])
+            forwards.append(rebanada["F"].iloc[0])
+            parametros.append(ajustar_svi(rebanada["k"].values, rebanada["w"].values))
+
+        return cls(tiempos, forwards, parametros, r)
+
+    def forward(self, T):
+
+        """
+        Forward en cualquier T (interpolación lineal de ln F; fuera del rango se extiende la tasa de los extremos).
+        Con un solo vencimiento no hay tasa que extender y el forward es constante.
+        """
+
+        T = np.asarray(T, dtype=float)
+        if len(self.tiempos) == 1:
+            return np.full(T.shape, self.forwards[0])
+
+        log_F = np.log(self.forwards)
+        pendientes = np.diff(log_F) / np.diff(self.tiempos)
+        i = np.clip(np.searchsorted(self.tiempos, T) - 1, 0, len(self.tiempos) - 2)
+
+        return np.exp(log_F[i] + pendientes[i] * (T - self.tiempos[i]))
+
+    def varianza_total(self, K, T):
+
+        """
+        Varianza total w(K, T). Para cada punto sólo se evalúan los dos vencimientos que lo rodean; antes del
+        primero y después del último la volatilidad de ese vencimiento se mantiene constante.
+        """
+
+        K, T = np.broadcast_arrays(np.asarray(K, dtype=float), np.asarray(T, dtype=float))
+        k = np.log(K / self.forward(T))
+
+        # Índices de los vencimientos vecinos y peso de interpolación
+        derecho = np.clip(np.searchsorted(self.tiempos, T), 0, len(self.tiempos) - 1)
+        izquierdo = np.clip(derecho - 1, 0, len(self.tiempos) - 1)
+        T_izq, T_der = self.tiempos[izquierdo], self.tiempos[derecho]
+        w_izq = varianza_svi(k, *self.parametros[izquierdo].T)
+        w_der = varianza_svi(k, *self.parametros[derecho].T)
+        with np.errstate(all="ignore"):
+            peso = np.where(T_der > T_izq, (T - T_izq) / (T_der - T_izq), 0.0)
+        w = (1 - peso) * w_izq + peso * w_der
+
+        # Extrapolación con volatilidad constante
+        w = np.where(T < self.tiempos[0], w_izq * T / self.tiempos[0], w)
+        w = np.where(T > self.tiempos[-1], w_der * T / self.tiempos[-1], w)
+
+        return w
+
+    def volatilidad(self, K, T):
+
+        """
+        Volatilidad implícita σ(K, T) = √(w / T).
+        """
+
+        return np.sqrt(np.maximum(self.varianza_total(K, T), 0) / T)
+
+    def precio(self, K, T, tipo="call"):
+
+        """
+        Precio europeo (Black sobre el forward) con la volatilidad de la superficie.
+        """
+
+        K, T = np.broadcast_arrays(np.asarray(K, dtype=float), np.asarray(T, dtype=float))
+        F = self.forward(T)
+        raiz_w = np.sqrt(np.maximum(self.varianza_total(K, T), 1e-12))
+        d1 = np.log(F / K) / raiz_w + 0.5 * raiz_w
+        d2 = d1 - raiz_w
+        signo = 1.0 if tipo == "call" else -1.0
+
+        return np.exp(-self.r * T) * signo * (F * norm.cdf(signo * d1) - K * norm.cdf(signo * d2))
+
+# Ajustar la superficie (sin el vencimiento del mismo día)
+inicio = time.perf_counter()
+superficie = VolSurface.ajustar(otm[otm["T"] > 1 / 365], r=tasa_libre_riesgo)
+print(f"Superficie SVI: {len(superficie.tiempos)} vencimientos ajustados en {time.perf_counter() - inicio:.2f} segundos")
+
+# Error del ajuste en los contratos observados (puntos de volatilidad)
+ajustados = otm[otm["T"].isin(superficie.tiempos)]
+error = superficie.volatilidad(ajustados["strike"].values, ajustados["T"].values) - ajustados["IV"].values
+print(f"Error Absoluto Mediano del Ajuste: {np.median(np.abs(error)) * 100:.3f} puntos %")
+
+# Comparar con el pivot_table original: ¿cuántos strikes sobreviven al dropna?
+tabla = otm.pivot_table(values="IV", index="strike", columns="Expiration").dropna()
+print(f"Strikes con IV de mercado: {otm['strike'].nunique()} | Strikes en el pivot_table con dropna: {len(tabla)}")
+
+# Consultar un millón de escenarios (K, T) arbitrarios en una sola llamada
+np.random.seed(42)
+num_escenarios = 1_000_000
+K_escenarios = np.random.uniform(0.7, 1.3, num_escenarios) * superficie.forwards[0]
+T_escenarios = np.random.uniform(7, 730, num_escenarios) / 365
+inicio = time.perf_counter()
+precios_escenarios = superficie.precio(K_escenarios, T_escenarios, tipo="put")
+print(f"{num_escenarios:,} puts valorados fuera de la malla en {(time.perf_counter() - inicio) * 1000:.0f} ms")
+
+# Graficar la superficie en una malla regular (strike × días al vencimiento)
+strikes = np.linspace(0.75, 1.2, 60) * superficie.forwards[0]
+dias = np.linspace(7, 540, 60)
+K_malla, D_malla = np.meshgrid(strikes, dias)
+vol_malla = superficie.volatilidad(K_malla, D_malla / 365)
+
+fig = plt.figure(figsize=(22, 8))
+ax = fig.add_subplot(1, 2, 1, projection="3d")
+ax.plot_surface(D_malla, K_malla, vol_malla, cmap="viridis", alpha=0.8)
+ax.set_title("Superficie de Volatilidad SVI")
+ax.set_xlabel("Días al Vencimiento")
+ax.set_ylabel("Strike")
+ax.set_zlabel("Vol Implícita")
+ax.view_init(elev=25, azim=60)
+
+ax = fig.add_subplot(1, 2, 2)
+for T in superficie.tiempos[[2, 8, 16, -1]]:
+    rebanada = otm[np.isclose(otm["T"], T)]
+    linea = ax.plot(rebanada["strike"], rebanada["IV"], "o", markersize=3, alpha=0.5)
+    ax.plot(strikes, superficie.volatilidad(strikes, T), color=linea[0].get_color(), label=f"{T * 365:.0f} días")
+ax.set_title("Ajuste SVI por Vencimiento")
+ax.set_xlabel("Strike")
+ax.set_ylabel("Vol Implícita")
+ax.set_xlim(strikes[0], strikes[-1])
+ax.legend()
+ax.grid()
+plt.show()
+
+# Recordatorio:
+#   - Una superficie paramétrica conserva toda la información de la cadena (no descarta strikes faltantes) y permite valorar
+#     cualquier combinación de strike y vencimiento, no sólo las listadas en el mercado.
+#   - Interpolar la varianza total (y no la volatilidad) entre vencimientos mantiene la varianza creciente en el tiempo
+#     cuando los ajustes de cada vencimiento lo son, una condición necesaria para que no haya arbitraje de calendario.
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+from scipy.optimize import least_squares
+import time
+
+# Reconstruir toda la superficie SVI ("12 - Superficie de Volatilidad Paramétrica (SVI)") en cada refresco intradía
+# es un desperdicio cuando sólo se movieron algunos vencimientos. Aquí la superficie guarda las cotizaciones de la
+# última instantánea y, por vencimiento, las cotizaciones con las que se validó el ajuste y el error de ese ajuste. En
+# cada instantánea nueva:
+#   1. Se comparan las cotizaciones con las de la instantánea anterior y con las de la última validación (sin calcular
+#      volatilidades): los vencimientos sin cambios ni deriva acumulada mayores a la tolerancia se conservan tal cual.
+#   2. En los vencimientos que cambiaron se calcula la volatilidad implícita y el error del ajuste anterior; sólo se
+#      reajustan (partiendo de los parámetros anteriores) los que empeoraron más allá de la tolerancia. Los demás
+#      quedan validados con las cotizaciones nuevas.
+
+# ===================================
+#  Funciones de Volatilidad y SVI
+# ===================================
+
+def precio_y_vega(S, K, T, r, sigma, q=0, es_call=True):
+
+    """
+    Calcula el precio y la Vega de opciones europeas con el Modelo de BSM para arreglos de contratos.
+    """
+
+    raiz_T = np.sqrt(T)
+    d1 = (np.log(S / K) + (r - q + 0.5 * sigma ** 2) * T) / (sigma * raiz_T)
+    d2 = d1 - sigma * raiz_T
+    call = S * np.exp(-q * T) * norm.cdf(d1) - K * np.exp(-r * T) * norm.cdf(d2)
+    put = K * np.exp(-r * T) * norm.cdf(-d2) - S * np.exp(-q * T) * norm.cdf(-d1)
+
+    return np.where(es_call, call, put), S * np.exp(-q * T) * norm.pdf(d1) * raiz_T
+
+def volatilidad_implicita(precios, S, K, T, r, q=0, es_call=True, iteraciones=50):
+
+    """
+    Volatilidad implícita de todos los contratos a la vez (Newton-Raphson protegido por bisección).
+    """
+
+    sigma = np.full(len(precios), 0.3)
+    bajo, alto = np.full(len(precios), 1e-4), np.full(len(precios), 5.0)
+    for _ in range(iteraciones):
+        precio, vega = precio_y_vega(S, K, T, r, sigma, q, es_call)
+        alto = np.where(precio > precios, sigma, alto)
+        bajo = np.where(precio <= precios, sigma, bajo)
+        with np.errstate(all="ignore"):
+            nuevo = sigma - (precio - precios) / vega
+        sigma = np.where((nuevo > bajo) & (nuevo < alto), nuevo, 0.5 * (bajo + alto))
+
+    return np.where((sigma > 1e-3) & (sigma < 4.99), sigma, np.nan)
+
+def varianza_svi(k, a, b, rho, m, s):
+
+    """
+    Varianza total del modelo SVI raw: w(k) = a + b·(ρ·(k - m) + √((k - m)² + s²)).
+    """
+
+    return a + b * (rho * (k - m) + np.sqrt((k - m) ** 2 + s ** 2))
+
+def jacobiano_svi(parametros, k):
+
+    """
+    Derivadas de w(k) respecto a (a, b, ρ, m, s), una fila por strike.
+    """
+
+    a, b, rho, m, s = parametros
+    x = k - m
+    raiz = np.sqrt(x ** 2 + s ** 2)
+
+    return np.column_stack([np.ones_like(k), rho * x + raiz, b * x, -b * (rho + x / raiz), b * s / raiz])
+
+def ajustar_svi(k, w, inicial=None):
+
+    """
+    Ajusta (a, b, ρ, m, s) de un vencimiento por mínimos cuadrados, partiendo de 'inicial' si se da.
+    """
+
+    limites = ([-w.max(), 1e-6, -0.999, 2 * k.min(), 1e-4], [w.max(), 10, 0.999, 2 * k.max(), 5])
+    if inicial is None or np.any(np.isnan(inicial)):
+        inicial = [0.5 * w.min(), 0.1, -0.5, 0.0, 0.1]
+    inicial = np.clip(inicial, limites[0], limites[1])
+    resultado = least_squares(lambda p: varianza_svi(k, *p) - w, inicial, jac=lambda p: jacobiano_svi(p, k),
+                              bounds=limites)
+
+    return resultado.x
+
+# ===================================
+#  Mantenimiento de la Superficie
+# ===================================
+
+def error_por_vencimiento(rebanadas, parametros):
+
+    """
+    Error cuadrático medio (en volatilidad) de los parámetros SVI de cada vencimiento sobre sus contratos.
+    """
+
+    p = parametros.reindex(rebanadas["Expiration"])
+    w = varianza_svi(rebanadas["k"].values, *[p[c].values for c in ["a", "b", "rho", "m", "s"]])
+    error = (np.sqrt(np.maximum(w, 0) / rebanadas["T"].values) - rebanadas["IV"].values) ** 2
+
+    return np.sqrt(pd.Series(error, index=rebanadas.index).groupby(rebanadas["Expiration"]).mean())
+
+def actualizar_superficie(cadena, estado=None, r=0.05, tolerancia_precio=0.01, tolerancia_deriva=0.05,
+                          tolerancia_error=0.002):
+
+    """
+    Actualiza la superficie con una instantánea nueva de la cadena (columnas Expiration, T, F, strike, Type y mid,
+    sólo opciones fuera del dinero). 'estado' es el resultado de la llamada anterior (None = ajuste completo).
+    Devuelve el estado nuevo y los vencimientos revisados y reajustados.
+    """
+
+    clave = pd.MultiIndex.from_arrays([cadena["Expiration"], cadena["strike"], cadena["Type"]])
+
+    # Paso 1: Vencimientos que cambiaron desde la instantánea anterior (incluye strikes nuevos o retirados) o cuyas
+    # cotizaciones derivaron, con cambios pequeños acumulados, más de 'tolerancia_deriva' desde la última validación
+    if estado is None:
+        revisar = cadena["Expiration"].unique()
+    else:
+        vistas = estado["vistas"]["mid"].reindex(clave).values
+        validadas = estado["cotizaciones"]["mid"].reindex(clave).values
+        cambio = ~(np.abs(cadena["mid"].values - vistas) <= tolerancia_precio)
+        deriva = np.abs(cadena["mid"].values - validadas) > tolerancia_deriva
+        conteo_nuevo = cadena.groupby("Expiration").size()
+        conteo_anterior = estado["vistas"].groupby(level=0).size().reindex(conteo_nuevo.index)
+        revisar = np.union1d(cadena.loc[cambio | deriva, "Expiration"].unique(),
+                             conteo_nuevo.index[conteo_nuevo.values != conteo_anterior.values])
+
+    # Paso 2: Volatilidad implícita sólo de los vencimientos a revisar
+    rebanadas = cadena[cadena["Expiration"].isin(revisar)].copy()
+    rebanadas["IV"] = volatilidad_implicita(rebanadas["mid"].values, rebanadas["F"].values * np.exp(-r * rebanadas["T"].values),
+                                            rebanadas["strike"].values, rebanadas["T"].values, r,
+                                            es_call=rebanadas["Type"].values == "call")
+    rebanadas = rebanadas.dropna(subset=["IV"])
+    rebanadas["k"] = np.log(rebanadas["strike"] / rebanadas["F"])
+    rebanadas["w"] = rebanadas["IV"] ** 2 * rebanadas["T"]
+
+    # Paso 3: Reajustar sólo si el ajuste anterior empeoró más allá de la tolerancia (o si no existe)
+    if estado is None:
+        parametros = pd.DataFrame(columns=["a", "b", "rho", "m", "s", "Error"], dtype=float)
+        reajustar = rebanadas["Expiration"].unique()
+    else:
+        parametros = estado["parametros"].copy()
+        error_actual = error_por_vencimiento(rebanadas, parametros)
+        limite = parametros["Error"].reindex(error_actual.index) + tolerancia_error
+        reajustar = error_actual.index[~(error_actual <= limite)]
+
+    for vencimiento, rebanada in rebanadas[rebanadas["Expiration"].isin(reajustar)].groupby("Expiration"):
+        inicial = parametros.loc[vencimiento, ["a", "b", "rho", "m", "s"]].values if vencimiento in parametros.index else None
+        parametros.loc[vencimiento, ["a", "b", "rho", "m", "s"]] = ajustar_svi(rebanada["k"].values, rebanada["w"].values,
+                                                                              inicial)
+    if len(reajustar) > 0:
+        ajustadas = rebanadas[rebanadas["Expiration"].isin(reajustar)]
+        parametros.loc[reajustar, "Error"] = error_por_vencimiento(ajustadas, parametros)
+
+    # Paso 4: Guardar la instantánea completa y, en los vencimientos revisados (reajustados o validados), las
+    # cotizaciones con las que se comprobó el ajuste; eliminar los vencidos
+    vistas = cadena.set_index(["Expiration", "strike", "Type"])[["mid"]].sort_index()
+    cotizaciones = vistas[vistas.index.get_level_values(0).isin(revisar)]
+    if estado is not None:
+        conservar = estado["cotizaciones"][~estado["cotizaciones"].index.get_level_values(0).isin(revisar)]
+        cotizaciones = pd.concat([conservar, cotizaciones])
+    vigentes = cadena["Expiration"].unique()
+    cotizaciones = cotizaciones[cotizaciones.index.get_level_values(0).isin(vigentes)].sort_index()
+    parametros = parametros[parametros.index.isin(vigentes)].sort_index()
+
+    return {"parametros": parametros, "cotizaciones": cotizaciones, "vistas": vistas}, revisar, reajustar
+
+# Leer Datos de Opciones (la fecha de valoración es la del último trade registrado)
+opciones_mercado = pd.read_csv("../datos/opciones.csv")
+fecha_datos = pd.to_datetime(opciones_mercado["lastTradeDate"]).max().tz_localize(None).normalize()
+opciones_mercado["T"] = ((pd.to_datetime(opciones_mercado["Expiration"]) - fecha_datos).dt.days + 1) / 365
+opciones_mercado["mid"] = (opciones_mercado["bid"] + opciones_mercado["ask"]) / 2
+opciones_mercado = opciones_mercado[(opciones_mercado["bid"] > 0) & (opciones_mercado["T"] > 1 / 365)]
+tasa_libre_riesgo = 0.05
+
+# Forward por vencimiento con la paridad put-call y sólo opciones fuera del dinero
+pares = opciones_mercado.pivot_table(values="mid", index=["Expiration", "strike"], columns="Type").dropna().reset_index()
+pares["T"] = pares["Expiration"].map(opciones_mercado.groupby("Expiration")["T"].first())
+pares["F"] = pares["strike"] + np.exp(tasa_libre_riesgo * pares["T"]) * (pares["call"] - pares["put"])
+opciones_mercado["F"] = opciones_mercado["Expiration"].map(pares.groupby("Expiration")["F"].median())
+cadena = opciones_mercado[((opciones_mercado["Type"] == "put") & (opciones_mercado["strike"] < opciones_mercado["F"])) |
+                          ((opciones_mercado["Type"] == "call") & (opciones_mercado["strike"] >= opciones_mercado["F"]))]
+cadena = cadena[["Expiration", "T", "F", "strike", "Type", "mid"]].reset_index(drop=True)
+
+# Instantánea 1: ajuste completo
+inicio = time.perf_counter()
+estado, revisados, reajustados = actualizar_superficie(cadena, r=tasa_libre_riesgo)
+tiempo_completo = time.perf_counter() - inicio
+print(f"Ajuste Completo: {len(reajustados)} vencimientos en {tiempo_completo:.2f} segundos")
+
+# Instantánea 2: ruido de medio centavo en toda la cadena, saltos de 2 centavos en el 2% de los contratos y un
+# movimiento real en 3 vencimientos (+1 punto de volatilidad)
+np.random.seed(42)
+nueva = cadena.copy()
+nueva["mid"] = nueva["mid"] + np.random.choice([-0.005, 0, 0.005], len(nueva))
+nueva["mid"] = (nueva["mid"] + np.where(np.random.rand(len(nueva)) < 0.02, np.random.choice([-0.02, 0.02], len(nueva)), 0)).clip(lower=0.01)
+movidos = nueva["Expiration"].unique()[[3, 10, 20]]
+filas = nueva["Expiration"].isin(movidos)
+S_movidos = nueva.loc[filas, "F"].values * np.exp(-tasa_libre_riesgo * nueva.loc[filas, "T"].values)
+iv_movidos = volatilidad_implicita(nueva.loc[filas, "mid"].values, S_movidos, nueva.loc[filas, "strike"].values,
+                                   nueva.loc[filas, "T"].values, tasa_libre_riesgo, es_call=nueva.loc[filas, "Type"].values == "call")
+nueva.loc[filas, "mid"] = np.where(np.isnan(iv_movidos), nueva.loc[filas, "mid"].values,
+                                   precio_y_vega(S_movidos, nueva.loc[filas, "strike"].values, nueva.loc[filas, "T"].values,
+                                                 tasa_libre_riesgo, iv_movidos + 0.01,
+                                                 es_call=nueva.loc[filas, "Type"].values == "call")[0])
+
+inicio = time.perf_counter()
+estado, revisados, reajustados = actualizar_superficie(nueva, estado, r=tasa_libre_riesgo)
+tiempo_incremental = time.perf_counter() - inicio
+print(f"Instantánea 2: {len(revisados)} vencimientos revisados, {len(reajustados)} reajustados en {tiempo_incremental:.2f} segundos")
+print("Vencimientos movidos:", list(movidos), "| Reajustados:", list(reajustados))
+
+# Instantánea 3: la misma cadena otra vez (no debe revisar ni reajustar nada)
+inicio = time.perf_counter()
+estado, revisados, reajustados = actualizar_superficie(nueva, estado, r=tasa_libre_riesgo)
+print(f"Instantánea 3: {len(revisados)} vencimientos revisados, {len(reajustados)} reajustados en "
+      f"{(time.perf_counter() - inicio) * 1000:.0f} ms")
+print("\nParámetros SVI (primeros vencimientos):")
+print(estado["parametros"].head().round(4))
+
+# Recordatorio:
+#   - Comparar cotizaciones es mucho más barato que calcular volatilidades y ajustar: el costo de cada refresco depende de
+#     cuántos vencimientos cambiaron y no del tamaño de la cadena.
+#   - Los cambios se miden contra la instantánea anterior, así que una cadena sin cambios no revisa nada. La deriva se
+#     mide contra las cotizaciones de la última validación: muchos cambios pequeños acumulados terminan revisándose, y
+#     el error se compara siempre con el del ajuste original, así que el deterioro acumulado obliga a reajustar.
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+import matplotlib.pyplot as plt
+import time
+
+# Nada valida la superficie de "05 - Superficie de Volatilidad". Una superficie de volatilidad implícita no tiene
+# arbitraje estático si, en términos de la varianza total w(k, T) = σ²·T con k = ln(K / F):
+#
+#   1. Calendario: w es no decreciente en T para cada k (un vencimiento más largo no puede valer menos).
+#   2. Mariposa: la densidad implícita es no negativa, lo que equivale a la condición de Durrleman
+#
+#        g(k) = (1 - k·w'/(2w))² - (w'²/4)·(1/w + 1/4) + w''/2 >= 0
+#
+# En una malla discreta la condición de mariposa se revisa con los precios: el call normalizado c(K) debe quedar por
+# debajo de la cuerda entre sus vecinos (segunda diferencia no negativa). Ambas condiciones se evalúan con operaciones
+# de arreglos sobre lotes de superficies con forma (superficies × vencimientos × strikes), de modo que se pueden
+# validar miles de superficies a la vez.
+
+def precio_normalizado(w, k):
+
+    """
+    Precio de un call (no descontado) dividido entre el forward, en función de la varianza total: c = N(d1) - e^k·N(d2).
+    """
+
+    raiz_w = np.sqrt(w)
+    d1 = -k / raiz_w + 0.5 * raiz_w
+
+    return norm.cdf(d1) - np.exp(k) * norm.cdf(d1 - raiz_w)
+
+def detectar_arbitraje(w, k, tolerancia=1e-8, tolerancia_mariposa=None):
+
+    """
+    Evalúa las condiciones de calendario y mariposa sobre una malla de varianza total w (..., vencimientos,
+    strikes) con log-moneyness k. Devuelve un diccionario con las máscaras de celdas marcadas y la función g de
+    Durrleman (diagnóstico de la densidad implícita). Las celdas con NaN (sin datos) nunca se marcan.
+
+    'tolerancia_mariposa' está en unidades del precio normalizado (fracción del forward) y puede ser un arreglo por
+    vencimiento, p. ej. un tick entre el forward: una mariposa con precio negativo menor a un tick no es negociable.
+    Si es None se usa 'tolerancia'.
+    """
+
+    # Calendario: caída de la varianza total respecto al vencimiento anterior
+    calendario = np.zeros(w.shape, dtype=bool)
+    calendario[..., 1:, :] = np.diff(w, axis=-2) < -tolerancia
+
+    # Mariposa: el precio normalizado del call debe quedar por debajo de la cuerda de sus vecinos (convexidad en K)
+    K = np.exp(k)
+    h_izq, h_der = K[1:-1] - K[:-2], K[2:] - K[1:-1]
+    c = precio_normalizado(w, k)
+    mariposa = np.zeros(w.shape, dtype=bool)
+    exceso = c[..., 1:-1] - (h_der * c[..., :-2] + h_izq * c[..., 2:]) / (h_izq + h_der)
+    mariposa[..., 1:-1] = exceso > (tolerancia if tolerancia_mariposa is None else tolerancia_mariposa)
+
+    # Condición de Durrleman con derivadas por diferencias finitas
+    w1 = np.gradient(w, k, axis=-1)
+    w2 = np.gradient(w1, k, axis=-1)
+    with np.errstate(all="ignore"):
+        g = (1 - k * w1 / (2 * w)) ** 2 - (w1 ** 2 / 4) * (1 / w + 1 / 4) + w2 / 2
+
+    return {"Calendario": calendario, "Mariposa": mariposa, "g": g}
+
+def varianza_desde_precio(c, k, iteraciones=60):
+
+    """
+    Invierte precio_normalizado() para todas las celdas a la vez con bisección (el precio es creciente en w).
+    """
+
+    bajo, alto = np.full(c.shape, 1e-10), np.full(c.shape, 4.0)
+    for _ in range(iteraciones):
+        medio = 0.5 * (bajo + alto)
+        exceso = precio_normalizado(medio, k) > c
+        alto = np.where(exceso, medio, alto)
+        bajo = np.where(exceso, bajo, medio)
+
+    return 0.5 * (bajo + alto)
+
+def reparar_arbitraje(w, k, max_iter=10, iteraciones_convexidad=200, tolerancia=1e-8):
+
+    """
+    Repara la superficie alternando dos proyecciones hasta que no queden celdas marcadas:
+      - Mariposa: en cada vencimiento el precio del call debe ser convexo en K; cada precio se reemplaza por el
+        mínimo entre él y la cuerda de sus vecinos, lo que converge a la envolvente convexa inferior.
+      - Calendario: w debe ser no decreciente en T (máximo acumulado a lo largo de los vencimientos).
+    Devuelve la superficie, las iteraciones usadas y las celdas que siguen marcadas (todas en False si convergió
+    antes de 'max_iter').
+    """
+
+    w = w.copy()
+    K = np.exp(k)
+    h_izq, h_der = K[1:-1] - K[:-2], K[2:] - K[1:-1]
+    for iteracion in range(max_iter + 1):
+        marcas = detectar_arbitraje(w, k, tolerancia)
+        pendientes = marcas["Mariposa"] | marcas["Calendario"]
+        if not pendientes.any() or iteracion == max_iter:
+            break
+
+        # Mariposa: convexificar los precios (fmin ignora las cuerdas con NaN en los bordes de los datos)
+        c = precio_normalizado(w, k)
+        for _ in range(iteraciones_convexidad):
+            cuerda = (h_der * c[..., :-2] + h_izq * c[..., 2:]) / (h_izq + h_der)
+            c[..., 1:-1] = np.fmin(c[..., 1:-1], cuerda)
+        w = np.where(np.isfinite(w), varianza_desde_precio(c, k), np.nan)
+
+        # Calendario: máximo acumulado a lo largo de los vencimientos (fmax ignora los NaN)
+        w = np.fmax.accumulate(w, axis=-2)
+
+    return w, iteracion, pendientes
+
+# Leer Datos de Opciones (la fecha de valoración es la del último trade registrado)
+opciones_mercado = pd.read_csv("../datos/opciones.csv")
+fecha_datos = pd.to_datetime(opciones_mercado["lastTradeDate"]).max().tz_localize(None).normalize()
+opciones_mercado["T"] = ((pd.to_datetime(opciones_mercado["Expiration"]) - fecha_datos).dt.days + 1) / 365
+opciones_mercado["mid"] = (opciones_mercado["bid"] + opciones_mercado["ask"]) / 2
+opciones_mercado = opciones_mercado[opciones_mercado["bid"] > 0]
+tasa_libre_riesgo = 0.05
+
+# Forward por vencimiento con la paridad put-call (mediana sobre los strikes cotizados en ambas puntas)
+pares = opciones_mercado.pivot_table(values="mid", index=["Expiration", "strike"], columns="Type").dropna().reset_index()
+pares["T"] = pares["Expiration"].map(opciones_mercado.groupby("Expiration")["T"].first())
+pares["F"] = pares["strike"] + np.exp(tasa_libre_riesgo * pares["T"]) * (pares["call"] - pares["put"])
+opciones_mercado["F"] = opciones_mercado["Expiration"].map(pares.groupby("Expiration")["F"].median())
+
+# Superficie de mercado con la volatilidad de Yahoo (la misma de "05 - Superficie de Volatilidad"), sólo fuera del dinero
+otm = opciones_mercado[(((opciones_mercado["Type"] == "put") & (opciones_mercado["strike"] < opciones_mercado["F"])) |
+                        ((opciones_mercado["Type"] == "call") & (opciones_mercado["strike"] >= opciones_mercado["F"]))) &
+                       (opciones_mercado["impliedVolatility"] > 0.01) & (opciones_mercado["T"] > 7 / 365)].copy()
+otm["k"] = np.log(otm["strike"] / otm["F"])
+otm["w"] = otm["impliedVolatility"] ** 2 * otm["T"]
+
+# Pasar cada vencimiento a una malla común de k (NaN fuera del rango cotizado)
+k = np.linspace(-0.3, 0.2, 51)
+tiempos = otm.groupby("Expiration")["T"].first()
+tick = 0.01 / otm.groupby("Expiration")["F"].first().values[:, None]
+malla = np.vstack([np.interp(k, rebanada["k"], rebanada["w"], left=np.nan, right=np.nan)
+                   for _, rebanada in otm.sort_values("k").groupby("Expiration")])
+print(f"Malla de Mercado: {malla.shape[0]} vencimientos × {malla.shape[1]} strikes")
+
+# Validar la superficie de mercado (mariposas de al menos un tick de 0.01 sobre el forward de cada vencimiento)
+marcas = detectar_arbitraje(malla, k, tolerancia_mariposa=tick)
+celdas = np.isfinite(malla).sum()
+print(f"Celdas con Arbitraje de Calendario: {marcas['Calendario'].sum()} de {celdas}")
+print(f"Celdas con Arbitraje de Mariposa: {marcas['Mariposa'].sum()} de {celdas}")
+print("Vencimientos con Arbitraje de Calendario:", list(tiempos.index[marcas["Calendario"].any(axis=1)]))
+
+# Reparar y volver a validar
+superficie_reparada, iteraciones, pendientes = reparar_arbitraje(malla, k)
+marcas_reparadas = detectar_arbitraje(superficie_reparada, k)
+if pendientes.any():
+    print(f"Aviso: la reparación se detuvo con {pendientes.sum()} celdas todavía marcadas")
+cambio = np.nanmax(np.abs(np.sqrt(superficie_reparada / tiempos.values[:, None]) - np.sqrt(malla / tiempos.values[:, None])))
+print(f"\nDespués de Reparar ({iteraciones} iteraciones): Calendario = {marcas_reparadas['Calendario'].sum()} | "
+      f"Mariposa = {marcas_reparadas['Mariposa'].sum()} | Cambio Máximo de Volatilidad = {cambio * 100:.2f} puntos %")
+
+# Validar un lote de 2,000 superficies (la reparada con cambios de nivel por superficie y por vencimiento, como
+# instantáneas distintas) en una sola llamada. Los factores son menores a 1 y crecientes en T: subir w saca de la
+# envolvente convexa los tramos en que la reparación dejó el precio lineal en K (mariposas reales de hasta 1e-4 del
+# forward con un factor de 1.25), bajarlo no, y un factor creciente en T no crea arbitraje de calendario
+np.random.seed(42)
+num_superficies = 2000
+lote = superficie_reparada[None, :, :] * np.exp(-np.abs(np.random.normal(0, 0.05, (num_superficies, 1, 1))) - np.cumsum(
+    np.abs(np.random.normal(0, 0.005, (num_superficies, malla.shape[0], 1)))[:, ::-1], axis=1)[:, ::-1])
+
+# Inyectar arbitraje a propósito en dos grupos distintos del 10% de las superficies:
+#   - Calendario: un vencimiento por debajo del anterior.
+#   - Mariposa: el precio de un strike 5 ticks por encima de la cuerda de sus vecinos (después se toma el máximo
+#     acumulado en T para no crear también arbitraje de calendario).
+orden = np.random.permutation(num_superficies)
+inyectadas_calendario, inyectadas_mariposa = np.split(orden[:num_superficies // 5], 2)
+vencimiento = np.random.randint(1, malla.shape[0], len(inyectadas_calendario))
+lote[inyectadas_calendario, vencimiento] = 0.95 * lote[inyectadas_calendario, vencimiento - 1]
+
+con_datos = np.isfinite(superficie_reparada)
+candidatas = np.argwhere(con_datos[:, :-2] & con_datos[:, 1:-1] & con_datos[:, 2:])
+vencimiento, strike = candidatas[np.random.randint(0, len(candidatas), len(inyectadas_mariposa))].T
+K = np.exp(k)
+filas = np.arange(len(inyectadas_mariposa))
+c = precio_normalizado(lote[inyectadas_mariposa, vencimiento], k)
+h_izq, h_der = K[strike + 1] - K[strike], K[strike + 2] - K[strike + 1]
+cuerda = (h_der * c[filas, strike] + h_izq * c[filas, strike + 2]) / (h_izq + h_der)
+c[filas, strike + 1] = cuerda + 5 * tick[vencimiento, 0]
+lote[inyectadas_mariposa, vencimiento] = np.where(con_datos[vencimiento], varianza_desde_precio(c, k), np.nan)
+lote[inyectadas_mariposa] = np.fmax.accumulate(lote[inyectadas_mariposa], axis=1)
+
+inicio = time.perf_counter()
+marcas_lote = detectar_arbitraje(lote, k, tolerancia_mariposa=tick)
+tiempo = time.perf_counter() - inicio
+print(f"\nLote de {num_superficies} superficies ({lote.size:,} celdas) validado en {tiempo * 1000:.0f} ms "
+      f"({tiempo / num_superficies * 1e6:.0f} µs por superficie)")
+for nombre, inyectadas in [("Calendario", inyectadas_calendario), ("Mariposa", inyectadas_mariposa)]:
+    marcadas = marcas_lote[nombre].any(axis=(1, 2))
+    print(f"Arbitraje de {nombre} Inyectado: {len(inyectadas)} | Detectado: {marcadas[inyectadas].sum()} | "
+          f"Falsos Positivos: {np.delete(marcadas, inyectadas).sum()}")
+
+# Graficar las celdas marcadas en la superficie de mercado
+fig, ax = plt.subplots(1, 2, figsize=(22, 6))
+for eje, (nombre, mascara) in zip(ax, [("Calendario", marcas["Calendario"]), ("Mariposa", marcas["Mariposa"])]):
+    eje.imshow(np.where(np.isfinite(malla), mascara, np.nan), aspect="auto", cmap="coolwarm", origin="lower",
+               extent=[k[0], k[-1], 0, len(tiempos)])
+    eje.set_title(f"Celdas con Arbitraje de {nombre}")
+    eje.set_xlabel("Log-Moneyness ln(K/F)")
+    eje.set_ylabel("Vencimiento (índice)")
+plt.show()
+
+# Recordatorio:
+#   - Una superficie con arbitraje estático implica precios negativos de mariposas o calendarios: cualquier modelo que la
+#     use (Dupire, valoración de exóticos, cobertura) hereda esos precios imposibles.
+#   - La volatilidad de Yahoo se calcula contrato por contrato y con precios que no son simultáneos, por eso una superficie
+#     construida directamente con ella suele presentar violaciones que deben detectarse antes de guardarla.
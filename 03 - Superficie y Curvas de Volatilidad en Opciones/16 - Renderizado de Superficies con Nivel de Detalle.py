@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+import numpy as np
+import pandas as pd
+import matplotlib
+import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
+import tempfile
+import os
+import time
+
+# En "05 - Superficie de Volatilidad" se llama a plot_surface ocho veces con la malla completa y dpi=300, y
+# crear_mallas() vuelve a construir el meshgrid para cada lado. Aquí la malla se prepara una sola vez por
+# superficie (y se guarda en caché), se reduce a un presupuesto de vértices conservando más strikes donde la
+# curvatura es mayor y cerca del dinero, y todas las vistas se dibujan desde esa misma malla. Para reportes de muchos
+# activos, las figuras se guardan en archivos con el backend no interactivo "Agg" y en varios procesos.
+
+# Caché de mallas preparadas: {(clave, huella de la tabla, presupuesto, atm, ancho_atm): (X, Y, Z)}
+cache_mallas = {}
+
+def indices_por_importancia(importancia, n):
+
+    """
+    Elige n índices (siempre incluye el primero y el último) con densidad proporcional a la importancia:
+    se toman cuantiles equiespaciados de la importancia acumulada.
+    """
+
+    acumulada = np.cumsum(importancia)
+    acumulada = (acumulada - acumulada[0]) / (acumulada[-1] - acumulada[0])
+    indices = np.searchsorted(acumulada, np.linspace(0, 1, n))
+
+    return np.unique(np.clip(indices, 0, len(importancia) - 1))
+
+def preparar_malla(tabla, presupuesto=1200, atm=None, ancho_atm=0.05, clave=None):
+
+    """
+    Convierte una tabla (strikes × días al vencimiento) en las mallas X, Y, Z para plot_surface con, a lo más,
+    'presupuesto' vértices. Los strikes se eligen según la curvatura de la sonrisa (segunda diferencia promedio)
+    más un peso gaussiano alrededor del strike ATM; los vencimientos se reparten de manera uniforme.
+    La caché usa 'clave' junto con el contenido de la tabla, así que una tabla actualizada no recibe la malla anterior.
+    """
+
+    # Usar la caché si la malla ya se preparó con la misma tabla y los mismos parámetros
+    if clave is not None:
+        huella = hash((tabla.values.tobytes(), tabla.index.values.tobytes(), tabla.columns.values.tobytes()))
+        clave = (clave, huella, presupuesto, atm, ancho_atm)
+        if clave in cache_mallas:
+            return cache_mallas[clave]
+
+    strikes = tabla.index.values.astype(float)
+    dias = tabla.columns.values.astype(float)
+    Z = tabla.values
+
+    # Número de strikes y vencimientos que caben en el presupuesto (misma proporción que la tabla)
+    n_dias = int(min(len(dias), max(2, np.sqrt(presupuesto * len(dias) / len(strikes)))))
+    n_strikes = int(min(len(strikes), max(2, presupuesto // n_dias)))
+
+    # Importancia de cada strike: curvatura de la sonrisa + cercanía al dinero
+    curvatura = np.zeros(len(strikes))
+    curvatura[1:-1] = np.nanmean(np.abs(Z[:-2] - 2 * Z[1:-1] + Z[2:]), axis=1)
+    atm = np.median(strikes) if atm is None else atm
+    cercania = np.exp(-0.5 * ((strikes / atm - 1) / ancho_atm) ** 2)
+    importancia = curvatura / max(curvatura.sum(), 1e-12) + cercania / cercania.sum() + 0.5 / len(strikes)
+
+    # Submuestrear filas y columnas y construir las mallas una sola vez
+    filas = indices_por_importancia(importancia, n_strikes)
+    columnas = np.unique(np.linspace(0, len(dias) - 1, n_dias).round().astype(int))
+    X, Y = np.meshgrid(dias[columnas], strikes[filas])
+    malla = (X, Y, Z[np.ix_(filas, columnas)])
+    if clave is not None:
+        cache_mallas[clave] = malla
+
+    return malla
+
+def graficar_vistas(mallas, titulo, archivo=None, elevs=(30, 20, 20, 30), azims=(60, 60, 120, 300), dpi=100):
+
+    """
+    Dibuja las 4 vistas de cada malla (una fila por malla, p. ej. calls y puts) en una sola figura. Si se da
+    'archivo', la figura se guarda y se cierra en lugar de mostrarse.
+    """
+
+    fig = plt.figure(figsize=(22, 6 * len(mallas)), dpi=dpi)
+    for fila, (nombre, (X, Y, Z), mapa) in enumerate(mallas):
+        for i in range(len(elevs)):
+            ax = fig.add_subplot(len(mallas), len(elevs), fila * len(elevs) + i + 1, projection="3d")
+            ax.plot_surface(X, Y, Z, cmap=mapa, alpha=0.8, rstride=1, cstride=1)
+            ax.set_title(f"{nombre} - Vista {i + 1}")
+            ax.set_xlabel("Días al Vencimiento")
+            ax.set_ylabel("Strike")
+            ax.set_zlabel("Vol Implícita")
+            ax.view_init(elev=elevs[i], azim=azims[i])
+    plt.suptitle(titulo, fontsize=16)
+    plt.tight_layout()
+
+    if archivo is None:
+        plt.show()
+    else:
+        fig.savefig(archivo)
+        plt.close(fig)
+
+def renderizar_reporte(tarea):
+
+    """
+    Genera el archivo de un activo en un proceso aparte: tarea = (ticker, tabla_calls, tabla_puts, atm, carpeta).
+    """
+
+    matplotlib.use("Agg")
+    ticker, tabla_calls, tabla_puts, atm, carpeta = tarea
+    mallas = [("Calls", preparar_malla(tabla_calls, atm=atm), "viridis"),
+              ("Puts", preparar_malla(tabla_puts, atm=atm), "plasma")]
+    archivo = os.path.join(carpeta, f"superficie_{ticker}.png")
+    graficar_vistas(mallas, f"Superficie de Volatilidad Implícita - {ticker}", archivo=archivo)
+
+    return archivo
+
+def tabla_superficie(opciones, tipo):
+
+    """
+    Tabla strikes × días al vencimiento de un tipo de opción. En lugar de descartar los strikes que faltan en algún
+    vencimiento (dropna), se interpolan dentro de cada vencimiento (según el valor del strike, pues no están
+    equiespaciados) y sólo se eliminan los que quedan vacíos.
+    """
+
+    tabla = opciones[opciones["Type"] == tipo].pivot_table(values="impliedVolatility", index="strike", columns="daysToExp")
+
+    return tabla.interpolate(method="index", axis=0, limit_area="inside").dropna()
+
+if __name__ == "__main__":
+
+    # Leer Datos de Opciones (la fecha de valoración es la del último trade registrado)
+    opciones_mercado = pd.read_csv("../datos/opciones.csv")
+    fecha_datos = pd.to_datetime(opciones_mercado["lastTradeDate"]).max().tz_localize(None).normalize()
+    opciones_mercado["daysToExp"] = (pd.to_datetime(opciones_mercado["Expiration"]) - fecha_datos).dt.days + 1
+    opciones_mercado = opciones_mercado[opciones_mercado["impliedVolatility"] > 0.01]
+    precio_atm = opciones_mercado.loc[opciones_mercado["inTheMoney"].astype(bool) & (opciones_mercado["Type"] == "call"),
+                                      "strike"].max()
+
+    surface_call = tabla_superficie(opciones_mercado, "call")
+    surface_put = tabla_superficie(opciones_mercado, "put")
+    print(f"Malla Completa (Calls): {surface_call.size} vértices | (Puts): {surface_put.size} vértices")
+
+    # Malla completa vs malla preparada (4 vistas de calls y puts en archivos de una carpeta temporal)
+    matplotlib.use("Agg")
+    carpeta = tempfile.mkdtemp(prefix="reportes_superficies_")
+
+    inicio = time.perf_counter()
+    completas = [("Calls", (*np.meshgrid(surface_call.columns, surface_call.index), surface_call.values), "viridis"),
+                 ("Puts", (*np.meshgrid(surface_put.columns, surface_put.index), surface_put.values), "plasma")]
+    graficar_vistas(completas, "Malla Completa (dpi=300)", archivo=os.path.join(carpeta, "completa.png"), dpi=300)
+    tiempo_completo = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    preparadas = [("Calls", preparar_malla(surface_call, atm=precio_atm, clave=("SPY", "call")), "viridis"),
+                  ("Puts", preparar_malla(surface_put, atm=precio_atm, clave=("SPY", "put")), "plasma")]
+    graficar_vistas(preparadas, "Malla Preparada", archivo=os.path.join(carpeta, "preparada.png"))
+    tiempo_preparado = time.perf_counter() - inicio
+    print(f"Vértices por Malla Preparada: {preparadas[0][1][2].size} (Calls) | {preparadas[1][1][2].size} (Puts)")
+    print(f"Render Completo: {tiempo_completo:.2f} s | Render Preparado: {tiempo_preparado:.2f} s")
+
+    # La segunda vez la malla sale de la caché
+    inicio = time.perf_counter()
+    preparar_malla(surface_call, atm=precio_atm, clave=("SPY", "call"))
+    print(f"Malla desde la Caché: {(time.perf_counter() - inicio) * 1e6:.0f} µs")
+
+    # Reporte de 100 activos (la superficie de SPY con cambios de nivel, como activos distintos) en varios procesos
+    np.random.seed(42)
+    num_activos = 100
+    tareas = [(f"TICKER_{i:03d}", surface_call * factor, surface_put * factor, precio_atm, carpeta)
+              for i, factor in enumerate(np.random.uniform(0.8, 2.0, num_activos))]
+    inicio = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as ejecutor:
+        archivos = list(ejecutor.map(renderizar_reporte, tareas))
+    print(f"\n{len(archivos)} reportes generados en {time.perf_counter() - inicio:.1f} segundos con {os.cpu_count()} procesos")
+    print(f"Archivos en: {carpeta}")
+
+# Recordatorio:
+#   - El tiempo de plot_surface crece con el número de vértices y el de guardar la figura con el dpi: reducir la malla a unos
+#     miles de vértices (con más detalle donde la sonrisa se curva) no cambia la lectura de la superficie.
+#   - El backend "Agg" dibuja sin abrir ventanas, lo que permite generar reportes en procesos paralelos.
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+import matplotlib.pyplot as plt
+import time
+
+# "03 - Sesgo de Volatilidad" descarga toda la cadena de SPY pero sólo grafica formas de sesgo simuladas. Los
+# operadores miden el sesgo en espacio delta, que hace comparables vencimientos y activos distintos:
+#
+#   ATM   = σ(Δ = 50)
+#   RR 25 = σ(call 25Δ) - σ(put 25Δ)                  (Risk Reversal: inclinación de la sonrisa)
+#   BF 25 = (σ(call 25Δ) + σ(put 25Δ)) / 2 - ATM       (Butterfly: curvatura de la sonrisa)
+#
+# Aquí cada contrato fuera del dinero se pasa a delta de call equivalente (un put de -25Δ es un call de 75Δ) y se
+# interpola la volatilidad en todos los vencimientos de todos los activos con una sola llamada a np.interp.
+
+def volatilidad_implicita(precios, S, K, T, r, q=0, es_call=True, iteraciones=50):
+
+    """
+    Volatilidad implícita de todos los contratos a la vez (Newton-Raphson protegido por bisección).
+    """
+
+    sigma = np.full(len(precios), 0.3)
+    bajo, alto = np.full(len(precios), 1e-4), np.full(len(precios), 5.0)
+    for _ in range(iteraciones):
+        raiz_T = np.sqrt(T)
+        d1 = (np.log(S / K) + (r - q + 0.5 * sigma ** 2) * T) / (sigma * raiz_T)
+        d2 = d1 - sigma * raiz_T
+        call = S * np.exp(-q * T) * norm.cdf(d1) - K * np.exp(-r * T) * norm.cdf(d2)
+        put = K * np.exp(-r * T) * norm.cdf(-d2) - S * np.exp(-q * T) * norm.cdf(-d1)
+        precio = np.where(es_call, call, put)
+        vega = S * np.exp(-q * T) * norm.pdf(d1) * raiz_T
+        alto = np.where(precio > precios, sigma, alto)
+        bajo = np.where(precio <= precios, sigma, bajo)
+        with np.errstate(all="ignore"):
+            nuevo = sigma - (precio - precios) / vega
+        sigma = np.where((nuevo > bajo) & (nuevo < alto), nuevo, 0.5 * (bajo + alto))
+
+    return np.where((sigma > 1e-3) & (sigma < 4.99), sigma, np.nan)
+
+def metricas_sesgo(cadena, deltas=(0.10, 0.25)):
+
+    """
+    Calcula ATM, Risk Reversals y Butterflies de cada (Ticker, Expiration) de la cadena (columnas Ticker,
+    Expiration, T, F, strike e IV; sólo contratos fuera del dinero). Todos los vencimientos se interpolan a la
+    vez: la clave "número de vencimiento + delta" es creciente en toda la cadena ordenada.
+    """
+
+    # Delta forward de call equivalente: N(d1) es decreciente en el strike dentro de cada vencimiento
+    raiz_w = cadena["IV"].values * np.sqrt(cadena["T"].values)
+    delta_call = norm.cdf(np.log(cadena["F"].values / cadena["strike"].values) / raiz_w + 0.5 * raiz_w)
+
+    # Número de vencimiento y clave de interpolación ordenada
+    grupos = cadena.groupby(["Ticker", "Expiration"], sort=True)
+    rebanada = grupos.ngroup().values
+    orden = np.lexsort((delta_call, rebanada))
+    clave = rebanada[orden] + delta_call[orden]
+    volatilidad = cadena["IV"].values[orden]
+
+    # Deltas objetivo de cada vencimiento: calls OTM (Δ < 0.5), ATM y puts OTM expresados como 1 - |Δ|
+    objetivos = np.array(sorted({*deltas, 0.5, *(1 - d for d in deltas)}))
+    consulta = np.arange(grupos.ngroups)[:, None] + objetivos[None, :]
+    vol_objetivo = np.interp(consulta.ravel(), clave, volatilidad).reshape(consulta.shape)
+
+    # Descartar las consultas que caen fuera del rango de delta cotizado en su propio vencimiento
+    posicion = np.searchsorted(clave, consulta.ravel()).reshape(consulta.shape)
+    dentro = (posicion > 0) & (posicion < len(clave))
+    posicion = np.clip(posicion, 1, len(clave) - 1)
+    mismo = (rebanada[orden][posicion - 1] == np.arange(grupos.ngroups)[:, None]) & \
+            (rebanada[orden][posicion] == np.arange(grupos.ngroups)[:, None])
+    vol_objetivo = np.where(dentro & mismo, vol_objetivo, np.nan)
+    vol = dict(zip(np.round(objetivos, 4), vol_objetivo.T))
+
+    # Métricas por vencimiento
+    resultado = pd.DataFrame({"T": grupos["T"].first().values, "ATM": vol[0.5]}, index=grupos["T"].first().index)
+    for d in deltas:
+        call_otm, put_otm = vol[round(d, 4)], vol[round(1 - d, 4)]
+        resultado[f"RR {d * 100:.0f}"] = call_otm - put_otm
+        resultado[f"BF {d * 100:.0f}"] = 0.5 * (call_otm + put_otm) - vol[0.5]
+
+    return resultado
+
+# Leer Datos de Opciones (la fecha de valoración es la del último trade registrado)
+opciones_mercado = pd.read_csv("../datos/opciones.csv")
+fecha_datos = pd.to_datetime(opciones_mercado["lastTradeDate"]).max().tz_localize(None).normalize()
+opciones_mercado["T"] = ((pd.to_datetime(opciones_mercado["Expiration"]) - fecha_datos).dt.days + 1) / 365
+opciones_mercado["mid"] = (opciones_mercado["bid"] + opciones_mercado["ask"]) / 2
+opciones_mercado = opciones_mercado[(opciones_mercado["bid"] > 0) & (opciones_mercado["T"] > 1 / 365)]
+tasa_libre_riesgo = 0.05
+
+# Forward por vencimiento con la paridad put-call (mediana sobre los strikes cotizados en ambas puntas)
+pares = opciones_mercado.pivot_table(values="mid", index=["Expiration", "strike"], columns="Type").dropna().reset_index()
+pares["T"] = pares["Expiration"].map(opciones_mercado.groupby("Expiration")["T"].first())
+pares["F"] = pares["strike"] + np.exp(tasa_libre_riesgo * pares["T"]) * (pares["call"] - pares["put"])
+opciones_mercado["F"] = opciones_mercado["Expiration"].map(pares.groupby("Expiration")["F"].median())
+
+# Contratos fuera del dinero con su volatilidad implícita (precio medio)
+otm = opciones_mercado[((opciones_mercado["Type"] == "put") & (opciones_mercado["strike"] < opciones_mercado["F"])) |
+                       ((opciones_mercado["Type"] == "call") & (opciones_mercado["strike"] >= opciones_mercado["F"]))].copy()
+otm["IV"] = volatilidad_implicita(otm["mid"].values, otm["F"].values * np.exp(-tasa_libre_riesgo * otm["T"].values),
+                                  otm["strike"].values, otm["T"].values, tasa_libre_riesgo,
+                                  es_call=otm["Type"].values == "call")
+otm = otm.dropna(subset=["IV"])[["Expiration", "T", "F", "strike", "IV"]]
+otm["Ticker"] = "SPY"
+
+# Métricas de SPY
+sesgo_spy = metricas_sesgo(otm)
+print("Métricas de Sesgo de SPY (puntos %):")
+print((sesgo_spy.drop(columns="T") * 100).round(2).head(12).to_string())
+
+# Universo de 300 activos (la cadena de SPY con otro nivel y otra inclinación, como activos distintos)
+np.random.seed(42)
+num_activos = 300
+nivel = np.random.uniform(0.8, 2.5, num_activos)
+inclinacion = np.random.uniform(-0.3, 0.3, num_activos)
+universo = pd.concat([otm.assign(Ticker=f"TICKER_{i:03d}",
+                                 IV=otm["IV"] * nivel[i] + inclinacion[i] * np.log(otm["strike"] / otm["F"]))
+                      for i in range(num_activos)], ignore_index=True)
+universo = universo[universo["IV"] > 0.01]
+
+inicio = time.perf_counter()
+sesgo_universo = metricas_sesgo(universo)
+tiempo = time.perf_counter() - inicio
+print(f"\nUniverso: {len(universo):,} contratos, {len(sesgo_universo):,} vencimientos en {tiempo * 1000:.0f} ms")
+print((sesgo_universo.drop(columns="T") * 100).round(2).head().to_string())
+
+# Graficar la estructura temporal del sesgo de SPY
+fig, ax = plt.subplots(1, 2, figsize=(22, 6))
+dias = sesgo_spy["T"].values * 365
+ax[0].plot(dias, sesgo_spy["RR 25"] * 100, marker="o", label="RR 25")
+ax[0].plot(dias, sesgo_spy["RR 10"] * 100, marker="o", label="RR 10")
+ax[0].set_title("Risk Reversals de SPY")
+ax[1].plot(dias, sesgo_spy["BF 25"] * 100, marker="o", label="BF 25")
+ax[1].plot(dias, sesgo_spy["BF 10"] * 100, marker="o", label="BF 10")
+ax[1].set_title("Butterflies de SPY")
+for eje in ax:
+    eje.set_xscale("log")
+    eje.set_xlabel("Días al Vencimiento")
+    eje.set_ylabel("Puntos de Volatilidad (%)")
+    eje.legend()
+    eje.grid()
+plt.show()
+
+# Recordatorio:
+#   - Un Risk Reversal negativo indica que los puts OTM son más caros que los calls OTM (sesgo inverso típico de índices y
+#     acciones); el Butterfly mide cuánto más caras son las alas que el centro de la sonrisa.
+#   - Medir en delta en lugar de strike hace comparables vencimientos cortos y largos, y activos con precios y volatilidades
+#     muy distintos.
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+import matplotlib.pyplot as plt
+import time
+
+# "04 - Estructura Temporal en Opciones" elige un solo strike para todos los vencimientos (el más cercano al precio
+# actual en todo el DataFrame), así que en los vencimientos largos ese strike ya no está en el dinero respecto al
+# forward. Aquí, para cada vencimiento de cada activo, se interpola la volatilidad en el strike ATM-forward (K = F)
+# y, con la varianza total w = σ²·T, se obtiene la varianza forward entre vencimientos consecutivos:
+#
+#   σ²_forward(T1, T2) = (w(T2) - w(T1)) / (T2 - T1)
+#
+# que es la volatilidad que el mercado descuenta para el periodo entre ambos vencimientos.
+
+def volatilidad_implicita(precios, S, K, T, r, q=0, es_call=True, iteraciones=50):
+
+    """
+    Volatilidad implícita de todos los contratos a la vez (Newton-Raphson protegido por bisección).
+    """
+
+    sigma = np.full(len(precios), 0.3)
+    bajo, alto = np.full(len(precios), 1e-4), np.full(len(precios), 5.0)
+    for _ in range(iteraciones):
+        raiz_T = np.sqrt(T)
+        d1 = (np.log(S / K) + (r - q + 0.5 * sigma ** 2) * T) / (sigma * raiz_T)
+        d2 = d1 - sigma * raiz_T
+        call = S * np.exp(-q * T) * norm.cdf(d1) - K * np.exp(-r * T) * norm.cdf(d2)
+        put = K * np.exp(-r * T) * norm.cdf(-d2) - S * np.exp(-q * T) * norm.cdf(-d1)
+        precio = np.where(es_call, call, put)
+        vega = S * np.exp(-q * T) * norm.pdf(d1) * raiz_T
+        alto = np.where(precio > precios, sigma, alto)
+        bajo = np.where(precio <= precios, sigma, bajo)
+        with np.errstate(all="ignore"):
+            nuevo = sigma - (precio - precios) / vega
+        sigma = np.where((nuevo > bajo) & (nuevo < alto), nuevo, 0.5 * (bajo + alto))
+
+    return np.where((sigma > 1e-3) & (sigma < 4.99), sigma, np.nan)
+
+def estructura_temporal_atm(cadena):
+
+    """
+    Volatilidad ATM-forward, varianza total y volatilidad forward de cada (Ticker, Expiration) de la cadena
+    (columnas Ticker, Expiration, T, F, strike e IV). Los strikes de cada vencimiento quedan ordenados en un solo
+    arreglo con la clave "número de vencimiento + posición del log-moneyness en (0, 1)", de modo que una sola
+    búsqueda binaria (searchsorted) encuentra los dos strikes que rodean al forward en todos los vencimientos.
+    """
+
+    # Índice ordenado de strikes por vencimiento
+    grupos = cadena.groupby(["Ticker", "Expiration"], sort=True)
+    rebanada = grupos.ngroup().values
+    k = np.log(cadena["strike"].values / cadena["F"].values)
+    clave = rebanada + 0.5 + np.arctan(k) / np.pi
+    orden = np.argsort(clave)
+    clave, k, volatilidad, rebanada = clave[orden], k[orden], cadena["IV"].values[orden], rebanada[orden]
+
+    # Strikes vecinos del forward (k = 0) en cada vencimiento
+    numeros = np.arange(grupos.ngroups)
+    derecho = np.clip(np.searchsorted(clave, numeros + 0.5), 1, len(clave) - 1)
+    izquierdo = derecho - 1
+    validos = (rebanada[izquierdo] == numeros) & (rebanada[derecho] == numeros) & (k[izquierdo] <= 0) & (k[derecho] >= 0)
+
+    # Interpolación lineal en log-moneyness
+    with np.errstate(all="ignore"):
+        peso = np.where(k[derecho] > k[izquierdo], -k[izquierdo] / (k[derecho] - k[izquierdo]), 0.5)
+    atm = np.where(validos, (1 - peso) * volatilidad[izquierdo] + peso * volatilidad[derecho], np.nan)
+
+    # Varianza total y varianza forward entre vencimientos consecutivos del mismo activo
+    resultado = grupos["T"].first().to_frame()
+    resultado["ATM"] = atm
+    resultado["Varianza Total"] = atm ** 2 * resultado["T"].values
+    tickers = resultado.index.get_level_values("Ticker").values
+    mismo_activo = np.r_[False, tickers[1:] == tickers[:-1]]
+    w_anterior = np.r_[0.0, resultado["Varianza Total"].values[:-1]]
+    T_anterior = np.r_[0.0, resultado["T"].values[:-1]]
+    varianza_forward = np.where(mismo_activo, (resultado["Varianza Total"].values - w_anterior) /
+                                (resultado["T"].values - T_anterior), resultado["ATM"].values ** 2)
+    resultado["Vol Forward"] = np.sqrt(np.where(varianza_forward >= 0, varianza_forward, np.nan))
+
+    # Varianza forward negativa = la varianza total decrece (arbitraje de calendario)
+    resultado["Calendario Negativo"] = varianza_forward < 0
+
+    return resultado
+
+# Leer Datos de Opciones (la fecha de valoración es la del último trade registrado)
+opciones_mercado = pd.read_csv("../datos/opciones.csv")
+fecha_datos = pd.to_datetime(opciones_mercado["lastTradeDate"]).max().tz_localize(None).normalize()
+opciones_mercado["T"] = ((pd.to_datetime(opciones_mercado["Expiration"]) - fecha_datos).dt.days + 1) / 365
+opciones_mercado["mid"] = (opciones_mercado["bid"] + opciones_mercado["ask"]) / 2
+opciones_mercado = opciones_mercado[(opciones_mercado["bid"] > 0) & (opciones_mercado["T"] > 1 / 365)]
+tasa_libre_riesgo = 0.05
+
+# Forward por vencimiento con la paridad put-call (mediana sobre los strikes cotizados en ambas puntas)
+pares = opciones_mercado.pivot_table(values="mid", index=["Expiration", "strike"], columns="Type").dropna().reset_index()
+pares["T"] = pares["Expiration"].map(opciones_mercado.groupby("Expiration")["T"].first())
+pares["F"] = pares["strike"] + np.exp(tasa_libre_riesgo * pares["T"]) * (pares["call"] - pares["put"])
+opciones_mercado["F"] = opciones_mercado["Expiration"].map(pares.groupby("Expiration")["F"].median())
+
+# Contratos fuera del dinero con su volatilidad implícita (precio medio)
+otm = opciones_mercado[((opciones_mercado["Type"] == "put") & (opciones_mercado["strike"] < opciones_mercado["F"])) |
+                       ((opciones_mercado["Type"] == "call") & (opciones_mercado["strike"] >= opciones_mercado["F"]))].copy()
+otm["IV"] = volatilidad_implicita(otm["mid"].values, otm["F"].values * np.exp(-tasa_libre_riesgo * otm["T"].values),
+                                  otm["strike"].values, otm["T"].values, tasa_libre_riesgo,
+                                  es_call=otm["Type"].values == "call")
+otm = otm.dropna(subset=["IV"])[["Expiration", "T", "F", "strike", "IV"]]
+otm["Ticker"] = "SPY"
+
+# Estructura temporal de SPY
+estructura_spy = estructura_temporal_atm(otm)
+print("Estructura Temporal ATM-Forward de SPY:")
+print(estructura_spy.round(4).head(12).to_string())
+
+# Comparar con el strike único del script original (el más cercano al forward del primer vencimiento)
+strike_unico = otm["strike"].values[np.abs(otm["strike"].values - otm["F"].iloc[0]).argmin()]
+forwards = otm.groupby("Expiration")["F"].first()
+print(f"\nStrike Único: {strike_unico} | Forward del Último Vencimiento: {forwards.iloc[-1]:.2f} "
+      f"(moneyness {strike_unico / forwards.iloc[-1]:.3f})")
+
+# Universo de 500 activos (la cadena de SPY con otro nivel y otra pendiente temporal, como activos distintos)
+np.random.seed(42)
+num_activos = 500
+nivel = np.random.uniform(0.8, 2.5, num_activos)
+pendiente = np.random.uniform(-0.05, 0.05, num_activos)
+universo = pd.concat([otm.assign(Ticker=f"TICKER_{i:03d}", IV=otm["IV"] * nivel[i] + pendiente[i] * np.sqrt(otm["T"]))
+                      for i in range(num_activos)], ignore_index=True)
+
+inicio = time.perf_counter()
+estructura_universo = estructura_temporal_atm(universo)
+tiempo = time.perf_counter() - inicio
+print(f"\nUniverso: {len(universo):,} contratos, {len(estructura_universo):,} vencimientos en {tiempo * 1000:.0f} ms")
+print(f"Vencimientos con varianza forward negativa: {estructura_universo['Calendario Negativo'].sum()}")
+
+# Graficar volatilidad ATM y volatilidad forward de SPY
+fig, ax = plt.subplots(figsize=(22, 6))
+dias = estructura_spy["T"].values * 365
+ax.plot(dias, estructura_spy["ATM"] * 100, marker="o", label="Volatilidad ATM-Forward")
+ax.step(dias, estructura_spy["Vol Forward"] * 100, where="pre", color="red", label="Volatilidad Forward (entre vencimientos)")
+ax.set_xscale("log")
+ax.set_title("Estructura Temporal de Volatilidad de SPY")
+ax.set_xlabel("Días al Vencimiento")
+ax.set_ylabel("Volatilidad (%)")
+ax.legend()
+ax.grid()
+plt.show()
+
+# Recordatorio:
+#   - La volatilidad ATM debe medirse en el forward de cada vencimiento: con un strike fijo, los vencimientos largos mezclan
+#     el nivel de volatilidad con el sesgo, porque el forward se aleja del strike.
+#   - La volatilidad forward muestra qué periodo concentra la incertidumbre (por ejemplo, un evento entre dos vencimientos) y
+#     una varianza forward negativa indica arbitraje de calendario.
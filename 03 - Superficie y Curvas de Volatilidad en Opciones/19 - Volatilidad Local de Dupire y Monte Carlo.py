@@ -0,0 +1,310 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+from scipy.optimize import least_squares
+import matplotlib.pyplot as plt
+import time
+
+# La superficie de "05 - Superficie de Volatilidad" sólo se grafica. El modelo de volatilidad local de Dupire la usa
+# para valorar: es el único proceso dS/S = (r - q)·dt + σ_loc(S, t)·dW que reproduce todos los precios europeos de la
+# superficie. En términos de la varianza total w(y, T) con y = ln(K / F_T):
+#
+#   σ²_loc(K, T) = (∂w/∂T) / [1 - (y/w)·∂w/∂y + ¼·(-¼ - 1/w + y²/w²)·(∂w/∂y)² + ½·∂²w/∂y²]
+#
+# Las derivadas en y salen analíticas del ajuste SVI de cada vencimiento y ∂w/∂T de la interpolación lineal de w
+# entre vencimientos. La volatilidad local se calcula una sola vez en una malla (t, y = ln(S / F_t)) y el simulador la
+# consulta con interpolación bilineal para un bloque completo de trayectorias en cada paso de tiempo.
+
+def volatilidad_implicita(precios, S, K, T, r, q=0, es_call=True, iteraciones=50):
+
+    """
+    Volatilidad implícita de todos los contratos a la vez (Newton-Raphson protegido por bisección).
+    """
+
+    sigma = np.full(len(precios), 0.3)
+    bajo, alto = np.full(len(precios), 1e-4), np.full(len(precios), 5.0)
+    for _ in range(iteraciones):
+        raiz_T = np.sqrt(T)
+        d1 = (np.log(S / K) + (r - q + 0.5 * sigma ** 2) * T) / (sigma * raiz_T)
+        d2 = d1 - sigma * raiz_T
+        call = S * np.exp(-q * T) * norm.cdf(d1) - K * np.exp(-r * T) * norm.cdf(d2)
+        put = K * np.exp(-r * T) * norm.cdf(-d2) - S * np.exp(-q * T) * norm.cdf(-d1)
+        precio = np.where(es_call, call, put)
+        vega = S * np.exp(-q * T) * norm.pdf(d1) * raiz_T
+        alto = np.where(precio > precios, sigma, alto)
+        bajo = np.where(precio <= precios, sigma, bajo)
+        with np.errstate(all="ignore"):
+            nuevo = sigma - (precio - precios) / vega
+        sigma = np.where((nuevo > bajo) & (nuevo < alto), nuevo, 0.5 * (bajo + alto))
+
+    return np.where((sigma > 1e-3) & (sigma < 4.99), sigma, np.nan)
+
+# ===================================
+#  Superficie SVI
+# ===================================
+
+def varianza_svi(k, a, b, rho, m, s):
+
+    """
+    Varianza total del modelo SVI raw (los parámetros pueden ser arreglos que se transmitan con k).
+    """
+
+    return a + b * (rho * (k - m) + np.sqrt((k - m) ** 2 + s ** 2))
+
+def derivadas_svi(k, a, b, rho, m, s):
+
+    """
+    Primera y segunda derivada analíticas de la varianza total SVI respecto a k.
+    """
+
+    x = k - m
+    raiz = np.sqrt(x ** 2 + s ** 2)
+
+    return b * (rho + x / raiz), b * s ** 2 / raiz ** 3
+
+def jacobiano_svi(parametros, k):
+
+    """
+    Derivadas de w(k) respecto a (a, b, ρ, m, s), una fila por strike.
+    """
+
+    a, b, rho, m, s = parametros
+    x = k - m
+    raiz = np.sqrt(x ** 2 + s ** 2)
+
+    return np.column_stack([np.ones_like(k), rho * x + raiz, b * x, -b * (rho + x / raiz), b * s / raiz])
+
+def ajustar_svi(k, w, inicial=None):
+
+    """
+    Ajusta los parámetros (a, b, ρ, m, s) de un vencimiento por mínimos cuadrados sobre la varianza total.
+    """
+
+    if inicial is None:
+        inicial = [0.5 * w.min(), 0.1, -0.5, 0.0, 0.1]
+    limites = ([-w.max(), 1e-6, -0.999, 2 * k.min(), 1e-4], [w.max(), 10, 0.999, 2 * k.max(), 5])
+    inicial = np.clip(inicial, limites[0], limites[1])
+    resultado = least_squares(lambda p: varianza_svi(k, *p) - w, inicial, jac=lambda p: jacobiano_svi(p, k),
+                              bounds=limites)
+
+    return resultado.x
+
+def forward(t, tiempos, forwards):
+
+    """
+    Forward en cualquier t (interpolación lineal de ln F; fuera del rango se extiende la tasa de los extremos).
+    """
+
+    log_F = np.log(forwards)
+    pendientes = np.diff(log_F) / np.diff(tiempos)
+    i = np.clip(np.searchsorted(tiempos, t) - 1, 0, len(tiempos) - 2)
+
+    return np.exp(log_F[i] + pendientes[i] * (t - tiempos[i]))
+
+# ===================================
+#  Malla de Volatilidad Local
+# ===================================
+
+def malla_volatilidad_local(tiempos, parametros, tiempos_malla, y_malla, vol_min=0.02, vol_max=2.0):
+
+    """
+    Volatilidad local de Dupire en la malla (tiempos_malla × y_malla), con y = ln(S / F_t), como arreglo float32.
+    Entre vencimientos w se interpola linealmente en T (con w = 0 en T = 0), así que ∂w/∂T es la pendiente entre
+    los dos vencimientos vecinos. Las celdas donde la fórmula no es válida (∂w/∂T o el denominador no positivos,
+    es decir, arbitraje de calendario o de mariposa) toman la volatilidad implícita de la celda. Devuelve también
+    la máscara de esas celdas.
+    """
+
+    # Varianza total y sus derivadas en y de cada vencimiento (fila 0 = T = 0)
+    nodos = np.r_[0.0, tiempos]
+    W = np.zeros((len(nodos), len(y_malla)))
+    W1, W2 = np.zeros_like(W), np.zeros_like(W)
+    W[1:] = varianza_svi(y_malla[None, :], *parametros.T[:, :, None])
+    W1[1:], W2[1:] = derivadas_svi(y_malla[None, :], *parametros.T[:, :, None])
+
+    # Interpolación lineal en T: todas las filas de la malla a la vez
+    i = np.clip(np.searchsorted(nodos, tiempos_malla) - 1, 0, len(nodos) - 2)
+    peso = np.clip((tiempos_malla - nodos[i]) / (nodos[i + 1] - nodos[i]), 0, 1)[:, None]
+    w = (1 - peso) * W[i] + peso * W[i + 1]
+    w1 = (1 - peso) * W1[i] + peso * W1[i + 1]
+    w2 = (1 - peso) * W2[i] + peso * W2[i + 1]
+    dw_dT = (W[i + 1] - W[i]) / (nodos[i + 1] - nodos[i])[:, None]
+
+    # Fórmula de Dupire en varianza total
+    y = y_malla[None, :]
+    with np.errstate(all="ignore"):
+        denominador = 1 - y / w * w1 + 0.25 * (-0.25 - 1 / w + y ** 2 / w ** 2) * w1 ** 2 + 0.5 * w2
+        varianza_local = dw_dT / denominador
+    invalidas = ~((dw_dT > 0) & (denominador > 0) & (w > 0))
+    varianza_local = np.where(invalidas, np.maximum(w, 0) / tiempos_malla[:, None], varianza_local)
+
+    return np.sqrt(np.clip(varianza_local, vol_min ** 2, vol_max ** 2)).astype(np.float32), invalidas
+
+# ===================================
+#  Simulación de Monte Carlo
+# ===================================
+
+def consultar_malla(malla, tiempos_malla, y_malla, t, y):
+
+    """
+    Interpolación bilineal de la malla en el tiempo t (escalar, común a todo el bloque) y en los puntos y de cada
+    trayectoria. La malla de y es equiespaciada, así que el índice se obtiene directamente sin búsqueda.
+    """
+
+    # Fila de la malla en el tiempo t (interpolación en t)
+    j = int(np.clip(np.searchsorted(tiempos_malla, t) - 1, 0, len(tiempos_malla) - 2))
+    a = np.clip((t - tiempos_malla[j]) / (tiempos_malla[j + 1] - tiempos_malla[j]), 0, 1)
+    fila = (1 - a) * malla[j] + a * malla[j + 1]
+
+    # Interpolación en y (fuera de la malla se usa el borde)
+    posicion = np.clip((y - y_malla[0]) / (y_malla[1] - y_malla[0]), 0, len(y_malla) - 1.000001)
+    indice = posicion.astype(int)
+    fraccion = posicion - indice
+
+    return (1 - fraccion) * fila[indice] + fraccion * fila[indice + 1]
+
+def simular_volatilidad_local(malla, tiempos_malla, y_malla, forwards_pasos, T, num_trayectorias, generador):
+
+    """
+    Simula un bloque de trayectorias del subyacente con volatilidad local (Euler en y = ln(S / F_t), que es una
+    martingala salvo el término -½·σ²·dt). 'forwards_pasos' son los forwards en cada fecha de la simulación.
+    Devuelve una matriz (trayectorias × pasos + 1).
+    """
+
+    num_pasos = len(forwards_pasos) - 1
+    dt = T / num_pasos
+    y = np.zeros((num_trayectorias, num_pasos + 1))
+    for paso in range(num_pasos):
+        sigma = consultar_malla(malla, tiempos_malla, y_malla, paso * dt, y[:, paso])
+        y[:, paso + 1] = y[:, paso] - 0.5 * sigma ** 2 * dt + sigma * np.sqrt(dt) * generador.standard_normal(num_trayectorias)
+
+    return forwards_pasos[None, :] * np.exp(y)
+
+def valorar_montecarlo(pagos, malla, tiempos_malla, y_malla, forwards_pasos, T, r, num_trayectorias=200_000,
+                       bloque=50_000, semilla=42):
+
+    """
+    Valora varios productos a la vez: 'pagos' es un diccionario {nombre: función(trayectorias) -> pagos}. Las
+    trayectorias se generan por bloques para acotar la memoria. Devuelve precio y error estándar de cada producto.
+    """
+
+    generador = np.random.default_rng(semilla)
+    suma = dict.fromkeys(pagos, 0.0)
+    suma_cuadrados = dict.fromkeys(pagos, 0.0)
+    for inicio in range(0, num_trayectorias, bloque):
+        n = min(bloque, num_trayectorias - inicio)
+        trayectorias = simular_volatilidad_local(malla, tiempos_malla, y_malla, forwards_pasos, T, n, generador)
+        for nombre, pago in pagos.items():
+            valores = pago(trayectorias)
+            suma[nombre] += valores.sum()
+            suma_cuadrados[nombre] += (valores ** 2).sum()
+
+    resultado = {}
+    for nombre in pagos:
+        media = suma[nombre] / num_trayectorias
+        error = np.sqrt(max(suma_cuadrados[nombre] / num_trayectorias - media ** 2, 0) / num_trayectorias)
+        resultado[nombre] = (np.exp(-r * T) * media, np.exp(-r * T) * error)
+
+    return pd.DataFrame(resultado, index=["Precio", "Error Estándar"]).T
+
+# Leer Datos de Opciones (la fecha de valoración es la del último trade registrado)
+opciones_mercado = pd.read_csv("../datos/opciones.csv")
+fecha_datos = pd.to_datetime(opciones_mercado["lastTradeDate"]).max().tz_localize(None).normalize()
+opciones_mercado["T"] = ((pd.to_datetime(opciones_mercado["Expiration"]) - fecha_datos).dt.days + 1) / 365
+opciones_mercado["mid"] = (opciones_mercado["bid"] + opciones_mercado["ask"]) / 2
+opciones_mercado = opciones_mercado[opciones_mercado["bid"] > 0]
+tasa_libre_riesgo = 0.05
+
+# Forward por vencimiento con la paridad put-call (mediana sobre los strikes cotizados en ambas puntas)
+pares = opciones_mercado.pivot_table(values="mid", index=["Expiration", "strike"], columns="Type").dropna().reset_index()
+pares["T"] = pares["Expiration"].map(opciones_mercado.groupby("Expiration")["T"].first())
+pares["F"] = pares["strike"] + np.exp(tasa_libre_riesgo * pares["T"]) * (pares["call"] - pares["put"])
+opciones_mercado["F"] = opciones_mercado["Expiration"].map(pares.groupby("Expiration")["F"].median())
+
+# Contratos fuera del dinero con su volatilidad implícita (vencimientos de 1 semana a 1 año)
+otm = opciones_mercado[(((opciones_mercado["Type"] == "put") & (opciones_mercado["strike"] < opciones_mercado["F"])) |
+                        ((opciones_mercado["Type"] == "call") & (opciones_mercado["strike"] >= opciones_mercado["F"]))) &
+                       (opciones_mercado["T"] > 7 / 365) & (opciones_mercado["T"] < 1.05)].copy()
+otm["IV"] = volatilidad_implicita(otm["mid"].values, otm["F"].values * np.exp(-tasa_libre_riesgo * otm["T"].values),
+                                  otm["strike"].values, otm["T"].values, tasa_libre_riesgo,
+                                  es_call=otm["Type"].values == "call")
+otm = otm.dropna(subset=["IV"])
+otm["k"] = np.log(otm["strike"] / otm["F"])
+otm["w"] = otm["IV"] ** 2 * otm["T"]
+
+# Ajuste SVI de cada vencimiento
+rebanadas = [rebanada for _, rebanada in otm.groupby("Expiration") if len(rebanada) >= 8]
+tiempos = np.array([rebanada["T"].iloc[0] for rebanada in rebanadas])
+forwards = np.array([rebanada["F"].iloc[0] for rebanada in rebanadas])
+parametros = np.array([ajustar_svi(rebanada["k"].values, rebanada["w"].values) for rebanada in rebanadas])
+print(f"Superficie SVI: {len(tiempos)} vencimientos entre {tiempos[0] * 365:.0f} y {tiempos[-1] * 365:.0f} días")
+
+# Malla de volatilidad local (un punto por día y 201 valores de y)
+tiempos_malla = np.arange(1, int(tiempos[-1] * 365) + 1) / 365
+y_malla = np.linspace(-1.0, 0.6, 201)
+inicio = time.perf_counter()
+vol_local, invalidas = malla_volatilidad_local(tiempos, parametros, tiempos_malla, y_malla)
+print(f"Malla de Volatilidad Local: {vol_local.shape[0]} × {vol_local.shape[1]} ({vol_local.nbytes / 1024:.0f} KB) "
+      f"calculada en {(time.perf_counter() - inicio) * 1000:.1f} ms | Celdas sustituidas por arbitraje: {invalidas.mean():.1%}")
+
+# Vencimiento de validación: el más cercano a 3 meses
+indice = np.abs(tiempos - 0.25).argmin()
+T = tiempos[indice]
+F_T = forwards[indice]
+num_pasos = int(round(T * 365))
+forwards_pasos = forward(np.linspace(0, T, num_pasos + 1), tiempos, forwards)
+
+# Productos: calls europeos (validación), un call asiático y un call con barrera up-and-out
+strikes = F_T * np.array([0.85, 0.9, 0.95, 1.0, 1.05, 1.1])
+pagos = {f"Call {K:.0f}": (lambda S, K=K: np.maximum(S[:, -1] - K, 0)) for K in strikes}
+pagos["Asiático ATM"] = lambda S: np.maximum(S[:, 1:].mean(axis=1) - F_T, 0)
+pagos["Barrera Up-and-Out (ATM, 110%)"] = lambda S: np.where(S.max(axis=1) < 1.1 * F_T, np.maximum(S[:, -1] - F_T, 0), 0)
+
+inicio = time.perf_counter()
+precios_lv = valorar_montecarlo(pagos, vol_local, tiempos_malla, y_malla, forwards_pasos, T, tasa_libre_riesgo)
+print(f"\nMonte Carlo de Volatilidad Local: 200,000 trayectorias × {num_pasos} pasos en "
+      f"{time.perf_counter() - inicio:.1f} segundos")
+
+# Validación: la volatilidad implícita de los calls simulados debe reproducir la sonrisa SVI
+vol_svi = np.sqrt(varianza_svi(np.log(strikes / F_T), *parametros[indice]) / T)
+precios_calls = precios_lv["Precio"].values[:len(strikes)]
+vol_mc = volatilidad_implicita(precios_calls, np.full(len(strikes), F_T * np.exp(-tasa_libre_riesgo * T)), strikes,
+                               np.full(len(strikes), T), tasa_libre_riesgo)
+print(pd.DataFrame({"Strike": strikes.round(1), "Vol SVI (%)": vol_svi * 100, "Vol Monte Carlo (%)": vol_mc * 100})
+      .round(2).to_string(index=False))
+
+# Productos exóticos: volatilidad local vs volatilidad constante (la ATM del vencimiento)
+vol_atm = vol_svi[3]
+malla_constante = np.full_like(vol_local, vol_atm)
+precios_bs = valorar_montecarlo(pagos, malla_constante, tiempos_malla, y_malla, forwards_pasos, T, tasa_libre_riesgo)
+comparacion = pd.DataFrame({"Volatilidad Local": precios_lv["Precio"], "Volatilidad Constante": precios_bs["Precio"],
+                            "Error Estándar": precios_lv["Error Estándar"]}).iloc[len(strikes):]
+print(f"\nProductos dependientes de la trayectoria a {T * 365:.0f} días (volatilidad constante = {vol_atm * 100:.2f}%):")
+print(comparacion.round(3).to_string())
+
+# Graficar la malla de volatilidad local y las rebanadas frente a la volatilidad implícita
+fig, ax = plt.subplots(1, 2, figsize=(22, 6))
+imagen = ax[0].imshow(vol_local.T * 100, aspect="auto", origin="lower", cmap="viridis",
+                      extent=[tiempos_malla[0] * 365, tiempos_malla[-1] * 365, y_malla[0], y_malla[-1]], vmax=60)
+fig.colorbar(imagen, ax=ax[0], label="Volatilidad Local (%)")
+ax[0].set_title("Malla de Volatilidad Local de Dupire")
+ax[0].set_xlabel("Días")
+ax[0].set_ylabel("ln(S / F_t)")
+y_grafica = y_malla[(y_malla > -0.3) & (y_malla < 0.15)]
+fila = int(round(T * 365)) - 1
+ax[1].plot(y_grafica, np.sqrt(varianza_svi(y_grafica, *parametros[indice]) / T) * 100, label="Volatilidad Implícita (SVI)")
+ax[1].plot(y_grafica, np.interp(y_grafica, y_malla, vol_local[fila]) * 100, label="Volatilidad Local")
+ax[1].set_title(f"Volatilidad Implícita vs Local a {T * 365:.0f} días")
+ax[1].set_xlabel("ln(K / F)")
+ax[1].set_ylabel("Volatilidad (%)")
+ax[1].legend()
+ax[1].grid()
+plt.show()
+
+# Recordatorio:
+#   - La volatilidad local es aproximadamente el doble de inclinada que la implícita: la implícita promedia la local a lo largo
+#     de las trayectorias que terminan en cada strike.
+#   - Con la malla precalculada la simulación sólo hace interpolaciones vectorizadas por paso, así que el costo no depende
+#     de la complejidad del ajuste SVI; cualquier arbitraje de la superficie aparece como celdas donde Dupire no es válido.
@@ -0,0 +1,336 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+from scipy.optimize import least_squares
+import matplotlib.pyplot as plt
+import zlib
+import tempfile
+import os
+import time
+
+# Guardar la cadena completa de cada activo cada 5 minutos ocupa cientos de MB por activo y por año, y cualquier
+# consulta histórica ("volatilidad ATM a 30 días de SPY del último año") obliga a volver a ajustar cada cadena. Aquí
+# cada instantánea se reduce a:
+#
+#   - Los parámetros SVI de cada plazo estándar (7, 14, 30, ... días), en float32.
+#   - La volatilidad implícita en una malla fija (plazos × log-moneyness), cuantizada a 0.01 puntos de volatilidad en
+#     int16 y codificada como diferencia respecto a la instantánea anterior de la misma celda.
+#
+# Las instantáneas se agrupan en bloques (cada celda queda contigua en el tiempo, así que las diferencias son casi
+# siempre números pequeños) y cada bloque se comprime con zlib. El archivo de datos se abre con memoria mapeada y una
+# consulta sólo descomprime los bloques que caen en su rango de fechas.
+
+def volatilidad_implicita(precios, S, K, T, r, q=0, es_call=True, iteraciones=50):
+
+    """
+    Volatilidad implícita de todos los contratos a la vez (Newton-Raphson protegido por bisección).
+    """
+
+    sigma = np.full(len(precios), 0.3)
+    bajo, alto = np.full(len(precios), 1e-4), np.full(len(precios), 5.0)
+    for _ in range(iteraciones):
+        raiz_T = np.sqrt(T)
+        d1 = (np.log(S / K) + (r - q + 0.5 * sigma ** 2) * T) / (sigma * raiz_T)
+        d2 = d1 - sigma * raiz_T
+        call = S * np.exp(-q * T) * norm.cdf(d1) - K * np.exp(-r * T) * norm.cdf(d2)
+        put = K * np.exp(-r * T) * norm.cdf(-d2) - S * np.exp(-q * T) * norm.cdf(-d1)
+        precio = np.where(es_call, call, put)
+        vega = S * np.exp(-q * T) * norm.pdf(d1) * raiz_T
+        alto = np.where(precio > precios, sigma, alto)
+        bajo = np.where(precio <= precios, sigma, bajo)
+        with np.errstate(all="ignore"):
+            nuevo = sigma - (precio - precios) / vega
+        sigma = np.where((nuevo > bajo) & (nuevo < alto), nuevo, 0.5 * (bajo + alto))
+
+    return np.where((sigma > 1e-3) & (sigma < 4.99), sigma, np.nan)
+
+def varianza_svi(k, a, b, rho, m, s):
+
+    """
+    Varianza total del modelo SVI raw (los parámetros pueden ser arreglos que se transmitan con k).
+    """
+
+    return a + b * (rho * (k - m) + np.sqrt((k - m) ** 2 + s ** 2))
+
+def ajustar_svi(k, w, inicial=None):
+
+    """
+    Ajusta los parámetros (a, b, ρ, m, s) de un vencimiento por mínimos cuadrados sobre la varianza total.
+    """
+
+    if inicial is None:
+        inicial = [0.5 * w.min(), 0.1, -0.5, 0.0, 0.1]
+    limites = ([-w.max(), 1e-6, -0.999, 2 * k.min(), 1e-4], [w.max(), 10, 0.999, 2 * k.max(), 5])
+    inicial = np.clip(inicial, limites[0], limites[1])
+    resultado = least_squares(lambda p: varianza_svi(k, *p) - w, inicial, bounds=limites)
+
+    return resultado.x
+
+# ===================================
+#  Almacén de Superficies
+# ===================================
+
+class HistorialSuperficies:
+
+    """
+    Historial de superficies de un activo en una carpeta con dos archivos:
+      - datos.bin: bloques comprimidos con zlib, uno detrás de otro (sólo se agregan bytes al final).
+      - indice.npz: posición, tamaño, número de instantáneas y primera/última marca de tiempo de cada bloque.
+    Cada instantánea es una matriz de volatilidad (plazos × k) y una matriz de parámetros SVI (plazos × 5).
+    Los códigos int16 limitan la volatilidad guardada a 32767 / escala (327.67%): los valores mayores se guardan
+    como ese máximo. Las instantáneas de agregar() se escriben al completar un bloque, al consultar o al cerrar().
+    """
+
+    escala = 10_000  # Resolución de 0.01 puntos de volatilidad; el código 0 representa NaN
+    volatilidad_maxima = 32767 / escala
+
+    def __init__(self, carpeta, plazos, k, tamano_bloque=2048):
+
+        self.carpeta = carpeta
+        self.plazos = np.asarray(plazos, dtype=float)
+        self.k = np.asarray(k, dtype=float)
+        self.tamano_bloque = tamano_bloque
+        self.pendientes = []
+        os.makedirs(carpeta, exist_ok=True)
+
+        # Recuperar el índice si la carpeta ya tiene datos
+        ruta = os.path.join(carpeta, "indice.npz")
+        if os.path.exists(ruta):
+            with np.load(ruta) as archivo:
+                self.indice = {nombre: archivo[nombre] for nombre in archivo.files}
+        else:
+            self.indice = {nombre: np.zeros(0, dtype=np.int64) for nombre in ["posicion", "tamano", "n", "desde", "hasta"]}
+
+    def agregar(self, marca, volatilidad, parametros):
+
+        """
+        Agrega una instantánea; cuando se completa un bloque se comprime y se escribe en disco (el bloque incompleto
+        queda en memoria hasta cerrar()).
+        """
+
+        self.pendientes.append((pd.Timestamp(marca).value, volatilidad, parametros))
+        if len(self.pendientes) >= self.tamano_bloque:
+            self.escribir_bloque()
+
+    def agregar_lote(self, marcas, volatilidades, parametros):
+
+        """
+        Agrega muchas instantáneas a la vez (marcas ordenadas) y las escribe directamente por bloques.
+        """
+
+        marcas = pd.DatetimeIndex(marcas).as_unit("ns").asi8
+        for inicio in range(0, len(marcas), self.tamano_bloque):
+            fin = inicio + self.tamano_bloque
+            self.escribir_bloque(marcas[inicio:fin], volatilidades[inicio:fin], parametros[inicio:fin])
+
+    def cerrar(self):
+
+        """
+        Escribe el bloque incompleto de agregar() para no perder las últimas instantáneas.
+        """
+
+        self.escribir_bloque()
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self, *excepcion):
+
+        self.cerrar()
+
+    def escribir_bloque(self, marcas=None, volatilidades=None, parametros=None):
+
+        """
+        Codifica y comprime un bloque: marcas de tiempo (diferencias en int64), volatilidad cuantizada en int16 con
+        cada celda contigua en el tiempo y codificada por diferencias, y parámetros en float32. La volatilidad se
+        recorta a [1 / escala, volatilidad_maxima] antes de cuantizar.
+        """
+
+        if marcas is None:
+            if not self.pendientes:
+                return
+            marcas = np.array([p[0] for p in self.pendientes], dtype=np.int64)
+            volatilidades = np.stack([p[1] for p in self.pendientes])
+            parametros = np.stack([p[2] for p in self.pendientes])
+            self.pendientes = []
+
+        n = len(marcas)
+        recortadas = np.clip(volatilidades, 1 / self.escala, self.volatilidad_maxima)
+        codigos = np.where(np.isfinite(volatilidades), np.round(recortadas * self.escala), 0)
+        codigos = codigos.reshape(n, -1).T.astype(np.int16)
+        carga = b"".join([np.diff(marcas, prepend=0).astype(np.int64).tobytes(),
+                          np.diff(codigos, axis=1, prepend=0).astype(np.int16).tobytes(),
+                          np.asarray(parametros, dtype=np.float32).tobytes()])
+        comprimido = zlib.compress(carga, 6)
+
+        # Agregar al final del archivo de datos y actualizar el índice
+        with open(os.path.join(self.carpeta, "datos.bin"), "ab") as archivo:
+            posicion = archivo.tell()
+            archivo.write(comprimido)
+        for nombre, valor in [("posicion", posicion), ("tamano", len(comprimido)), ("n", n),
+                              ("desde", marcas[0]), ("hasta", marcas[-1])]:
+            self.indice[nombre] = np.append(self.indice[nombre], valor)
+        np.savez(os.path.join(self.carpeta, "indice.npz"), **self.indice)
+
+    def leer_bloque(self, datos, i):
+
+        """
+        Descomprime y decodifica el bloque i a partir del archivo mapeado en memoria.
+        """
+
+        n, celdas = int(self.indice["n"][i]), len(self.plazos) * len(self.k)
+        inicio = int(self.indice["posicion"][i])
+        carga = zlib.decompress(datos[inicio:inicio + int(self.indice["tamano"][i])])
+
+        marcas = np.cumsum(np.frombuffer(carga, dtype=np.int64, count=n))
+        codigos = np.cumsum(np.frombuffer(carga, dtype=np.int16, count=celdas * n, offset=8 * n).reshape(celdas, n), axis=1)
+        volatilidad = np.where(codigos > 0, codigos / self.escala, np.nan).T.reshape(n, len(self.plazos), len(self.k))
+        parametros = np.frombuffer(carga, dtype=np.float32, offset=8 * n + 2 * celdas * n).reshape(n, len(self.plazos), 5)
+
+        return marcas, volatilidad.astype(np.float32), parametros
+
+    def consultar(self, desde=None, hasta=None):
+
+        """
+        Instantáneas entre dos fechas: (marcas, volatilidad (n × plazos × k), parámetros (n × plazos × 5)). Sólo se
+        leen los bloques cuyo rango se cruza con el de la consulta.
+        """
+
+        self.escribir_bloque()
+        desde = np.iinfo(np.int64).min if desde is None else pd.Timestamp(desde).value
+        hasta = np.iinfo(np.int64).max if hasta is None else pd.Timestamp(hasta).value
+        bloques = np.flatnonzero((self.indice["hasta"] >= desde) & (self.indice["desde"] <= hasta))
+        self.bytes_leidos = int(self.indice["tamano"][bloques].sum())
+        if len(bloques) == 0:
+            return pd.DatetimeIndex([]), np.zeros((0, len(self.plazos), len(self.k))), np.zeros((0, len(self.plazos), 5))
+
+        datos = np.memmap(os.path.join(self.carpeta, "datos.bin"), dtype=np.uint8, mode="r")
+        partes = [self.leer_bloque(datos, i) for i in bloques]
+        marcas, volatilidad, parametros = [np.concatenate(p) for p in zip(*partes)]
+        dentro = (marcas >= desde) & (marcas <= hasta)
+
+        return pd.DatetimeIndex(marcas[dentro]), volatilidad[dentro], parametros[dentro]
+
+    def serie(self, plazo, k=0.0, desde=None, hasta=None):
+
+        """
+        Serie de tiempo de la volatilidad en un plazo de la malla y cualquier log-moneyness (interpolación en k).
+        """
+
+        marcas, volatilidad, _ = self.consultar(desde, hasta)
+        fila = volatilidad[:, np.abs(self.plazos - plazo).argmin(), :]
+        j = np.clip(np.searchsorted(self.k, k) - 1, 0, len(self.k) - 2)
+        peso = (k - self.k[j]) / (self.k[j + 1] - self.k[j])
+
+        return pd.Series((1 - peso) * fila[:, j] + peso * fila[:, j + 1], index=marcas)
+
+# Leer Datos de Opciones (la fecha de valoración es la del último trade registrado)
+opciones_mercado = pd.read_csv("../datos/opciones.csv")
+fecha_datos = pd.to_datetime(opciones_mercado["lastTradeDate"]).max().tz_localize(None).normalize()
+opciones_mercado["T"] = ((pd.to_datetime(opciones_mercado["Expiration"]) - fecha_datos).dt.days + 1) / 365
+opciones_mercado["mid"] = (opciones_mercado["bid"] + opciones_mercado["ask"]) / 2
+opciones_mercado = opciones_mercado[opciones_mercado["bid"] > 0]
+tasa_libre_riesgo = 0.05
+
+# Forward por vencimiento con la paridad put-call (mediana sobre los strikes cotizados en ambas puntas)
+pares = opciones_mercado.pivot_table(values="mid", index=["Expiration", "strike"], columns="Type").dropna().reset_index()
+pares["T"] = pares["Expiration"].map(opciones_mercado.groupby("Expiration")["T"].first())
+pares["F"] = pares["strike"] + np.exp(tasa_libre_riesgo * pares["T"]) * (pares["call"] - pares["put"])
+opciones_mercado["F"] = opciones_mercado["Expiration"].map(pares.groupby("Expiration")["F"].median())
+
+# Contratos fuera del dinero con su volatilidad implícita
+otm = opciones_mercado[(((opciones_mercado["Type"] == "put") & (opciones_mercado["strike"] < opciones_mercado["F"])) |
+                        ((opciones_mercado["Type"] == "call") & (opciones_mercado["strike"] >= opciones_mercado["F"]))) &
+                       (opciones_mercado["T"] > 1 / 365)].copy()
+otm["IV"] = volatilidad_implicita(otm["mid"].values, otm["F"].values * np.exp(-tasa_libre_riesgo * otm["T"].values),
+                                  otm["strike"].values, otm["T"].values, tasa_libre_riesgo,
+                                  es_call=otm["Type"].values == "call")
+otm = otm.dropna(subset=["IV"])
+otm["k"] = np.log(otm["strike"] / otm["F"])
+otm["w"] = otm["IV"] ** 2 * otm["T"]
+print(f"Cadena de SPY: {len(opciones_mercado):,} contratos ({opciones_mercado.memory_usage(deep=True).sum() / 1e6:.1f} MB "
+      f"en memoria por instantánea)")
+
+# Malla fija: plazos estándar × log-moneyness
+plazos = np.array([7, 14, 30, 60, 90, 180, 270, 365])
+k_malla = np.round(np.linspace(-0.4, 0.2, 31), 4)
+
+# Parámetros SVI de cada plazo estándar: w interpolada linealmente en T entre vencimientos y reajustada
+rebanadas = [rebanada for _, rebanada in otm.groupby("Expiration") if len(rebanada) >= 8]
+tiempos = np.array([rebanada["T"].iloc[0] for rebanada in rebanadas])
+W = np.array([varianza_svi(k_malla, *ajustar_svi(rebanada["k"].values, rebanada["w"].values)) for rebanada in rebanadas])
+W_plazos = np.array([[np.interp(T, tiempos, W[:, j]) for j in range(len(k_malla))] for T in plazos / 365])
+parametros_base = np.array([ajustar_svi(k_malla, fila) for fila in W_plazos])
+
+# Un año de instantáneas cada 5 minutos (78 por día): el nivel y el sesgo de la superficie de SPY siguen una caminata
+# aleatoria, con choques de nivel mayores en los plazos cortos
+np.random.seed(42)
+dias = pd.bdate_range(end=fecha_datos, periods=252)
+marcas = pd.DatetimeIndex(np.repeat(dias.values, 78) + np.tile(pd.to_timedelta(570 + 5 * np.arange(78), unit="min").values, len(dias)))
+num_instantaneas = len(marcas)
+nivel = np.cumsum(np.random.normal(0, 0.004, num_instantaneas))
+inclinacion = np.clip(np.cumsum(np.random.normal(0, 0.002, num_instantaneas)), -0.3, 0.3)
+factor = np.exp(nivel[:, None] * np.sqrt(30 / plazos)[None, :])
+parametros = np.repeat(parametros_base[None, :, :], num_instantaneas, axis=0)
+parametros[:, :, 0] *= factor
+parametros[:, :, 1] *= factor
+parametros[:, :, 2] = np.clip(parametros[:, :, 2] + inclinacion[:, None], -0.999, 0.999)
+w_malla = varianza_svi(k_malla[None, None, :], *[parametros[:, :, [p]] for p in range(5)])
+volatilidades = np.sqrt(np.maximum(w_malla, 1e-8) / (plazos[None, :, None] / 365))
+
+# Escribir el historial (en una carpeta temporal; en producción sería la carpeta del activo, p. ej. "historial/SPY")
+carpeta = tempfile.mkdtemp(prefix="historial_SPY_")
+historial = HistorialSuperficies(carpeta, plazos, k_malla)
+inicio = time.perf_counter()
+historial.agregar_lote(marcas, volatilidades, parametros)
+tiempo_escritura = time.perf_counter() - inicio
+
+tamano_disco = os.path.getsize(os.path.join(carpeta, "datos.bin"))
+print(f"\n{num_instantaneas:,} instantáneas ({len(plazos)} plazos × {len(k_malla)} strikes) escritas en {tiempo_escritura:.2f} s")
+print(f"Malla en float64: {volatilidades.nbytes / 1e6:.1f} MB | float16: {volatilidades.astype(np.float16).nbytes / 1e6:.1f} MB"
+      f" | Diferencias int16 + zlib (con parámetros): {tamano_disco / 1e6:.2f} MB")
+
+# Consultas: volatilidad ATM a 30 días del último año y sesgo 90 días (k = -0.1 menos k = +0.1) del último mes
+inicio = time.perf_counter()
+atm_30 = historial.serie(30, 0.0)
+tiempo_consulta = time.perf_counter() - inicio
+print(f"\nATM 30 días (último año): {len(atm_30):,} puntos en {tiempo_consulta * 1000:.0f} ms leyendo "
+      f"{historial.bytes_leidos / 1e6:.2f} MB")
+
+desde = marcas[-1] - pd.Timedelta(days=30)
+inicio = time.perf_counter()
+sesgo_90 = historial.serie(90, -0.1, desde=desde) - historial.serie(90, 0.1, desde=desde)
+print(f"Sesgo 90 días (último mes): {len(sesgo_90):,} puntos en {(time.perf_counter() - inicio) * 1000:.0f} ms leyendo "
+      f"{historial.bytes_leidos / 1e6:.2f} MB")
+
+# Error de cuantización respecto a la malla original
+_, reconstruida, parametros_leidos = historial.consultar()
+print(f"Error Máximo de Cuantización: {np.abs(reconstruida - volatilidades).max() * 100:.4f} puntos % | "
+      f"Parámetros recuperados: {np.allclose(parametros_leidos, parametros, rtol=1e-6)}")
+
+# Reabrir el historial (el índice se recupera del disco) y agregar las instantáneas de una nueva sesión una por una
+with HistorialSuperficies(carpeta, plazos, k_malla) as reabierto:
+    for i in range(78):
+        reabierto.agregar(marcas[-1] + pd.Timedelta(days=1, minutes=5 * i), volatilidades[-1], parametros[-1])
+print(f"Instantáneas después de reabrir y cerrar: {reabierto.indice['n'].sum():,} (bloque incompleto escrito al cerrar)")
+
+# Graficar las series históricas (promedio diario)
+fig, ax = plt.subplots(1, 2, figsize=(22, 6))
+(atm_30.resample("D").mean().dropna() * 100).plot(ax=ax[0])
+ax[0].set_title("Volatilidad ATM a 30 Días de SPY")
+ax[0].set_ylabel("Volatilidad (%)")
+(sesgo_90 * 100).plot(ax=ax[1], color="red")
+ax[1].set_title("Sesgo a 90 Días de SPY: σ(k = -0.1) - σ(k = +0.1)")
+ax[1].set_ylabel("Puntos de Volatilidad (%)")
+for eje in ax:
+    eje.grid()
+plt.show()
+
+# Recordatorio:
+#   - Entre instantáneas de 5 minutos la superficie cambia muy poco, así que las diferencias cuantizadas son casi siempre 0 o
+#     ±1 y se comprimen mucho mejor que los valores absolutos (incluso que float16).
+#   - Guardar parámetros y una malla fija permite responder consultas históricas sin volver a ajustar cada cadena; la malla
+#     cuantizada a 0.01 puntos de volatilidad está muy por debajo del diferencial bid-ask de cualquier opción.
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+import time
+
+# "01 - Volatilidad Histórica" sólo usa los precios de cierre, aunque yf.download ya entrega apertura, máximo y
+# mínimo. Los estimadores basados en el rango de cada barra aprovechan esa información y son mucho más eficientes
+# (menor error con la misma ventana). Con o = ln(O/C_anterior), u = ln(H/O), d = ln(L/O) y c = ln(C/O):
+#
+#   Cierre a Cierre:  σ² = var(ln(C/C_anterior))
+#   Parkinson:        σ² = media(ln(H/L)²) / (4·ln 2)
+#   Garman-Klass:     σ² = media(½·ln(H/L)² - (2·ln 2 - 1)·c²)
+#   Rogers-Satchell:  σ² = media(u·(u - c) + d·(d - c))                 (válido con tendencia)
+#   Yang-Zhang:       σ² = var(o) + κ·var(c) + (1 - κ)·σ²_RS,  κ = 0.34 / (1.34 + (n + 1)/(n - 1))   (incluye gaps)
+#
+# Todos son sumas (de x y de x²) sobre la ventana, así que con sumas acumuladas cada ventana cuesta una resta por
+# barra, O(1) sin importar su longitud, y se calculan todas las ventanas y todos los activos con arreglos
+# (barras × activos).
+
+def suma_acumulada(x):
+
+    """
+    Suma acumulada de x (barras × activos) a lo largo de las barras con una fila de ceros al inicio, de modo que la
+    suma de cualquier ventana de n barras que termina en t es S[t + 1] - S[t + 1 - n].
+    """
+
+    acumulada = np.zeros((x.shape[0] + 1,) + x.shape[1:])
+    np.cumsum(x, axis=0, out=acumulada[1:])
+
+    return acumulada
+
+def volatilidad_realizada(apertura, maximo, minimo, cierre, ventanas=(5, 10, 21, 63, 126, 252), factor=252):
+
+    """
+    Calcula los cinco estimadores para todas las ventanas y todos los activos a la vez. Las entradas son arreglos
+    (barras × activos); el resultado es un diccionario {estimador: arreglo (ventanas × barras - 1 × activos)} con
+    la volatilidad anualizada en float32 (la primera barra sólo aporta el cierre anterior). Las ventanas
+    incompletas o con algún dato faltante quedan en NaN.
+    """
+
+    # Términos por barra (los datos faltantes cuentan como cero y se llevan en un conteo aparte)
+    o = np.log(apertura[1:] / cierre[:-1])
+    u = np.log(maximo[1:] / apertura[1:])
+    d = np.log(minimo[1:] / apertura[1:])
+    c = np.log(cierre[1:] / apertura[1:])
+    r = np.log(cierre[1:] / cierre[:-1])
+    validos = np.isfinite(o + u + d + c + r)
+    terminos = {"r": r, "r2": r ** 2, "o": o, "o2": o ** 2, "c": c, "c2": c ** 2, "rango": (u - d) ** 2,
+                "rs": u * (u - c) + d * (d - c)}
+
+    # Una sola suma acumulada por término; cada ventana es una resta por barra
+    acumuladas = {nombre: suma_acumulada(np.where(validos, x, 0.0)) for nombre, x in terminos.items()}
+    conteo = suma_acumulada(validos.astype(float))
+
+    resultado = {nombre: np.full((len(ventanas),) + r.shape, np.nan, dtype=np.float32)
+                 for nombre in ["Cierre a Cierre", "Parkinson", "Garman-Klass", "Rogers-Satchell", "Yang-Zhang"]}
+    for i, n in enumerate(ventanas):
+        s = {nombre: S[n:] - S[:-n] for nombre, S in acumuladas.items()}
+        completas = (conteo[n:] - conteo[:-n]) > n - 0.5
+
+        # Varianza muestral a partir de Σx y Σx²
+        var_o = (s["o2"] - s["o"] ** 2 / n) / (n - 1)
+        var_c = (s["c2"] - s["c"] ** 2 / n) / (n - 1)
+        var_rs = s["rs"] / n
+        kappa = 0.34 / (1.34 + (n + 1) / (n - 1))
+        varianzas = {"Cierre a Cierre": (s["r2"] - s["r"] ** 2 / n) / (n - 1),
+                     "Parkinson": s["rango"] / (4 * np.log(2) * n),
+                     "Garman-Klass": (0.5 * s["rango"] - (2 * np.log(2) - 1) * s["c2"]) / n,
+                     "Rogers-Satchell": var_rs,
+                     "Yang-Zhang": var_o + kappa * var_c + (1 - kappa) * var_rs}
+        for nombre, v in varianzas.items():
+            resultado[nombre][i, n - 1:] = np.where(completas, np.sqrt(np.maximum(v, 0) * factor), np.nan)
+
+    return resultado
+
+def simular_ohlc(num_barras, num_activos, volatilidades, pasos_intradia=78, fraccion_gap=0.2, semilla=42):
+
+    """
+    Barras OHLC diarias de un Movimiento Browniano Geométrico: un gap nocturno (fraccion_gap de la varianza diaria)
+    y un recorrido intradía de 'pasos_intradia' pasos del que se toman el máximo y el mínimo.
+    """
+
+    generador = np.random.default_rng(semilla)
+    sigma_dia = volatilidades[None, :] / np.sqrt(252)
+    gaps = generador.standard_normal((num_barras, num_activos)) * sigma_dia * np.sqrt(fraccion_gap)
+    log_apertura = np.cumsum(gaps, axis=0)
+    log_actual, log_maximo, log_minimo = log_apertura.copy(), log_apertura.copy(), log_apertura.copy()
+    sigma_paso = sigma_dia * np.sqrt((1 - fraccion_gap) / pasos_intradia)
+    for _ in range(pasos_intradia):
+        log_actual += generador.standard_normal((num_barras, num_activos)) * sigma_paso
+        np.maximum(log_maximo, log_actual, out=log_maximo)
+        np.minimum(log_minimo, log_actual, out=log_minimo)
+
+    # Cada barra abre con el gap sobre el cierre anterior
+    desplazamiento = np.vstack([np.zeros((1, num_activos)), np.cumsum(log_actual - log_apertura, axis=0)[:-1]])
+    precios = [100 * np.exp(x + desplazamiento) for x in (log_apertura, log_maximo, log_minimo, log_actual)]
+
+    return precios
+
+if __name__ == "__main__":
+
+    # yfinance sólo se usa en la demostración: las funciones se pueden importar sin tenerlo instalado
+    import yfinance as yf
+
+    # ===================================
+    #  Un Activo: AAPL
+    # ===================================
+
+    # Descargar Datos
+    activo = "AAPL"
+    datos = yf.download(tickers=activo, start="2020-01-01", end="2025-01-01", multi_level_index=False, interval="1d")
+
+    ventanas = (5, 10, 21, 63, 126, 252)
+    estimadores = volatilidad_realizada(*[datos[[columna]].values for columna in ["Open", "High", "Low", "Close"]],
+                                        ventanas=ventanas)
+    volatilidad_21 = pd.DataFrame({nombre: valores[ventanas.index(21), :, 0] for nombre, valores in estimadores.items()},
+                                  index=datos.index[1:])
+    print(f"Volatilidad Realizada de {activo} a 21 días (última barra):")
+    print(volatilidad_21.iloc[-1].round(4).to_string())
+
+    # Validar el estimador de cierre a cierre contra rolling().std() de "01 - Volatilidad Histórica"
+    rolling_pandas = np.log(datos["Close"]).diff().rolling(21).std().iloc[1:] * np.sqrt(252)
+    coincide = np.allclose(volatilidad_21["Cierre a Cierre"], rolling_pandas, equal_nan=True, atol=1e-5)
+    print(f"\nCoincide con rolling(21).std(): {coincide}")
+
+    # ===================================
+    #  Universo de 3,000 Activos
+    # ===================================
+
+    # Tres años de barras simuladas con volatilidad conocida
+    num_activos, num_barras = 3000, 756
+    np.random.seed(42)
+    vol_real = np.random.uniform(0.15, 0.6, num_activos)
+    apertura, maximo, minimo, cierre = simular_ohlc(num_barras, num_activos, vol_real)
+
+    inicio = time.perf_counter()
+    estimadores_universo = volatilidad_realizada(apertura, maximo, minimo, cierre, ventanas=ventanas)
+    tiempo = time.perf_counter() - inicio
+    print(f"\n{len(estimadores_universo)} estimadores × {len(ventanas)} ventanas × {num_activos:,} activos × "
+          f"{num_barras} barras en {tiempo:.2f} segundos")
+
+    # Eficiencia: error relativo respecto a la volatilidad real en la ventana de 21 días
+    errores = pd.DataFrame({nombre: [np.nanmean(valores[ventanas.index(21)] / vol_real[None, :] - 1),
+                                     np.nanstd(valores[ventanas.index(21)] / vol_real[None, :])]
+                            for nombre, valores in estimadores_universo.items()}, index=["Sesgo", "Error Estándar"]).T
+    print("\nError relativo a 21 días frente a la volatilidad real:")
+    print((errores * 100).round(2).to_string())
+
+    # Graficar los estimadores de AAPL a 21 días
+    fig, ax = plt.subplots(figsize=(22, 6))
+    for nombre in volatilidad_21.columns:
+        ax.plot(volatilidad_21.index, volatilidad_21[nombre], label=nombre, lw=1)
+    ax.set_title(f"Volatilidad Realizada de {activo} a 21 Días")
+    ax.set_ylabel("Volatilidad Anualizada")
+    ax.legend()
+    ax.grid()
+    plt.show()
+
+# Recordatorio:
+#   - Parkinson, Garman-Klass y Rogers-Satchell sólo miden la varianza de la sesión (ignoran el gap nocturno) y los dos primeros
+#     suponen que no hay tendencia; Yang-Zhang incorpora el gap de apertura, por eso es el estimador de rango más usado en
+#     acciones.
+#   - Los estimadores de rango se sesgan hacia abajo cuando el máximo y el mínimo se observan de forma discreta (pocas
+#     operaciones por barra), pero con la misma ventana tienen mucho menor error que el de cierre a cierre.
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+import time
+
+# En "01 - Volatilidad Histórica" la volatilidad de 1 minuto se obtiene descargando 7 días de barras y llamando a
+# std() sobre todas ellas; para vigilar la volatilidad durante la sesión habría que repetirlo con cada barra nueva.
+# Aquí cada activo de una lista de seguimiento guarda sus últimos n rendimientos en un buffer circular y actualiza
+# la media y la suma de cuadrados de desviaciones (M2) en O(1) por barra:
+#
+#   Welford (ventana deslizante, entra x y sale x_viejo):
+#     media' = media + (x - x_viejo) / n
+#     M2'    = M2 + (x - x_viejo)·(x - media' + x_viejo - media)
+#
+#   Chan (micro-lote B que entra y lote V que sale):
+#     M2_{A∪B} = M2_A + M2_B + δ²·n_A·n_B / (n_A + n_B),   δ = media_B - media_A
+#
+# La volatilidad anualizada está disponible en cualquier momento como √(M2 / (n - 1) · factor).
+
+class VolatilidadStreaming:
+
+    """
+    Volatilidad móvil de una lista de activos alimentada barra por barra (o por micro-lotes). Todas las
+    operaciones son vectorizadas sobre los activos. Cada 'recalcular' barras la media y M2 se recalculan desde el
+    buffer para que el error de redondeo no se acumule (costo amortizado O(1)).
+    """
+
+    def __init__(self, activos, ventana=390, factor=252 * 6.5 * 60, recalcular=None):
+
+        self.activos = list(activos)
+        self.ventana = ventana
+        self.factor = factor
+        self.recalcular = 10 * ventana if recalcular is None else recalcular
+        self.buffer = np.zeros((ventana, len(self.activos)))
+        self.posicion = 0       # Fila del buffer donde se escribe el siguiente rendimiento
+        self.n = 0              # Rendimientos dentro de la ventana
+        self.media = np.zeros(len(self.activos))
+        self.M2 = np.zeros(len(self.activos))
+        self.ultimo = np.full(len(self.activos), np.nan)
+        self.desde_recalculo = 0
+
+    def rendimientos(self, precios):
+
+        """
+        Rendimientos logarítmicos de un lote de precios (barras × activos) respecto al último precio recibido. Un
+        precio faltante repite el anterior (rendimiento cero); la primera barra recibida sólo fija el precio inicial.
+        """
+
+        precios = np.atleast_2d(precios)
+        if np.isnan(self.ultimo).all():
+            self.ultimo, precios = precios[0], precios[1:]
+        x = np.zeros(precios.shape)
+        for i, fila in enumerate(precios):
+            fila = np.where(np.isnan(fila), self.ultimo, fila)
+            x[i] = np.log(fila / self.ultimo)
+            self.ultimo = fila
+
+        return np.nan_to_num(x)
+
+    def actualizar(self, precio):
+
+        """
+        Ingresa una barra (un precio por activo) con la actualización de Welford.
+        """
+
+        x = self.rendimientos(precio)
+        if len(x) == 0:
+            return
+        x = x[0]
+        if self.n < self.ventana:
+            # La ventana aún no está llena: Welford clásico
+            self.n += 1
+            delta = x - self.media
+            self.media += delta / self.n
+            self.M2 += delta * (x - self.media)
+        else:
+            # Ventana llena: entra x y sale el rendimiento más viejo
+            viejo = self.buffer[self.posicion].copy()
+            media_anterior = self.media.copy()
+            self.media += (x - viejo) / self.n
+            self.M2 += (x - viejo) * (x - self.media + viejo - media_anterior)
+        self.buffer[self.posicion] = x
+        self.posicion = (self.posicion + 1) % self.ventana
+        self.controlar_error(1)
+
+    def actualizar_lote(self, precios):
+
+        """
+        Ingresa un micro-lote de barras (barras × activos, a lo más una ventana) combinando estadísticos con Chan:
+        primero se retira el bloque de rendimientos que sale de la ventana y después se agrega el lote nuevo.
+        """
+
+        x = self.rendimientos(precios)
+        m = len(x)
+        if m == 0:
+            return
+        filas = (self.posicion + np.arange(m)) % self.ventana
+
+        # Retirar los rendimientos que salen de la ventana
+        salen = max(self.n + m - self.ventana, 0)
+        if salen > 0:
+            viejos = self.buffer[filas[m - salen:] if self.n < self.ventana else filas[:salen]]
+            n_v, media_v = salen, viejos.mean(axis=0)
+            M2_v = ((viejos - media_v) ** 2).sum(axis=0)
+            n_a = self.n - n_v
+            if n_a > 0:
+                media_a = (self.n * self.media - n_v * media_v) / n_a
+                self.M2 = self.M2 - M2_v - (media_v - media_a) ** 2 * n_a * n_v / self.n
+                self.media = media_a
+            else:
+                self.media, self.M2 = np.zeros_like(self.media), np.zeros_like(self.M2)
+            self.n = n_a
+
+        # Agregar el lote nuevo
+        n_b, media_b = m, x.mean(axis=0)
+        M2_b = ((x - media_b) ** 2).sum(axis=0)
+        n_total = self.n + n_b
+        delta = media_b - self.media
+        self.M2 = self.M2 + M2_b + delta ** 2 * self.n * n_b / n_total
+        self.media = self.media + delta * n_b / n_total
+        self.n = n_total
+        self.buffer[filas] = x
+        self.posicion = (self.posicion + m) % self.ventana
+        self.controlar_error(m)
+
+    def controlar_error(self, barras):
+
+        """
+        Recalcula media y M2 desde el buffer cada 'recalcular' barras.
+        """
+
+        self.desde_recalculo += barras
+        if self.desde_recalculo >= self.recalcular and self.n == self.ventana:
+            self.media = self.buffer.mean(axis=0)
+            self.M2 = ((self.buffer - self.media) ** 2).sum(axis=0)
+            self.desde_recalculo = 0
+
+    def volatilidad(self):
+
+        """
+        Volatilidad anualizada actual de cada activo (NaN con menos de dos rendimientos).
+        """
+
+        if self.n < 2:
+            return pd.Series(np.nan, index=self.activos)
+
+        return pd.Series(np.sqrt(np.maximum(self.M2, 0) / (self.n - 1) * self.factor), index=self.activos)
+
+# Lista de seguimiento de 500 activos: una semana de barras de 1 minuto (5 sesiones × 390 barras) con volatilidad
+# que cambia durante el día (mayor en la apertura y el cierre)
+np.random.seed(42)
+num_activos, barras_sesion, sesiones = 500, 390, 5
+activos = [f"TICKER_{i:03d}" for i in range(num_activos)]
+vol_base = np.random.uniform(0.15, 0.6, num_activos)
+minuto = np.tile(np.arange(barras_sesion), sesiones)
+perfil = 1 + 0.8 * np.exp(-minuto / 30) + 0.5 * np.exp(-(barras_sesion - minuto) / 30)
+sigma_barra = vol_base[None, :] * perfil[:, None] / np.sqrt(252 * 6.5 * 60)
+precios = 100 * np.exp(np.cumsum(np.random.standard_normal(sigma_barra.shape) * sigma_barra, axis=0))
+precios[np.random.random(precios.shape) < 0.01] = np.nan  # Barras sin operaciones
+
+# Barra por barra: actualización O(1) (ventana de una sesión)
+ventana = 390
+monitor = VolatilidadStreaming(activos, ventana=ventana)
+inicio = time.perf_counter()
+for t in range(len(precios)):
+    monitor.actualizar(precios[t])
+tiempo_streaming = time.perf_counter() - inicio
+
+# Referencia: recalcular std() de toda la ventana con cada barra nueva
+serie = pd.DataFrame(precios, columns=activos).ffill()
+rendimientos = np.log(serie).diff().fillna(0).iloc[1:]
+inicio = time.perf_counter()
+for t in range(len(rendimientos)):
+    referencia = rendimientos.iloc[max(t - ventana + 1, 0):t + 1].std() * np.sqrt(252 * 6.5 * 60)
+tiempo_recalculo = time.perf_counter() - inicio
+
+print(f"{len(precios):,} barras × {num_activos} activos (ventana de {ventana} minutos)")
+print(f"Streaming (Welford): {tiempo_streaming * 1e6 / len(precios):.0f} µs por barra | "
+      f"Recalcular la ventana: {tiempo_recalculo * 1e6 / len(precios):.0f} µs por barra")
+print(f"Diferencia máxima con std() de pandas: {np.abs(monitor.volatilidad() - referencia).max():.2e}")
+
+# Micro-lotes de 5 barras (Chan)
+monitor_lotes = VolatilidadStreaming(activos, ventana=ventana)
+for inicio_lote in range(0, len(precios), 5):
+    monitor_lotes.actualizar_lote(precios[inicio_lote:inicio_lote + 5])
+print(f"Diferencia máxima entre micro-lotes y barra por barra: {np.abs(monitor_lotes.volatilidad() - monitor.volatilidad()).max():.2e}")
+
+# Vista actual de la lista de seguimiento
+print("\nActivos con mayor volatilidad de 1 minuto (anualizada) en este momento:")
+print(monitor.volatilidad().sort_values(ascending=False).head().round(4).to_string())
+
+# Historial de la volatilidad con una ventana corta (30 minutos), consultada después de cada barra
+monitor_corto = VolatilidadStreaming(activos[:1], ventana=30)
+historial = np.zeros(len(precios))
+for t in range(len(precios)):
+    monitor_corto.actualizar(precios[t, :1])
+    historial[t] = monitor_corto.volatilidad().iloc[0]
+
+# Graficar la volatilidad de un activo durante la semana
+fig, ax = plt.subplots(figsize=(22, 6))
+ax.plot(historial, label=f"{activos[0]} (ventana de 30 minutos)")
+ax.plot(vol_base[0] * perfil, color="black", linestyle="--", lw=0.8, label="Volatilidad Real")
+ax.set_title("Volatilidad Intradía en Tiempo Real")
+ax.set_xlabel("Barra de 1 Minuto")
+ax.set_ylabel("Volatilidad Anualizada")
+ax.legend()
+ax.grid()
+plt.show()
+
+# Recordatorio:
+#   - Con Welford cada barra cuesta lo mismo sin importar el tamaño de la ventana; recalcular std() crece con la ventana y con
+#     el número de activos vigilados.
+#   - La fórmula ingenua var = (Σx² - (Σx)²/n)/(n - 1) pierde precisión con rendimientos de 1 minuto (números muy pequeños);
+#     Welford actualiza las desviaciones respecto a la media y es numéricamente estable.
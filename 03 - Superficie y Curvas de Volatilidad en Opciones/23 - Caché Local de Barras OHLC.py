@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+import numpy as np
+import pandas as pd
+import tempfile
+import os
+import time
+
+# "01 - Volatilidad Histórica" (ciclo de intervalos), "01 - Delta de un Portafolio" (period="1y") y "02 - Earnings
+# con Opciones" (un yf.download por activo) vuelven a descargar el historial completo cada vez que se ejecutan. Aquí
+# las barras se guardan en disco por (activo, intervalo), en formato columnar (un arreglo por campo en un .npz), y
+# cada consulta sólo descarga lo que falta:
+#
+#   - Antes y después del rango ya consultado (top-up). El rango consultado nunca pasa del momento de la consulta, y la
+#     última barra guardada se vuelve a pedir mientras su periodo no había terminado al guardarla (sesión abierta); un
+#     rango pasado que la fuente devolvió vacío no se vuelve a pedir.
+#   - Los activos a los que les falta el mismo rango se piden juntos en una sola llamada a yf.download.
+
+# Duración de una barra por intervalo de Yahoo Finance
+duracion_intervalo = {"1m": pd.Timedelta(minutes=1), "2m": pd.Timedelta(minutes=2), "5m": pd.Timedelta(minutes=5),
+                      "15m": pd.Timedelta(minutes=15), "30m": pd.Timedelta(minutes=30), "60m": pd.Timedelta(hours=1),
+                      "1h": pd.Timedelta(hours=1), "1d": pd.Timedelta(days=1), "1wk": pd.Timedelta(days=7),
+                      "1mo": pd.Timedelta(days=31)}
+
+campos = ["Open", "High", "Low", "Close", "Volume"]
+
+def descargar_yahoo(tickers, inicio, fin, intervalo):
+
+    """
+    Descarga varios activos en una sola llamada y devuelve {ticker: DataFrame con los campos OHLCV}.
+    """
+
+    # yfinance sólo se necesita al descargar: la caché también funciona con otra fuente en 'descargar'
+    import yfinance as yf
+
+    datos = yf.download(tickers=list(tickers), start=inicio, end=fin, interval=intervalo, progress=False)
+    resultado = {}
+    for ticker in tickers:
+        df = datos.xs(ticker, axis=1, level=1) if isinstance(datos.columns, pd.MultiIndex) else datos
+        resultado[ticker] = df[campos].dropna(how="all")
+
+    return resultado
+
+class CacheBarras:
+
+    """
+    Caché local de barras OHLCV. Cada (ticker, intervalo) es un archivo .npz con las fechas (int64, UTC sin zona) y
+    un arreglo por campo, más el rango [consultado_desde, consultado_hasta) que ya se pidió a la fuente (para no volver
+    a pedir historia que Yahoo no tiene, como los minutos de hace más de 7 días, ni rangos que llegaron vacíos). La
+    carpeta por defecto, "../cache", está en .gitignore. 'reloj' devuelve el momento actual (se puede sustituir para
+    simular consultas a distintas horas).
+    """
+
+    def __init__(self, carpeta="../cache/barras", descargar=descargar_yahoo, reloj=pd.Timestamp.now):
+
+        self.carpeta = carpeta
+        self.descargar = descargar
+        self.reloj = reloj
+        self.descargas = []  # Registro de las llamadas hechas a la fuente: (tickers, inicio, fin, intervalo)
+        os.makedirs(carpeta, exist_ok=True)
+
+    def ruta(self, ticker, intervalo):
+
+        return os.path.join(self.carpeta, f"{ticker}_{intervalo}.npz")
+
+    def leer(self, ticker, intervalo):
+
+        """
+        Arreglos guardados de un activo: {"fechas", "Open", ..., "Volume", "consultado_desde", "consultado_hasta"}
+        o None.
+        """
+
+        ruta = self.ruta(ticker, intervalo)
+        if not os.path.exists(ruta):
+            return None
+        with np.load(ruta) as archivo:
+            return {nombre: archivo[nombre] for nombre in archivo.files}
+
+    def guardar(self, ticker, intervalo, df, consultado_desde, consultado_hasta):
+
+        """
+        Combina las barras nuevas con las guardadas (las nuevas reemplazan a las repetidas), amplía el rango
+        consultado y escribe el archivo.
+        """
+
+        fechas = pd.DatetimeIndex(df.index)
+        if fechas.tz is not None:
+            fechas = fechas.tz_convert("UTC").tz_localize(None)
+        nuevas = {"fechas": fechas.as_unit("ns").asi8, **{campo: df[campo].values.astype(float) for campo in campos}}
+
+        guardadas = self.leer(ticker, intervalo)
+        if guardadas is not None:
+            nuevas = {nombre: np.concatenate([guardadas[nombre], nuevas[nombre]]) for nombre in nuevas}
+            consultado_desde = min(consultado_desde, int(guardadas["consultado_desde"]))
+            consultado_hasta = max(consultado_hasta, int(guardadas["consultado_hasta"]))
+
+        # Ordenar y quedarse con la última versión de cada fecha
+        orden = np.argsort(nuevas["fechas"], kind="stable")
+        fechas = nuevas["fechas"][orden]
+        ultima = np.diff(fechas, append=np.iinfo(np.int64).max) != 0
+        np.savez(self.ruta(ticker, intervalo), consultado_desde=consultado_desde, consultado_hasta=consultado_hasta,
+                 **{nombre: valores[orden][ultima] for nombre, valores in nuevas.items()})
+
+    def faltantes(self, ticker, intervalo, inicio, fin):
+
+        """
+        Rangos [desde, hasta) que faltan en disco para cubrir [inicio, fin). Lo que ya se consultó no se vuelve a
+        pedir aunque la fuente no haya devuelto barras; sólo se repite la última barra guardada (top-up), y también
+        cuando su periodo no había terminado al consultarla (la barra del día o del minuto en curso).
+        """
+
+        guardadas = self.leer(ticker, intervalo)
+        if guardadas is None:
+            return [(inicio, fin)]
+
+        rangos = []
+        desde, hasta = pd.Timestamp(int(guardadas["consultado_desde"])), pd.Timestamp(int(guardadas["consultado_hasta"]))
+        if inicio < desde:
+            rangos.append((inicio, desde))
+        if len(guardadas["fechas"]):
+            ultima = pd.Timestamp(guardadas["fechas"][-1])
+            abierta = ultima + duracion_intervalo[intervalo] > hasta
+            if fin > max(hasta, ultima + duracion_intervalo[intervalo]) or (abierta and fin > hasta):
+                rangos.append((ultima, fin))
+        elif fin > hasta:
+            rangos.append((hasta, fin))
+
+        return rangos
+
+    def actualizar(self, tickers, intervalo="1d", inicio=None, fin=None):
+
+        """
+        Descarga sólo los rangos que faltan. Los activos que necesitan el mismo rango se piden en una sola llamada.
+        El rango se registra como consultado sólo hasta el momento actual: lo posterior todavía no existe.
+        """
+
+        ahora = self.reloj()
+        fin = ahora.normalize() + pd.Timedelta(days=1) if fin is None else pd.Timestamp(fin)
+        inicio = fin - pd.DateOffset(years=1) if inicio is None else pd.Timestamp(inicio)
+
+        # Agrupar activos por rango faltante
+        pendientes = {}
+        for ticker in tickers:
+            for rango in self.faltantes(ticker, intervalo, inicio, fin):
+                pendientes.setdefault(rango, []).append(ticker)
+
+        for (desde, hasta), grupo in pendientes.items():
+            self.descargas.append((tuple(grupo), desde, hasta, intervalo))
+            descargados = self.descargar(grupo, desde, hasta, intervalo)
+            for ticker in grupo:
+                self.guardar(ticker, intervalo, descargados.get(ticker, pd.DataFrame(columns=campos)), desde.value,
+                             min(hasta, ahora).value)
+
+    def obtener(self, tickers, intervalo="1d", inicio=None, fin=None, actualizar=True):
+
+        """
+        Barras de varios activos entre dos fechas, con el mismo formato que yf.download con varios activos
+        (columnas (Campo, Ticker)), de modo que datos["Close"] funciona igual.
+        """
+
+        tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+        fin_consulta = self.reloj().normalize() + pd.Timedelta(days=1) if fin is None else pd.Timestamp(fin)
+        inicio_consulta = fin_consulta - pd.DateOffset(years=1) if inicio is None else pd.Timestamp(inicio)
+        if actualizar:
+            self.actualizar(tickers, intervalo, inicio_consulta, fin_consulta)
+
+        series = {}
+        for ticker in tickers:
+            guardadas = self.leer(ticker, intervalo)
+            if guardadas is None:
+                continue
+            fechas = guardadas["fechas"]
+            dentro = (fechas >= inicio_consulta.value) & (fechas < fin_consulta.value)
+            indice = pd.DatetimeIndex(fechas[dentro])
+            for campo in campos:
+                series[(campo, ticker)] = pd.Series(guardadas[campo][dentro], index=indice)
+
+        return pd.DataFrame(series).sort_index(axis=1, level=0)
+
+if __name__ == "__main__":
+
+    # Caché en la carpeta local (ignorada por git)
+    cache = CacheBarras()
+
+    # Primera ejecución: un año de barras diarias de los activos de "01 - Delta de un Portafolio" (una sola descarga)
+    tickers = ["AAPL", "MSFT", "TSLA", "SPY"]
+    fin = pd.Timestamp.now().normalize() + pd.Timedelta(days=1)
+    inicio_descarga = time.perf_counter()
+    datos = cache.obtener(tickers, "1d", inicio=fin - pd.DateOffset(years=1), fin=fin)
+    print(f"Primera consulta: {datos.shape[0]} barras × {len(tickers)} activos en "
+          f"{time.perf_counter() - inicio_descarga:.2f} s ({len(cache.descargas)} llamadas a la fuente)")
+
+    # Segunda ejecución: todo sale del disco, salvo la barra del día si la sesión seguía abierta en la primera
+    cache.descargas = []
+    inicio_lectura = time.perf_counter()
+    datos = cache.obtener(tickers, "1d", inicio=fin - pd.DateOffset(years=1), fin=fin)
+    print(f"Segunda consulta: {(time.perf_counter() - inicio_lectura) * 1000:.1f} ms "
+          f"({len(cache.descargas)} llamadas a la fuente)")
+
+    # Ampliar la historia a 3 años y agregar un activo nuevo: sólo se piden los rangos que faltan
+    cache.descargas = []
+    datos = cache.obtener(tickers + ["NVDA"], "1d", inicio=fin - pd.DateOffset(years=3), fin=fin)
+    print("\nDescargas para ampliar a 3 años y agregar NVDA:")
+    for grupo, desde, hasta, intervalo in cache.descargas:
+        print(f"  {', '.join(grupo):<26} {desde.date()} -> {hasta.date()} ({intervalo})")
+
+    # Beta de cada activo respecto a SPY ("01 - Delta de un Portafolio") directamente desde la caché
+    rendimientos = datos["Close"].pct_change().dropna()
+    betas = rendimientos.cov()["SPY"] / rendimientos["SPY"].var()
+    print("\nBetas respecto a SPY (3 años):")
+    print(betas.drop("SPY").round(3).to_string())
+
+    # Volatilidad de AAPL por intervalo ("01 - Volatilidad Histórica"); la siguiente ejecución sólo descarga las
+    # barras nuevas
+    intervalos = {"1m": ("1 Minuto", pd.Timedelta(days=7), 252 * 6.5 * 60),
+                  "60m": ("60 Minutos", pd.Timedelta(days=60), 252 * 6.5),
+                  "1d": ("1 Día", pd.DateOffset(years=1), 252), "1wk": ("1 Semana", pd.DateOffset(years=3), 52)}
+    for intervalo, (nombre, periodo, factor) in intervalos.items():
+        barras = cache.obtener("AAPL", intervalo, inicio=fin - periodo, fin=fin)
+        vol = barras["Close"]["AAPL"].pct_change().std() * np.sqrt(factor)
+        print(f"{nombre:<10} -> Volatilidad Anualizada {vol:.4f} ({len(barras)} barras)")
+
+    # Dos consultas el mismo día (10:00 y 15:00) con una fuente simulada y un reloj fijo: la segunda debe completar las
+    # barras de 1 minuto y reemplazar la barra diaria, que a las 10:00 todavía estaba abierta
+    reloj = {"ahora": pd.Timestamp("2025-06-02 10:00")}
+    apertura = pd.Timestamp("2025-06-02 09:30")
+
+    def descargar_simulado(tickers, inicio, fin, intervalo):
+
+        """
+        Sesión que abrió a las 9:30 y sigue abierta a la hora del reloj: el cierre de cada barra de 1 minuto es su
+        número de minuto y la barra diaria lleva el último.
+        """
+
+        minutos = pd.date_range(apertura, reloj["ahora"], freq="1min", inclusive="left")
+        cierre = pd.Series(np.arange(len(minutos), dtype=float), index=minutos)
+        if intervalo == "1d":
+            cierre = pd.Series(cierre.values[-1:], index=[apertura.normalize()])
+        cierre = cierre[(cierre.index >= inicio) & (cierre.index < fin)]
+
+        return {ticker: pd.DataFrame({campo: cierre for campo in campos}) for ticker in tickers}
+
+    print("\nDos consultas el mismo día (fuente simulada):")
+    with tempfile.TemporaryDirectory() as carpeta:
+        simulada = CacheBarras(carpeta, descargar_simulado, reloj=lambda: reloj["ahora"])
+        for hora in ["10:00", "15:00"]:
+            reloj["ahora"] = pd.Timestamp(f"2025-06-02 {hora}")
+            simulada.descargas = []
+            minutos = simulada.obtener("AAPL", "1m")
+            diaria = simulada.obtener("AAPL", "1d")
+            print(f"  {hora} -> {len(simulada.descargas)} descargas | {len(minutos)} barras de 1 minuto (última "
+                  f"{minutos.index[-1]:%H:%M}) | Cierre de la barra diaria: {diaria['Close']['AAPL'].iloc[-1]:.0f}")
+
+# Recordatorio:
+#   - Guardar las barras por (activo, intervalo) convierte cada ejecución en una lectura de disco de milisegundos más una
+#     descarga pequeña con las barras nuevas; el historial completo sólo se descarga una vez.
+#   - Yahoo limita la historia de los intervalos intradía (1 minuto: últimos 7 días), así que conservar la caché también
+#     permite acumular más historia intradía de la que se puede descargar en una sola consulta.
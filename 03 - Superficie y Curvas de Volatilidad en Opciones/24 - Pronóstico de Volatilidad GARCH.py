@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+import time
+
+# La volatilidad de "01 - Volatilidad Histórica" sólo mira hacia atrás. Para comparar con la volatilidad implícita de
+# cada vencimiento hace falta un pronóstico; el modelo GJR-GARCH(1,1) (GARCH(1,1) cuando γ = 0) describe la varianza
+# condicional de los rendimientos diarios r_t:
+#
+#   h_t = ω + (α + γ·1[r_{t-1} < 0])·r²_{t-1} + β·h_{t-1}
+#
+# Con "variance targeting" ω = σ²·(1 - p), donde σ² es la varianza muestral y p = α + γ/2 + β la persistencia, sólo
+# se estiman (α, γ, β). La recursión se ejecuta sobre una matriz (días × activos), así que un solo ciclo sobre el
+# tiempo avanza a todos los activos a la vez; la misma recursión da el gradiente analítico de la verosimilitud y todos
+# los activos se estiman juntos con pasos BHHH en lote. El pronóstico de la varianza promedio hasta el vencimiento es cerrado:
+#
+#   E[h_{t+k}] = σ²_LP + p^(k-1)·(h_{t+1} - σ²_LP)
+#   σ²(n días) = σ²_LP + (h_{t+1} - σ²_LP)·(1 - p^n) / (n·(1 - p))
+
+def recursion_garch(r, alfa, gamma, beta, varianza_muestral, gradiente=False):
+
+    """
+    Varianza condicional h (días × activos) y, si se pide, sus derivadas respecto a (α, γ, β) con la misma recursión.
+    También devuelve h_{T+1}, la varianza del día siguiente al último dato.
+    """
+
+    dias, activos = r.shape
+    omega = varianza_muestral * (1 - alfa - 0.5 * gamma - beta)
+    negativos = (r < 0).astype(float)
+    r2 = r ** 2
+    h = np.empty((dias + 1, activos))
+    h[0] = varianza_muestral
+    if gradiente:
+        dh = np.zeros((3, dias + 1, activos))
+
+    for t in range(dias):
+        h[t + 1] = omega + (alfa + gamma * negativos[t]) * r2[t] + beta * h[t]
+        if gradiente:
+            dh[0, t + 1] = -varianza_muestral + r2[t] + beta * dh[0, t]
+            dh[1, t + 1] = -0.5 * varianza_muestral + negativos[t] * r2[t] + beta * dh[1, t]
+            dh[2, t + 1] = -varianza_muestral + h[t] + beta * dh[2, t]
+
+    if gradiente:
+        return h, dh
+    return h
+
+def log_verosimilitud(r, h):
+
+    """
+    Log-verosimilitud (normal condicional, sin constantes) de cada activo: -½·Σ(ln h_t + r²_t / h_t).
+    """
+
+    h = np.maximum(h, 1e-12)
+
+    return -0.5 * np.sum(np.log(h) + r ** 2 / h, axis=0)
+
+def ajustar_garch(r, gjr=True, inicial=(0.05, 0.05, 0.88), max_iter=100, tolerancia=1e-2):
+
+    """
+    Estima (α, γ, β) de todos los activos a la vez con el método BHHH: en cada iteración la misma recursión da los
+    gradientes por observación g_t = ½·(r²_t/h_t - 1)·∂h_t/∂θ / h_t, y cada activo avanza Δθ = (Σ g_t·g_tᵀ)⁻¹·Σ g_t
+    (sistemas 3×3 resueltos en lote). El paso se reduce a la mitad en los activos donde no mejora la
+    verosimilitud o sale de la región válida. Con gjr=False se fija γ = 0 (GARCH(1,1)). La columna "convergido"
+    marca los activos que cumplieron el criterio de convergencia antes de max_iter.
+    """
+
+    r = r - r.mean(axis=0)
+    varianza_muestral = r.var(axis=0)
+    activos = r.shape[1]
+    theta = np.repeat(np.array(inicial, dtype=float)[:, None], activos, axis=1)
+    if not gjr:
+        theta[1] = 0.0
+    minimos, maximos = np.array([[1e-6], [0.0], [0.0]]), np.array([[0.5], [0.5 if gjr else 0.0], [0.999]])
+    estancados = np.zeros(activos, dtype=bool)
+
+    for iteracion in range(max_iter):
+        h, dh = recursion_garch(r, *theta, varianza_muestral, gradiente=True)
+        h, dh = np.maximum(h[:-1], 1e-12), dh[:, :-1]
+        actual = log_verosimilitud(r, h)
+
+        # Gradientes por observación, matriz BHHH y dirección de cada activo
+        g = 0.5 * (r ** 2 / h - 1) / h * dh
+        gradiente = g.sum(axis=1)
+        B = np.einsum("itn,jtn->nij", g, g) + 1e-12 * np.eye(3)
+
+        # Parámetros en un límite con el paso apuntando hacia afuera: se fijan y se vuelve a resolver
+        fijos = np.zeros(theta.shape, dtype=bool)
+        for _ in range(3):
+            libres = (~fijos).T.astype(float)
+            B_libre = B * libres[:, :, None] * libres[:, None, :] + np.eye(3) * (1 - libres)[:, :, None]
+            paso = np.linalg.solve(B_libre, (gradiente * libres.T).T[:, :, None])[:, :, 0].T
+            fijos |= ((theta <= minimos + 1e-5) & (paso < 0)) | ((theta >= maximos - 1e-5) & (paso > 0))
+
+        # Convergencia: aumento esperado de la verosimilitud pequeño, o ningún paso que mejore en la iteración anterior
+        convergidos = (np.abs(np.sum(gradiente * paso, axis=0)) < tolerancia) | estancados
+        if convergidos.all():
+            break
+
+        # Reducir el paso donde no mejora (o donde la persistencia llega a 1)
+        pendientes = ~convergidos
+        factor = np.ones(activos)
+        for _ in range(20):
+            candidato = np.clip(theta + factor * paso, minimos, maximos)
+            valido = candidato[0] + 0.5 * candidato[1] + candidato[2] < 0.999
+            nuevo = log_verosimilitud(r, recursion_garch(r, *candidato, varianza_muestral)[:-1])
+            mejora = valido & (nuevo >= actual)
+            theta[:, pendientes & mejora] = candidato[:, pendientes & mejora]
+            pendientes &= ~mejora
+            if not pendientes.any():
+                break
+            factor = np.where(pendientes, 0.5 * factor, factor)
+        estancados = pendientes
+
+    h = recursion_garch(r, *theta, varianza_muestral)
+
+    return pd.DataFrame({"alfa": theta[0], "gamma": theta[1], "beta": theta[2], "varianza_largo_plazo": varianza_muestral,
+                         "varianza_siguiente": h[-1], "convergido": convergidos}), iteracion + 1
+
+def pronostico_volatilidad(parametros, dias_vencimiento, dias_anio=252):
+
+    """
+    Volatilidad anualizada promedio desde hoy hasta cada vencimiento (activos × vencimientos), en forma cerrada.
+    """
+
+    p = (parametros["alfa"] + 0.5 * parametros["gamma"] + parametros["beta"]).values[:, None]
+    largo_plazo = parametros["varianza_largo_plazo"].values[:, None]
+    siguiente = parametros["varianza_siguiente"].values[:, None]
+    n = np.maximum(np.asarray(dias_vencimiento, dtype=float), 1)[None, :]
+    promedio = largo_plazo + (siguiente - largo_plazo) * (1 - p ** n) / (n * (1 - p))
+
+    return np.sqrt(promedio * dias_anio)
+
+def simular_gjr(dias, alfa, gamma, beta, vol_anual, semilla=42):
+
+    """
+    Rendimientos diarios simulados de un GJR-GARCH(1,1) con innovaciones normales (días × activos).
+    """
+
+    generador = np.random.default_rng(semilla)
+    varianza = vol_anual ** 2 / 252
+    omega = varianza * (1 - alfa - 0.5 * gamma - beta)
+    h = varianza.copy()
+    r = np.empty((dias, len(alfa)))
+    for t in range(dias):
+        r[t] = np.sqrt(h) * generador.standard_normal(len(alfa))
+        h = omega + (alfa + gamma * (r[t] < 0)) * r[t] ** 2 + beta * h
+
+    return r
+
+# Universo de 1,000 activos con 4 años de rendimientos diarios simulados (parámetros conocidos)
+np.random.seed(42)
+num_activos, dias = 1000, 1000
+alfa_real = np.random.uniform(0.02, 0.07, num_activos)
+gamma_real = np.random.uniform(0.0, 0.1, num_activos)
+beta_real = np.random.uniform(0.8, 0.87, num_activos)
+vol_real = np.random.uniform(0.15, 0.6, num_activos)
+rendimientos = simular_gjr(dias, alfa_real, gamma_real, beta_real, vol_real)
+
+# Ajuste conjunto
+inicio = time.perf_counter()
+parametros, iteraciones = ajustar_garch(rendimientos)
+tiempo_ajuste = time.perf_counter() - inicio
+print(f"GJR-GARCH de {num_activos:,} activos × {dias} días ajustado en {tiempo_ajuste:.1f} segundos ({iteraciones} iteraciones BHHH)")
+if not parametros["convergido"].all():
+    print(f"Aviso: {(~parametros['convergido']).sum()} activos no convergieron en {iteraciones} iteraciones")
+errores = pd.DataFrame({"Real (mediana)": [np.median(alfa_real), np.median(gamma_real), np.median(beta_real)],
+                        "Estimado (mediana)": parametros[["alfa", "gamma", "beta"]].median().values,
+                        "Error Absoluto Mediano": [np.median(np.abs(parametros["alfa"] - alfa_real)),
+                                                   np.median(np.abs(parametros["gamma"] - gamma_real)),
+                                                   np.median(np.abs(parametros["beta"] - beta_real))]},
+                       index=["α", "γ", "β"])
+print(errores.round(4).to_string())
+
+# Vencimientos listados de la cadena de opciones (días hábiles desde la fecha de valoración)
+opciones_mercado = pd.read_csv("../datos/opciones.csv")
+fecha_datos = pd.to_datetime(opciones_mercado["lastTradeDate"]).max().tz_localize(None).normalize()
+vencimientos = pd.to_datetime(pd.Series(opciones_mercado["Expiration"].unique())).sort_values()
+dias_habiles = np.busday_count(fecha_datos.date(), (vencimientos + pd.Timedelta(days=1)).values.astype("datetime64[D]"))
+
+# Pronóstico para cada vencimiento de cada activo
+inicio = time.perf_counter()
+pronosticos = pd.DataFrame(pronostico_volatilidad(parametros, dias_habiles), index=[f"TICKER_{i:04d}" for i in range(num_activos)],
+                           columns=vencimientos.dt.strftime("%Y-%m-%d"))
+print(f"\nPronósticos: {pronosticos.shape[0]:,} activos × {pronosticos.shape[1]} vencimientos en "
+      f"{(time.perf_counter() - inicio) * 1000:.1f} ms")
+print(pronosticos.iloc[:5, [0, 5, 10, 15, -1]].round(4).to_string())
+
+# Graficar la estructura temporal del pronóstico de algunos activos
+fig, ax = plt.subplots(figsize=(22, 6))
+for i in range(5):
+    linea = ax.plot(dias_habiles, pronosticos.iloc[i] * 100, marker="o", markersize=3, label=pronosticos.index[i])
+    ax.axhline(np.sqrt(parametros["varianza_largo_plazo"].iloc[i] * 252) * 100, color=linea[0].get_color(),
+               linestyle="--", lw=0.8)
+ax.set_xscale("log")
+ax.set_title("Pronóstico GJR-GARCH de la Volatilidad hasta cada Vencimiento")
+ax.set_xlabel("Días Hábiles al Vencimiento")
+ax.set_ylabel("Volatilidad Anualizada (%)")
+ax.legend()
+ax.grid()
+plt.show()
+
+# Recordatorio:
+#   - El pronóstico GARCH revierte a la volatilidad de largo plazo a una velocidad dada por la persistencia p: los
+#     vencimientos cortos reflejan la volatilidad reciente y los largos se acercan a la de largo plazo.
+#   - γ > 0 (efecto apalancamiento) hace que las caídas aumenten más la volatilidad que las subidas, un rasgo que también
+#     explica parte del sesgo de la volatilidad implícita en acciones e índices.
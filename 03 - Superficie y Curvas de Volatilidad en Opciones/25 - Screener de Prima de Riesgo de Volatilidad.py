@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+import tempfile
+import os
+import time
+
+# Comparar la volatilidad implícita ("02 - Volatilidad Implícita") con la realizada ("01 - Volatilidad Histórica")
+# activo por activo no sirve para elegir, entre cientos de subyacentes, dónde vender prima. La prima de riesgo de
+# volatilidad (VRP) de cada vencimiento se mide contra la volatilidad realizada en un horizonte del mismo número de
+# días hábiles:
+#
+#   Spread = σ_ATM(T) - σ_realizada(n días),   Ratio = σ_ATM(T) / σ_realizada(n días)
+#
+# El proceso corre en lote sobre datos ya guardados (sin descargas por activo):
+#   - Barras diarias de la caché de "23 - Caché Local de Barras OHLC" ({ticker}_1d.npz).
+#   - Una instantánea diaria de las cadenas de todos los activos en un DataFrame (columnas de yfinance más Ticker).
+# La volatilidad ATM de cada vencimiento se interpola en el forward con una sola búsqueda binaria para todo el universo
+# y la realizada (Yang-Zhang y cierre a cierre) de cualquier horizonte sale de sumas acumuladas.
+
+# ===================================
+#  Lectura de las Cachés
+# ===================================
+
+def cargar_barras(carpeta, tickers, intervalo="1d"):
+
+    """
+    Lee las barras guardadas de varios activos y las alinea en arreglos (fechas × activos) por campo.
+    """
+
+    series = {}
+    for ticker in tickers:
+        ruta = os.path.join(carpeta, f"{ticker}_{intervalo}.npz")
+        if not os.path.exists(ruta):
+            continue
+        with np.load(ruta) as archivo:
+            indice = pd.DatetimeIndex(archivo["fechas"])
+            for campo in ["Open", "High", "Low", "Close"]:
+                series[(campo, ticker)] = pd.Series(archivo[campo], index=indice)
+    barras = pd.DataFrame(series)
+
+    return {campo: barras[campo].reindex(columns=tickers).values for campo in ["Open", "High", "Low", "Close"]}, barras.index
+
+def estructura_atm(cadena, tasa_libre_riesgo=0.05):
+
+    """
+    Volatilidad ATM-forward de cada (Ticker, Expiration) a partir de la volatilidad implícita de la cadena. El forward
+    de cada vencimiento es la mediana de la paridad put-call; luego, con la clave "número de vencimiento + posición
+    del log-moneyness en (0, 1)", una sola búsqueda binaria encuentra los strikes que rodean al forward en todo el
+    universo y se interpola linealmente en log-moneyness.
+    """
+
+    # Número de vencimiento (una sola factorización de las claves de texto)
+    grupos = cadena.groupby(["Ticker", "Expiration"], sort=True)
+    cadena = cadena.assign(rebanada=grupos.ngroup().values)
+
+    # Forward por vencimiento
+    pares = cadena.pivot_table(values="mid", index=["rebanada", "strike"], columns="Type").dropna().reset_index()
+    T = grupos["T"].first().values
+    pares["F"] = pares["strike"] + np.exp(tasa_libre_riesgo * T[pares["rebanada"]]) * (pares["call"] - pares["put"])
+    forwards = pares.groupby("rebanada")["F"].median().reindex(np.arange(grupos.ngroups)).values
+
+    # Contratos fuera del dinero
+    F = forwards[cadena["rebanada"].values]
+    strike, es_put = cadena["strike"].values, (cadena["Type"] == "put").values
+    otm = np.isfinite(F) & np.where(es_put, strike < F, strike >= F)
+    rebanada = cadena["rebanada"].values[otm]
+
+    # Índice ordenado de strikes por vencimiento y búsqueda del forward
+    k = np.log(strike[otm] / F[otm])
+    clave = rebanada + 0.5 + np.arctan(k) / np.pi
+    orden = np.argsort(clave)
+    clave, k, volatilidad, rebanada = clave[orden], k[orden], cadena["impliedVolatility"].values[otm][orden], rebanada[orden]
+    numeros = np.arange(grupos.ngroups)
+    derecho = np.clip(np.searchsorted(clave, numeros + 0.5), 1, len(clave) - 1)
+    izquierdo = derecho - 1
+    validos = (rebanada[izquierdo] == numeros) & (rebanada[derecho] == numeros)
+    with np.errstate(all="ignore"):
+        peso = np.where(k[derecho] > k[izquierdo], -k[izquierdo] / (k[derecho] - k[izquierdo]), 0.5)
+    atm = np.where(validos, (1 - peso) * volatilidad[izquierdo] + peso * volatilidad[derecho], np.nan)
+
+    resultado = pd.DataFrame({"T": T, "F": forwards, "IV ATM": atm,
+                              "Contratos": np.bincount(rebanada, minlength=grupos.ngroups)}, index=grupos.size().index)
+
+    return resultado
+
+def volatilidad_realizada_horizonte(apertura, maximo, minimo, cierre, horizontes, columnas, factor=252):
+
+    """
+    Volatilidad realizada de las últimas n barras para pares (activo, horizonte) arbitrarios: 'columnas' indica el
+    activo de cada consulta y 'horizontes' su número de barras. Con sumas acumuladas cada consulta es una resta.
+    Devuelve (Yang-Zhang, Cierre a Cierre).
+    """
+
+    o = np.log(apertura[1:] / cierre[:-1])
+    u = np.log(maximo[1:] / apertura[1:])
+    d = np.log(minimo[1:] / apertura[1:])
+    c = np.log(cierre[1:] / apertura[1:])
+    r = np.log(cierre[1:] / cierre[:-1])
+    validos = np.isfinite(o + u + d + c + r)
+
+    # Suma de las últimas n barras de cada término para cada consulta
+    n = np.clip(horizontes, 2, len(r)).astype(int)
+    def ultimas(x):
+        acumulada = np.vstack([np.zeros((1, x.shape[1])), np.cumsum(np.where(validos, x, 0.0), axis=0)])
+        return acumulada[-1, columnas] - acumulada[-1 - n, columnas]
+
+    conteo = ultimas(np.ones_like(r))
+    s_o, s_o2, s_c, s_c2 = ultimas(o), ultimas(o ** 2), ultimas(c), ultimas(c ** 2)
+    s_r, s_r2, s_rs = ultimas(r), ultimas(r ** 2), ultimas(u * (u - c) + d * (d - c))
+
+    kappa = 0.34 / (1.34 + (conteo + 1) / (conteo - 1))
+    var_o = (s_o2 - s_o ** 2 / conteo) / (conteo - 1)
+    var_c = (s_c2 - s_c ** 2 / conteo) / (conteo - 1)
+    yang_zhang = var_o + kappa * var_c + (1 - kappa) * s_rs / conteo
+    cierre_cierre = (s_r2 - s_r ** 2 / conteo) / (conteo - 1)
+    completas = conteo > 0.9 * n
+
+    return (np.where(completas, np.sqrt(np.maximum(yang_zhang, 0) * factor), np.nan),
+            np.where(completas, np.sqrt(np.maximum(cierre_cierre, 0) * factor), np.nan))
+
+def screener_vrp(cadena, carpeta_barras, fecha, dias_objetivo=30, dias_minimos=14, dias_maximos=60, min_contratos=20):
+
+    """
+    Tabla de VRP de todos los vencimientos de todos los activos y la lista corta: por activo, el vencimiento más
+    cercano a 'dias_objetivo' dentro de [dias_minimos, dias_maximos], ordenada por el ratio IV/RV.
+    """
+
+    # Volatilidad ATM por vencimiento
+    estructura = estructura_atm(cadena).reset_index()
+    estructura = estructura[estructura["Contratos"] >= min_contratos]
+
+    # Volatilidad realizada en el mismo horizonte (días hábiles al vencimiento)
+    tickers = list(estructura["Ticker"].unique())
+    barras, _ = cargar_barras(carpeta_barras, tickers)
+    estructura["Días"] = np.busday_count(fecha.date(), (pd.to_datetime(estructura["Expiration"]) + pd.Timedelta(days=1))
+                                       .values.astype("datetime64[D]"))
+    columnas = estructura["Ticker"].map({ticker: j for j, ticker in enumerate(tickers)}).values
+    estructura["RV Yang-Zhang"], estructura["RV Cierre"] = volatilidad_realizada_horizonte(
+        barras["Open"], barras["High"], barras["Low"], barras["Close"], estructura["Días"].values, columnas)
+
+    # Prima de riesgo de volatilidad
+    estructura["Spread"] = estructura["IV ATM"] - estructura["RV Yang-Zhang"]
+    estructura["Ratio"] = estructura["IV ATM"] / estructura["RV Yang-Zhang"]
+
+    # Lista corta: un vencimiento por activo, ordenada por ratio
+    candidatos = estructura[(estructura["Días"] >= dias_minimos) & (estructura["Días"] <= dias_maximos)].dropna(subset=["Ratio"])
+    candidatos = candidatos.assign(distancia=(candidatos["Días"] - dias_objetivo).abs())
+    lista = candidatos.sort_values("distancia").groupby("Ticker").head(1).drop(columns="distancia")
+    lista = lista.sort_values("Ratio", ascending=False).set_index("Ticker")
+    lista["Percentil"] = lista["Ratio"].rank(pct=True)
+
+    return estructura, lista
+
+# ===================================
+#  Universo de Demostración
+# ===================================
+
+def simular_ohlc(num_barras, volatilidades, precios_iniciales, fraccion_gap=0.2, pasos_intradia=78, semilla=42):
+
+    """
+    Barras OHLC diarias de un Movimiento Browniano Geométrico (gap nocturno + recorrido intradía).
+    """
+
+    generador = np.random.default_rng(semilla)
+    sigma_dia = volatilidades[None, :] / np.sqrt(252)
+    forma = (num_barras, len(volatilidades))
+    log_apertura = np.cumsum(generador.standard_normal(forma) * sigma_dia * np.sqrt(fraccion_gap), axis=0)
+    log_actual, log_maximo, log_minimo = log_apertura.copy(), log_apertura.copy(), log_apertura.copy()
+    for _ in range(pasos_intradia):
+        log_actual += generador.standard_normal(forma) * sigma_dia * np.sqrt((1 - fraccion_gap) / pasos_intradia)
+        np.maximum(log_maximo, log_actual, out=log_maximo)
+        np.minimum(log_minimo, log_actual, out=log_minimo)
+    desplazamiento = np.vstack([np.zeros((1, forma[1])), np.cumsum(log_actual - log_apertura, axis=0)[:-1]])
+
+    return [precios_iniciales[None, :] * np.exp(x + desplazamiento) for x in (log_apertura, log_maximo, log_minimo, log_actual)]
+
+# Cadena de SPY como plantilla (la fecha de valoración es la del último trade registrado)
+opciones_mercado = pd.read_csv("../datos/opciones.csv")
+fecha_datos = pd.to_datetime(opciones_mercado["lastTradeDate"]).max().tz_localize(None).normalize()
+opciones_mercado["T"] = ((pd.to_datetime(opciones_mercado["Expiration"]) - fecha_datos).dt.days + 1) / 365
+opciones_mercado["mid"] = (opciones_mercado["bid"] + opciones_mercado["ask"]) / 2
+plantilla = opciones_mercado[(opciones_mercado["bid"] > 0) & (opciones_mercado["impliedVolatility"] > 0.01) &
+                             (opciones_mercado["T"] > 1 / 365)][["Expiration", "T", "strike", "Type", "mid", "impliedVolatility"]]
+estructura_spy = estructura_atm(plantilla.assign(Ticker="SPY"))
+iv_30_spy = np.interp(30 / 365, estructura_spy["T"].values, estructura_spy["IV ATM"].values)
+
+# Universo de demostración: 400 activos con volatilidad realizada conocida y una VRP distinta por activo. Las barras
+# simuladas se escriben con el formato de la caché de barras en una carpeta temporal (para no mezclarlas con la caché
+# real) y las cadenas se construyen en memoria
+carpeta_barras = tempfile.mkdtemp(prefix="barras_demo_")
+np.random.seed(42)
+num_activos = 400
+tickers = [f"TICKER_{i:03d}" for i in range(num_activos)]
+vol_real = np.random.uniform(0.15, 0.7, num_activos)
+vrp_real = np.random.uniform(-0.1, 0.4, num_activos)
+escala_precio = np.random.uniform(0.05, 1.5, num_activos)
+fechas = pd.bdate_range(end=fecha_datos, periods=300)
+apertura, maximo, minimo, cierre = simular_ohlc(len(fechas), vol_real, 600 * escala_precio)
+for j, ticker in enumerate(tickers):
+    np.savez(os.path.join(carpeta_barras, f"{ticker}_1d.npz"), fechas=fechas.asi8, consultado_desde=fechas.asi8[0],
+             consultado_hasta=(fechas[-1] + pd.Timedelta(days=1)).value, Open=apertura[:, j], High=maximo[:, j],
+             Low=minimo[:, j], Close=cierre[:, j], Volume=np.ones(len(fechas)))
+cadena = pd.concat([plantilla.assign(Ticker=ticker, strike=plantilla["strike"] * escala_precio[j],
+                                     mid=plantilla["mid"] * escala_precio[j],
+                                     impliedVolatility=plantilla["impliedVolatility"] * vol_real[j] * (1 + vrp_real[j]) / iv_30_spy)
+                    for j, ticker in enumerate(tickers)], ignore_index=True)
+
+# Proceso en lote: leer las barras y generar la lista corta
+inicio = time.perf_counter()
+estructura, lista_corta = screener_vrp(cadena, carpeta_barras, fecha_datos)
+tiempo_total = time.perf_counter() - inicio
+print(f"Screener de VRP: {cadena['Ticker'].nunique()} activos, {len(cadena):,} contratos y {len(estructura):,} vencimientos "
+      f"en {tiempo_total:.2f} segundos")
+
+print("\nLista Corta para Vender Prima (vencimiento más cercano a 30 días):")
+columnas_lista = ["Expiration", "Días", "IV ATM", "RV Yang-Zhang", "RV Cierre", "Spread", "Ratio", "Percentil"]
+print(lista_corta[columnas_lista].head(10).round(4).to_string())
+
+# Validación con la VRP simulada
+vrp_estimada = lista_corta["Ratio"].reindex(tickers) - 1
+print(f"\nCorrelación entre la VRP estimada y la simulada: {np.corrcoef(vrp_estimada.fillna(0), vrp_real)[0, 1]:.3f}")
+
+# Graficar IV vs RV del universo
+fig, ax = plt.subplots(figsize=(12, 8))
+ax.scatter(lista_corta["RV Yang-Zhang"] * 100, lista_corta["IV ATM"] * 100, s=10, c=lista_corta["Ratio"], cmap="RdYlGn")
+limite = max(lista_corta["IV ATM"].max(), lista_corta["RV Yang-Zhang"].max()) * 100
+ax.plot([0, limite], [0, limite], color="black", linestyle="--", lw=0.8, label="IV = RV")
+for ticker in lista_corta.index[:10]:
+    ax.annotate(ticker, (lista_corta.loc[ticker, "RV Yang-Zhang"] * 100, lista_corta.loc[ticker, "IV ATM"] * 100), fontsize=8)
+ax.set_title("Volatilidad Implícita ATM vs Realizada (≈30 días)")
+ax.set_xlabel("Volatilidad Realizada Yang-Zhang (%)")
+ax.set_ylabel("Volatilidad Implícita ATM (%)")
+ax.legend()
+ax.grid()
+plt.show()
+
+# Recordatorio:
+#   - La volatilidad implícita suele ser mayor que la realizada (prima de riesgo de volatilidad): es la compensación que
+#     reciben los vendedores de opciones por asumir el riesgo de movimientos extremos.
+#   - Un ratio IV/RV alto no garantiza una venta rentable: eventos conocidos (earnings, decisiones de tasas) elevan la IV
+#     con razón, así que la lista corta debe revisarse contra el calendario de eventos antes de operar.
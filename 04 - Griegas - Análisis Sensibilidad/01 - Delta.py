@@ -60,8 +60,8 @@ def graficar_delta(S_min=50, S_max=150, K=100, T=0.5, r=0.05, sigma=0.25):
     
     # Calcular diferentes Deltas
     precios = np.linspace(start=S_min, stop=S_max, num=200)
-    delta_calls = [black_scholes_delta(S, K, T, r, sigma, q=0, tipo="call") for S in precios]
-    delta_puts = [black_scholes_delta(S, K, T, r, sigma, q=0, tipo="put") for S in precios]
+    delta_calls = black_scholes_delta(precios, K, T, r, sigma, q=0, tipo="call")
+    delta_puts = black_scholes_delta(precios, K, T, r, sigma, q=0, tipo="put")
     # Graficar
     plt.figure(figsize=(22, 10), dpi=300)
     plt.plot(precios, delta_calls, label="Delta Call", color="blue")
@@ -87,12 +87,10 @@ cadena_opciones = activo.option_chain(date=fecha_objetivo)
 calls, puts, underlying_info = cadena_opciones
 precio_spot = underlying_info["regularMarketPrice"]
 # Calcular Delta real para cada opción dentro de la cadena de opciones
-calls["Delta"] = calls.apply(lambda x: black_scholes_delta(S=precio_spot, K=x["strike"], T=tiempo_restante, 
-                                                           r=0.05, sigma=x["impliedVolatility"], q=0, tipo="call"),
-                             axis=1)
-puts["Delta"] = puts.apply(lambda x: black_scholes_delta(S=precio_spot, K=x["strike"], T=tiempo_restante, 
-                                                           r=0.05, sigma=x["impliedVolatility"], q=0, tipo="put"),
-                             axis=1)
+calls["Delta"] = black_scholes_delta(S=precio_spot, K=calls["strike"].values, T=tiempo_restante, 
+                                     r=0.05, sigma=calls["impliedVolatility"].values, q=0, tipo="call")
+puts["Delta"] = black_scholes_delta(S=precio_spot, K=puts["strike"].values, T=tiempo_restante, 
+                                    r=0.05, sigma=puts["impliedVolatility"].values, q=0, tipo="put")
 
 # Gráfico: Delta vs Strike
 plt.figure(figsize=(22, 6), dpi=300)
@@ -117,11 +115,11 @@ iv_representativa = calls.iloc[idx_strike_cercano]["impliedVolatility"]
 rango_S = np.linspace(precio_spot * 0.80, precio_spot * 1.20, num=200)
 
 # Calcular Delta usando parámetros reales pero variando S
-deltas_call_real = [black_scholes_delta(S=S, K=strike_representativo, T=tiempo_restante, 
-                                        r=0.05, sigma=iv_representativa, q=0, tipo="call") for S in rango_S]
-deltas_put_real = [black_scholes_delta(S=S, K=strike_representativo, T=tiempo_restante, 
-                                        r=0.05, sigma=puts[puts["strike"]==strike_representativo]["impliedVolatility"].iloc[0],
-                                        q=0, tipo="put") for S in rango_S]
+deltas_call_real = black_scholes_delta(S=rango_S, K=strike_representativo, T=tiempo_restante, 
+                                       r=0.05, sigma=iv_representativa, q=0, tipo="call")
+deltas_put_real = black_scholes_delta(S=rango_S, K=strike_representativo, T=tiempo_restante, 
+                                      r=0.05, sigma=puts[puts["strike"]==strike_representativo]["impliedVolatility"].iloc[0],
+                                      q=0, tipo="put")
 
 # Gráfico: Delta vs Precio del Subyacente (Real)
 plt.figure(figsize=(22, 6))
@@ -149,16 +147,17 @@ def analisis_comportamiento():
     volatidades = [0.10, 0.30, 0.60]
     tiempos = [0.05, 0.5, 1.0]
     
+    # Obtener Deltas de toda la malla (volatilidad × tiempo × precio) en una sola llamada
+    deltas = black_scholes_delta(S=precios[None, None, :], K=K, T=np.array(tiempos)[None, :, None], r=r,
+                                 sigma=np.array(volatidades)[:, None, None], q=0, tipo="call")
+    
     # Crear Gráfico
     plt.figure(figsize=(22, 6), dpi=300)
     
     for i, sigma in enumerate(volatidades):
         plt.subplot(1, 3, i + 1)
-        for T in tiempos:
-            # Obtener Deltas variando los parámetros
-            deltas = [black_scholes_delta(S=S_actual, K=K, T=T, r=r, sigma=sigma, q=0, tipo="call")
-                      for S_actual in precios]
-            plt.plot(precios, deltas, label=f"T={T:.2f} años")
+        for j, T in enumerate(tiempos):
+            plt.plot(precios, deltas[i, j], label=f"T={T:.2f} años")
         # Agregar detalles al gráfico
         plt.title(f"Delta Call con Volatilidad = {sigma}")
         plt.ylabel("Delta")
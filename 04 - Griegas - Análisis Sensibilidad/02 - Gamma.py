@@ -51,7 +51,7 @@ def graficar_gamma(S_min=50, S_max=150, K=100, T=0.5, r=0.05, sigma=0.25):
 
     # Crear rango de precios y calcular gamma
     precios = np.linspace(S_min, S_max, 200)
-    gammas = [calcular_gamma(S, K, T, r, sigma) for S in precios]
+    gammas = calcular_gamma(precios, K, T, r, sigma)
     # Generar Plot
     plt.figure(figsize=(22, 10), dpi=300)
     plt.plot(precios, gammas, label="Gamma", color="purple")
@@ -84,6 +84,8 @@ def analisis_sensibilidad_gamma():
     tiempos = [0.05, 0.5, 1.0]
     # Crear rangos de precios
     precios = np.linspace(50, 150, 200)
+    # Calcular gammas de toda la malla (volatilidad × tiempo × precio) en una sola llamada
+    gammas = calcular_gamma(precios[None, None, :], K, np.array(tiempos)[None, :, None], r, np.array(volatilidades)[:, None, None])
     
     # Generar gráfico
     plt.figure(figsize=(22, 10), dpi=300)
@@ -91,10 +93,8 @@ def analisis_sensibilidad_gamma():
     for i, sigma in enumerate(volatilidades):
         # Generar Subplot
         plt.subplot(1, 3, i+1)
-        for T in tiempos:
-            # Calcular gammas con parámetros de la iteración
-            gammas = [calcular_gamma(S, K, T, r, sigma) for S in precios]
-            plt.plot(precios, gammas, label=f"T={T:.2f}")
+        for j, T in enumerate(tiempos):
+            plt.plot(precios, gammas[i, j], label=f"T={T:.2f}")
         plt.axvline(K, color="gray", linestyle="--", label="Precio Strike (K)")
         plt.title(f"Gamma con Volatilidad = {sigma}")
         plt.xlabel("Precio del Subyacente")
@@ -61,8 +61,8 @@ def graficar_Theta(S_min = 50, S_max = 150, K = 100, T=0.5, r=0.05, sigma = 0.25
 
     # Calcular Theta
     precios = np.linspace(S_min, S_max, 200)
-    thetas_call = [calcular_theta(S, K, T, r, sigma, tipo_opcion="call") for S in precios]
-    thetas_put = [calcular_theta(S, K, T, r, sigma, tipo_opcion="put") for S in precios]
+    thetas_call = calcular_theta(precios, K, T, r, sigma, tipo_opcion="call")
+    thetas_put = calcular_theta(precios, K, T, r, sigma, tipo_opcion="put")
     # Graficar
     plt.figure(figsize=(22, 6), dpi=300)
     plt.plot(precios, thetas_call, label=f"Theta Call (T={T*365:.1f} días)", color="brown")
@@ -96,8 +96,8 @@ def graficar_theta_multiples_vencimientos(S_min=35, S_max=65, K=50, r=0.05, sigm
     # Iterar en Parámetros
     for i, T_dias in enumerate(vencimientos_dias):
         T = T_dias / 365
-        thetas_call = [calcular_theta(S, K, T, r, sigma, tipo_opcion="call") for S in precios]
-        thetas_put = [calcular_theta(S, K, T, r, sigma, tipo_opcion="put") for S in precios]
+        thetas_call = calcular_theta(precios, K, T, r, sigma, tipo_opcion="call")
+        thetas_put = calcular_theta(precios, K, T, r, sigma, tipo_opcion="put")
         axs[0].plot(precios, thetas_call, label=f"{T_dias} días", color=colores[i])
         axs[1].plot(precios, thetas_put, label=f"{T_dias} días", color=colores[i])
         
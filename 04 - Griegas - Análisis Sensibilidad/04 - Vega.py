@@ -51,7 +51,7 @@ def graficar_vega(S_min=50, S_max=150, K=100, T=0.5, r=0.05, sigma=0.20):
     
     # Definir rango de precios y calcular vega
     precios = np.linspace(S_min, S_max, 300)
-    vegas = [calcular_vega(S, K, T, r, sigma) for S in precios]
+    vegas = calcular_vega(precios, K, T, r, sigma)
     # Plot
     plt.figure(figsize=(22, 6), dpi=300)
     plt.plot(precios, vegas, label=f"Vega (T={int(T * 365)} días)", color="purple")
@@ -82,7 +82,7 @@ def graficar_vega_multiples_vencimientos(K=100, sigma=0.25, r=0.01):
     # Iterar en Vencimientos
     for i, T_dias in enumerate(vencimientos_dias):
         T = T_dias / 365
-        vegas = [calcular_vega(S, K, T, r, sigma) for S in precios]
+        vegas = calcular_vega(precios, K, T, r, sigma)
         plt.plot(precios, vegas, label=f"{T_dias} días", color=colores[i])
     # Agregar etiquetas al plot
     plt.axvline(K, label="Strike", color="gray", linestyle="--")
@@ -110,7 +110,7 @@ def graficar_vega_vs_tiempo():
     sigma = 0.25
     T_list = np.linspace(start=0.01, stop=1.0, num=365)
     # Calcular Vegas
-    vegas = [calcular_vega(S, K, T, r, sigma) for T in T_list]
+    vegas = calcular_vega(S, K, T_list, r, sigma)
     # Plot
     plt.figure(figsize=(22, 6), dpi=300)
     T_list_dias = T_list * 365
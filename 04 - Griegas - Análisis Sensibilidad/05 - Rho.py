@@ -64,8 +64,8 @@ def graficar_rho_vs_Tasas(S=100, K=100, T=1, sigma=0.3):
 
     # Calcular Primas de Opciones (Calls y Puts)
     tasas = np.linspace(0.001, 0.10, 200) # Tasas desde 0.1% hasta 10% Anual
-    rhos_call = [calcular_rho(S, K, T, r, sigma, tipo_opcion="call") for r in tasas]
-    rhos_put = [calcular_rho(S, K, T, r, sigma, tipo_opcion="put") for r in tasas]
+    rhos_call = calcular_rho(S, K, T, tasas, sigma, tipo_opcion="call")
+    rhos_put = calcular_rho(S, K, T, tasas, sigma, tipo_opcion="put")
     # Definir Plot
     plt.figure(figsize=(22, 6), dpi=300)
     plt.plot(tasas * 100, rhos_call, label="Rho Call", color="navy")
@@ -90,8 +90,8 @@ def graficar_rho_por_vencimiento(S=100, K=100, r=0.05, sigma=0.3):
     
     # Calcular
     vencimientos = np.linspace(0.01, 2, 100)
-    rho_call_vals = [calcular_rho(S, K, T, r, sigma, tipo_opcion="call") for T in vencimientos]
-    rho_put_vals = [calcular_rho(S, K, T, r, sigma, tipo_opcion="put") for T in vencimientos]
+    rho_call_vals = calcular_rho(S, K, vencimientos, r, sigma, tipo_opcion="call")
+    rho_put_vals = calcular_rho(S, K, vencimientos, r, sigma, tipo_opcion="put")
     # Plot
     plt.figure(figsize=(22, 6), dpi=300)
     plt.plot(vencimientos * 365, rho_call_vals, label="Rho Call", color="navy")
@@ -127,9 +127,79 @@ for tipo in tipos_opcion:
     Theta: {res['theta']:6f}
     Vega (por punto %): {res['vega']:6f}    
           """)
+
+# Griegas de Orden Superior: la aproximación DGTV trata por separado los cambios en precio, tiempo y volatilidad.
+# Cuando el subyacente y la volatilidad se mueven a la vez (una caída con aumento de volatilidad) faltan los términos
+# cruzados, y con movimientos grandes también el cambio de Gamma (Speed con el precio, Zomma con la volatilidad):
+#
+#   ΔV ≈ DGTV + Vanna × ΔS × Δσ + ½ × Volga × (Δσ)² + Charm × ΔS × Δt + Veta × Δσ × Δt
+#             + ⅙ × Speed × (ΔS)³ + ½ × Zomma × (ΔS)² × Δσ
+
+# Definir una función para calcular las griegas de orden superior
+def calcular_griegas_orden_superior(S, K, T, r, sigma):
+    
+    """
+    Calcula Vanna, Volga, Charm, Veta, Speed y Zomma de una opción europea (iguales para Calls y Puts sin dividendos),
+    con las mismas unidades que calcular_griegas: por punto % de volatilidad y por día.
+    """
+    
+    # Calcular (mismos d1, d2 y densidad que las griegas de primer orden)
+    d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * np.sqrt(T))
+    d2 = d1 - sigma * np.sqrt(T)
+    densidad = norm.pdf(d1)
+    vega = S * densidad * np.sqrt(T)
+    gamma = densidad / (S * sigma * np.sqrt(T))
+    # Obtener griegas de orden superior
+    vanna = -densidad * d2 / sigma / 100
+    volga = vega * d1 * d2 / sigma / 100 ** 2
+    charm = -densidad * (2 * r * T - d2 * sigma * np.sqrt(T)) / (2 * T * sigma * np.sqrt(T)) / 365
+    veta = vega * (r * d1 / (sigma * np.sqrt(T)) - (1 + d1 * d2) / (2 * T)) / (100 * 365)
+    speed = -gamma / S * (d1 / (sigma * np.sqrt(T)) + 1)
+    zomma = gamma * (d1 * d2 - 1) / sigma / 100
+    
+    return vanna, volga, charm, veta, speed, zomma
+
+# Definir Función de Aproximación con griegas de orden superior
+def aproximacion_orden_superior(S, K, T, r, sigma, delta_S, delta_t, delta_sigma, option_type="call"):
+    
+    """
+    Aproximación Delta-Gamma-Theta-Vega más los términos de Vanna, Volga, Charm, Veta, Speed y Zomma.
+    """
+    
+    # Aproximación DGTV
+    precio_aproximacion, precio_original, cambio_valor, _ = delta_gamma_theta_vega_aprox(S, K, T, r, sigma, delta_S, delta_t,
+                                                                                          delta_sigma, option_type)
+    # Agregar términos de orden superior
+    griegas = calcular_griegas_orden_superior(S, K, T, r, sigma)
+    vanna, volga, charm, veta, speed, zomma = griegas
+    cambio_adicional = (vanna * delta_S * delta_sigma + 0.5 * volga * delta_sigma ** 2 + charm * delta_S * delta_t +
+                        veta * delta_sigma * delta_t + speed * delta_S ** 3 / 6 + 0.5 * zomma * delta_S ** 2 * delta_sigma)
+    
+    return precio_aproximacion + cambio_adicional, precio_original, cambio_valor + cambio_adicional, griegas
+
+# Comparar contra el precio exacto en escenarios de movimientos conjuntos (ΔS, Δσ en puntos %)
+escenarios = [(2, -5), (-5, 5), (-10, 10), (10, -5)]
+print(f"Escenarios conjuntos con {delta_t} día de paso del tiempo:")
+for tipo in tipos_opcion:
+    print(f"\n    {tipo.capitalize():<6}{'ΔS':>6}{'Δσ':>6}{'Exacto':>10}{'DGTV':>10}{'Orden Superior':>16}")
+    for dS, dsigma in escenarios:
+        exacto = black_scholes_price(S + dS, K, T - delta_t / 365, r, sigma + dsigma / 100, option_type=tipo)
+        dgtv = delta_gamma_theta_vega_aprox(S, K, T, r, sigma, dS, delta_t, dsigma, option_type=tipo)[0]
+        orden_superior = aproximacion_orden_superior(S, K, T, r, sigma, dS, delta_t, dsigma, option_type=tipo)[0]
+        print(f"    {'':<6}{dS:>6}{dsigma:>6}{exacto:>10.4f}{dgtv:>10.4f}{orden_superior:>16.4f}")
+
+# Error medio sobre una malla de escenarios (ΔS de -10 a 10, Δσ de -10 a 10 puntos)
+malla_S, malla_sigma = np.meshgrid(np.linspace(-10, 10, 41), np.linspace(-10, 10, 41))
+exacto = black_scholes_price(S + malla_S, K, T - delta_t / 365, r, sigma + malla_sigma / 100, option_type="call")
+error_dgtv = np.abs(delta_gamma_theta_vega_aprox(S, K, T, r, sigma, malla_S, delta_t, malla_sigma)[0] - exacto)
+error_orden_superior = np.abs(aproximacion_orden_superior(S, K, T, r, sigma, malla_S, delta_t, malla_sigma)[0] - exacto)
+print(f"\nError medio (Call) en {malla_S.size:,} escenarios: DGTV ${error_dgtv.mean():.4f} | Con orden superior "
+      f"${error_orden_superior.mean():.4f}")
     
 # Recordatorio:
 #   - La Función de Aproximación DGTV permite estimar rápidamente cómo varía el precio de una opción ante pequeños
 #     cambios en el precio del subyacente, volatilidad y tiempo, sin recalcular el modelo completo de Black-Scholes.
 #   - También facilita la toma de decisiones informadas en trading, simulando escenarios futuros y evaluando pérdidas
 #     o ganancias esperadas, especialmente útil para ajustar, cubrir o cerrar posiciones con opciones.
+#   - Con movimientos conjuntos de precio y volatilidad, los términos de Vanna, Volga y Zomma corrigen la mayor parte
+#     del error de la aproximación DGTV sin necesidad de volver a valuar la opción.
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+import numpy as np
+import matplotlib.pyplot as plt
+from scipy.stats import norm
+import time
+
+# Breve explicación
+print("""
+Las funciones de "01 - Delta" a "05 - Rho" calculan una griega para un solo punto y los análisis de sensibilidad las
+llaman una vez por cada combinación de precio, tiempo y volatilidad.
+
+Todas las griegas de Black-Scholes-Merton comparten los mismos intermedios: d1, d2, N(d1), N(d2) y n(d1). Si S, T,
+sigma y r se pasan como mallas (arreglos que se combinan por broadcasting), esos intermedios se calculan una sola vez
+para toda la malla y cada griega es una operación sobre arreglos completos:
+
+    - Una malla de 200 precios × 50 vencimientos × 20 volatilidades (200,000 puntos) es una sola llamada.
+    - Los gráficos de sensibilidad sólo toman cortes del tensor ya calculado, sin volver a evaluar el modelo.
+    - Las griegas de orden superior (Vanna, Volga, Charm, Veta, Speed, Color y Zomma) usan los mismos intermedios, así
+      que salen en la misma llamada en lugar de mover cada parámetro y volver a valuar (bump and reprice).
+""")
+
+# Definir función que calcula todas las griegas sobre una malla
+def griegas_malla(S, K, T, r, sigma, q=0):
+
+    """
+    Calcula precio, Delta, Gamma, Theta, Vega y Rho de Calls y Puts europeas, y las griegas de segundo y tercer orden
+    (Vanna, Volga, Charm, Veta, Speed, Color y Zomma). Los parámetros pueden ser números o arreglos de cualquier forma
+    compatible (broadcasting); el resultado es un diccionario de arreglos N-D. Las unidades siguen a las griegas de
+    primer orden: por día de paso del tiempo y por cambio del 1% en volatilidad o tasa.
+    """
+
+    # Intermedios compartidos
+    S, K, T, r, sigma, q = np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in (S, K, T, r, sigma, q)])
+    raiz_T = np.sqrt(T)
+    sigma_raiz_T = sigma * raiz_T
+    d1 = (np.log(S / K) + (r - q + 0.5 * sigma ** 2) * T) / sigma_raiz_T
+    d2 = d1 - sigma_raiz_T
+    descuento_r = np.exp(-r * T)
+    descuento_q = np.exp(-q * T)
+    N_d1 = norm.cdf(d1)
+    N_d2 = norm.cdf(d2)
+    n_d1 = norm.pdf(d1)
+
+    # Griegas
+    termino_tiempo = -S * descuento_q * n_d1 * sigma / (2 * raiz_T)
+    gamma = descuento_q * n_d1 / (S * sigma_raiz_T)
+    vega = S * descuento_q * n_d1 * raiz_T
+    termino_charm = descuento_q * n_d1 * (2 * (r - q) * T - d2 * sigma_raiz_T) / (2 * T * sigma_raiz_T)
+    griegas = {
+
+        "precio_call": S * descuento_q * N_d1 - K * descuento_r * N_d2,
+        "precio_put": K * descuento_r * (1 - N_d2) - S * descuento_q * (1 - N_d1),
+        "delta_call": descuento_q * N_d1,
+        "delta_put": descuento_q * (N_d1 - 1),
+        "gamma": gamma,
+        "theta_call": (termino_tiempo - r * K * descuento_r * N_d2 + q * S * descuento_q * N_d1) / 365,
+        "theta_put": (termino_tiempo + r * K * descuento_r * (1 - N_d2) - q * S * descuento_q * (1 - N_d1)) / 365,
+        "vega": vega / 100,
+        "rho_call": K * T * descuento_r * N_d2 / 100,
+        "rho_put": -K * T * descuento_r * (1 - N_d2) / 100,
+
+        # Segundo orden: ∂Delta/∂σ, ∂Vega/∂σ, ∂Delta/∂t y ∂Vega/∂t
+        "vanna": -descuento_q * n_d1 * d2 / sigma / 100,
+        "volga": vega * d1 * d2 / sigma / 100 ** 2,
+        "charm_call": (q * descuento_q * N_d1 - termino_charm) / 365,
+        "charm_put": (-q * descuento_q * (1 - N_d1) - termino_charm) / 365,
+        "veta": vega * (q + (r - q) * d1 / sigma_raiz_T - (1 + d1 * d2) / (2 * T)) / (100 * 365),
+
+        # Tercer orden: ∂Gamma/∂S, ∂Gamma/∂t y ∂Gamma/∂σ
+        "speed": -gamma / S * (d1 / sigma_raiz_T + 1),
+        "color": gamma / (2 * T) * (2 * q * T + 1 + (2 * (r - q) * T - d2 * sigma_raiz_T) * d1 / sigma_raiz_T) / 365,
+        "zomma": gamma * (d1 * d2 - 1) / sigma / 100
+
+        }
+
+    return griegas
+
+# Función puntual de "02 - Gamma" (referencia)
+def calcular_gamma(S, K, T, r, sigma):
+
+    """
+    Calcula la Gamma de una opción europea usando el Modelo BS.
+    """
+
+    # Realizar cálculo
+    d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * np.sqrt(T))
+    gamma = norm.pdf(d1) / (S * sigma * np.sqrt(T))
+
+    return gamma
+
+# Definir Malla: precios (eje 0), vencimientos (eje 1) y volatilidades (eje 2)
+K = 100
+r = 0.05
+precios = np.linspace(50, 150, 200)
+tiempos = np.linspace(0.02, 2.0, 50)
+volatilidades = np.linspace(0.05, 1.0, 20)
+S_malla = precios[:, None, None]
+T_malla = tiempos[None, :, None]
+sigma_malla = volatilidades[None, None, :]
+
+# Todas las griegas de la malla en una sola llamada
+inicio = time.perf_counter()
+tensor = griegas_malla(S_malla, K, T_malla, r, sigma_malla)
+tiempo_tensor = time.perf_counter() - inicio
+
+# Referencia: una llamada por punto (sólo Gamma)
+inicio = time.perf_counter()
+gammas_puntuales = [calcular_gamma(S, K, T, r, sigma) for S in precios for T in tiempos for sigma in volatilidades]
+tiempo_puntual = time.perf_counter() - inicio
+
+print(f"Malla de {tensor['gamma'].size:,} puntos ({' × '.join(map(str, tensor['gamma'].shape))})")
+print(f"Tensor con {len(tensor)} resultados: {tiempo_tensor * 1000:.1f} ms")
+print(f"Gamma punto por punto: {tiempo_puntual:.2f} segundos ({tiempo_puntual / tiempo_tensor:,.0f} veces más lento)")
+print(f"Diferencia máxima en Gamma: {np.abs(tensor['gamma'].ravel() - np.array(gammas_puntuales)).max():.2e}")
+
+# Paridad put-call como control
+paridad = tensor["precio_call"] - tensor["precio_put"] - (S_malla - K * np.exp(-r * T_malla))
+print(f"Error máximo en la paridad put-call: {np.abs(paridad).max():.2e}")
+
+# Griegas de orden superior frente a "bump and reprice": mover S, σ y T y derivar las griegas de primer orden
+inicio = time.perf_counter()
+h_S, h_sigma, h_T = 0.01, 1e-4, 1e-5
+S_arriba, S_abajo = griegas_malla(S_malla + h_S, K, T_malla, r, sigma_malla), griegas_malla(S_malla - h_S, K, T_malla, r, sigma_malla)
+sigma_arriba = griegas_malla(S_malla, K, T_malla, r, sigma_malla + h_sigma)
+sigma_abajo = griegas_malla(S_malla, K, T_malla, r, sigma_malla - h_sigma)
+T_arriba, T_abajo = griegas_malla(S_malla, K, T_malla + h_T, r, sigma_malla), griegas_malla(S_malla, K, T_malla - h_T, r, sigma_malla)
+diferencias = {
+
+    "vanna": (sigma_arriba["delta_call"] - sigma_abajo["delta_call"]) / (2 * h_sigma) / 100,
+    "volga": (sigma_arriba["vega"] - sigma_abajo["vega"]) / (2 * h_sigma) / 100,
+    "charm_call": -(T_arriba["delta_call"] - T_abajo["delta_call"]) / (2 * h_T) / 365,
+    "veta": -(T_arriba["vega"] - T_abajo["vega"]) / (2 * h_T) / 365,
+    "speed": (S_arriba["gamma"] - S_abajo["gamma"]) / (2 * h_S),
+    "color": -(T_arriba["gamma"] - T_abajo["gamma"]) / (2 * h_T) / 365,
+    "zomma": (sigma_arriba["gamma"] - sigma_abajo["gamma"]) / (2 * h_sigma) / 100
+
+    }
+tiempo_bump = time.perf_counter() - inicio
+print(f"\nGriegas de orden superior: una llamada ({tiempo_tensor * 1000:.1f} ms) vs bump and reprice de 6 llamadas "
+      f"({tiempo_bump * 1000:.1f} ms)")
+for griega, aproximada in diferencias.items():
+    escala = np.abs(tensor[griega]).max()
+    print(f"  {griega:<11} Error máximo relativo a su escala: {np.abs(tensor[griega] - aproximada).max() / escala:.2e}")
+
+# Cortes del tensor: índice más cercano a un valor de cada eje
+def indice(eje, valor):
+
+    """
+    Posición del valor más cercano dentro de un eje de la malla.
+    """
+
+    return int(np.abs(eje - valor).argmin())
+
+# Análisis de sensibilidad de Gamma (Volatilidad y Tiempo) a partir del tensor
+plt.figure(figsize=(22, 10), dpi=300)
+for i, sigma in enumerate([0.10, 0.30, 0.60]):
+    plt.subplot(1, 3, i + 1)
+    j_sigma = indice(volatilidades, sigma)
+    for T in [0.05, 0.5, 1.0]:
+        j_T = indice(tiempos, T)
+        plt.plot(precios, tensor["gamma"][:, j_T, j_sigma], label=f"T={tiempos[j_T]:.2f}")
+    plt.axvline(K, color="gray", linestyle="--", label="Precio Strike (K)")
+    plt.title(f"Gamma con Volatilidad = {volatilidades[j_sigma]:.2f}")
+    plt.xlabel("Precio del Subyacente")
+    plt.ylabel("Gamma")
+    plt.grid()
+    plt.legend()
+plt.tight_layout()
+plt.show()
+
+# Superficies (Precio × Vencimiento) con volatilidad fija
+j_sigma = indice(volatilidades, 0.25)
+fig, axs = plt.subplots(1, 3, figsize=(22, 6), dpi=300)
+for ax, griega, titulo in zip(axs, ["delta_call", "vega", "theta_call"], ["Delta Call", "Vega", "Theta Call (por día)"]):
+    malla = ax.pcolormesh(precios, tiempos * 365, tensor[griega][:, :, j_sigma].T, shading="auto", cmap="viridis")
+    ax.axvline(K, color="white", linestyle="--", lw=0.8)
+    ax.set_title(f"{titulo} con Volatilidad = {volatilidades[j_sigma]:.2f}")
+    ax.set_xlabel("Precio del Subyacente")
+    ax.set_ylabel("Días al Vencimiento")
+    fig.colorbar(malla, ax=ax)
+plt.tight_layout()
+plt.show()
+
+# Griegas de orden superior vs Precio del Subyacente (volatilidad fija, varios vencimientos)
+fig, axs = plt.subplots(2, 4, figsize=(22, 10), dpi=300)
+axs = axs.ravel()
+for ax, griega in zip(axs, ["vanna", "volga", "charm_call", "veta", "speed", "color", "zomma"]):
+    for T in [0.05, 0.5, 1.0]:
+        j_T = indice(tiempos, T)
+        ax.plot(precios, tensor[griega][:, j_T, j_sigma], label=f"T={tiempos[j_T]:.2f}")
+    ax.axvline(K, color="gray", linestyle="--")
+    ax.set_title(f"{griega.replace('_', ' ').title()} con Volatilidad = {volatilidades[j_sigma]:.2f}")
+    ax.set_xlabel("Precio del Subyacente")
+    ax.legend()
+    ax.grid()
+axs[-1].axis("off")
+plt.tight_layout()
+plt.show()
+
+# Vega ATM frente a Vencimiento y Volatilidad
+i_atm = indice(precios, K)
+plt.figure(figsize=(22, 6), dpi=300)
+for sigma in [0.10, 0.30, 0.60, 1.0]:
+    j_sigma = indice(volatilidades, sigma)
+    plt.plot(tiempos * 365, tensor["vega"][i_atm, :, j_sigma], label=f"Volatilidad = {volatilidades[j_sigma]:.2f}")
+plt.title("Vega ATM vs Tiempo a Vencimiento")
+plt.xlabel("Días al Vencimiento")
+plt.ylabel("Vega (Cambio por 1% en Volatilidad)")
+plt.legend()
+plt.grid()
+plt.show()
+
+# Recordatorio:
+#   - Calcular d1, d2 y las funciones de la normal una sola vez por punto y reutilizarlas en todas las griegas evita
+#     repetir el trabajo más costoso del modelo.
+#   - Vanna (∂Delta/∂σ) y Volga (∂Vega/∂σ) miden el riesgo de movimientos conjuntos de precio y volatilidad; son los
+#     términos que le faltan a la aproximación Delta-Gamma-Theta-Vega cuando ambos cambian a la vez.
+#   - Con la malla guardada en memoria, cualquier análisis de sensibilidad (otro corte, otro gráfico) es sólo indexar
+#     el tensor.
@@ -0,0 +1,292 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+import pandas as pd
+import numpy as np
+import matplotlib.pyplot as plt
+from scipy.stats import norm
+import time
+
+# Breve explicación
+print("""
+En "01 - Delta" la Delta de la cadena de opciones se agrega con calls.apply(..., axis=1) y después otra vez para los
+puts: una llamada a la función por cada contrato y por cada griega.
+
+Aquí una sola función recibe la cadena completa (un option_chain de yfinance o el DataFrame de varios vencimientos
+de cargar_opciones) y agrega todas las griegas por columnas:
+
+    - El vencimiento y el tipo (call/put) salen del contractSymbol (formato OCC: SPY250718C00600000).
+    - d1, d2 y las funciones de la normal se calculan una sola vez para todos los contratos.
+    - Calls y Puts se resuelven en la misma pasada, eligiendo la fórmula de cada fila con np.where.
+    - Las griegas de orden superior (Vanna, Volga, Charm, Veta, Speed, Color y Zomma) salen de la misma evaluación.
+""")
+
+# Definir función que calcula todas las griegas sobre arreglos
+def griegas_malla(S, K, T, r, sigma, q=0):
+
+    """
+    Calcula precio, Delta, Gamma, Theta, Vega y Rho de Calls y Puts europeas, y las griegas de segundo y tercer orden
+    (Vanna, Volga, Charm, Veta, Speed, Color y Zomma). Los parámetros pueden ser números o arreglos de cualquier forma
+    compatible (broadcasting); el resultado es un diccionario de arreglos N-D. Las unidades siguen a las griegas de
+    primer orden: por día de paso del tiempo y por cambio del 1% en volatilidad o tasa.
+    """
+
+    # Intermedios compartidos
+    S, K, T, r, sigma, q = np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in (S, K, T, r, sigma, q)])
+    raiz_T = np.sqrt(T)
+    sigma_raiz_T = sigma * raiz_T
+    d1 = (np.log(S / K) + (r - q + 0.5 * sigma ** 2) * T) / sigma_raiz_T
+    d2 = d1 - sigma_raiz_T
+    descuento_r = np.exp(-r * T)
+    descuento_q = np.exp(-q * T)
+    N_d1 = norm.cdf(d1)
+    N_d2 = norm.cdf(d2)
+    n_d1 = norm.pdf(d1)
+
+    # Griegas
+    termino_tiempo = -S * descuento_q * n_d1 * sigma / (2 * raiz_T)
+    gamma = descuento_q * n_d1 / (S * sigma_raiz_T)
+    vega = S * descuento_q * n_d1 * raiz_T
+    termino_charm = descuento_q * n_d1 * (2 * (r - q) * T - d2 * sigma_raiz_T) / (2 * T * sigma_raiz_T)
+    griegas = {
+
+        "precio_call": S * descuento_q * N_d1 - K * descuento_r * N_d2,
+        "precio_put": K * descuento_r * (1 - N_d2) - S * descuento_q * (1 - N_d1),
+        "delta_call": descuento_q * N_d1,
+        "delta_put": descuento_q * (N_d1 - 1),
+        "gamma": gamma,
+        "theta_call": (termino_tiempo - r * K * descuento_r * N_d2 + q * S * descuento_q * N_d1) / 365,
+        "theta_put": (termino_tiempo + r * K * descuento_r * (1 - N_d2) - q * S * descuento_q * (1 - N_d1)) / 365,
+        "vega": vega / 100,
+        "rho_call": K * T * descuento_r * N_d2 / 100,
+        "rho_put": -K * T * descuento_r * (1 - N_d2) / 100,
+
+        # Segundo orden: ∂Delta/∂σ, ∂Vega/∂σ, ∂Delta/∂t y ∂Vega/∂t
+        "vanna": -descuento_q * n_d1 * d2 / sigma / 100,
+        "volga": vega * d1 * d2 / sigma / 100 ** 2,
+        "charm_call": (q * descuento_q * N_d1 - termino_charm) / 365,
+        "charm_put": (-q * descuento_q * (1 - N_d1) - termino_charm) / 365,
+        "veta": vega * (q + (r - q) * d1 / sigma_raiz_T - (1 + d1 * d2) / (2 * T)) / (100 * 365),
+
+        # Tercer orden: ∂Gamma/∂S, ∂Gamma/∂t y ∂Gamma/∂σ
+        "speed": -gamma / S * (d1 / sigma_raiz_T + 1),
+        "color": gamma / (2 * T) * (2 * q * T + 1 + (2 * (r - q) * T - d2 * sigma_raiz_T) * d1 / sigma_raiz_T) / 365,
+        "zomma": gamma * (d1 * d2 - 1) / sigma / 100
+
+        }
+
+    return griegas
+
+# Definir función para agregar las griegas a una cadena de opciones
+def agregar_griegas(cadena, S, r=0.05, q=0, fecha_valoracion=None):
+
+    """
+    Agrega Valor Teórico, Delta, Gamma, Theta, Vega y Rho, y las griegas de orden superior (Vanna, Volga, Charm, Veta,
+    Speed, Color y Zomma) a cada contrato de la cadena usando su volatilidad implícita. r y q pueden ser números o
+    arreglos con la tasa y el dividendo de cada contrato. Los contratos sin volatilidad o ya vencidos quedan con NaN.
+    """
+
+    # Vencimiento y tipo desde el contractSymbol: raíz + AAMMDD + C/P + strike × 1000
+    simbolo = cadena["contractSymbol"].str.extract(r"(\d{6})([CP])\d{8}$")
+    vencimiento = pd.to_datetime(simbolo[0], format="%y%m%d")
+    es_call = (simbolo[1] == "C").values
+    fecha_valoracion = pd.Timestamp.now().normalize() if fecha_valoracion is None else pd.Timestamp(fecha_valoracion)
+    T = ((vencimiento - fecha_valoracion).dt.days.values + 1) / 365
+
+    # Una sola evaluación para toda la cadena
+    sigma = cadena["impliedVolatility"].values.astype(float)
+    validos = (T > 0) & (sigma > 0)
+    with np.errstate(all="ignore"):
+        griegas = griegas_malla(S, cadena["strike"].values, np.where(validos, T, np.nan), r, np.where(validos, sigma, np.nan), q)
+
+    # Elegir la fórmula de Call o Put en cada fila
+    resultado = cadena.copy()
+    resultado["T"] = T
+    resultado["Valor Teórico"] = np.where(es_call, griegas["precio_call"], griegas["precio_put"])
+    resultado["Delta"] = np.where(es_call, griegas["delta_call"], griegas["delta_put"])
+    resultado["Gamma"] = griegas["gamma"]
+    resultado["Theta"] = np.where(es_call, griegas["theta_call"], griegas["theta_put"])
+    resultado["Vega"] = griegas["vega"]
+    resultado["Rho"] = np.where(es_call, griegas["rho_call"], griegas["rho_put"])
+    resultado["Vanna"] = griegas["vanna"]
+    resultado["Volga"] = griegas["volga"]
+    resultado["Charm"] = np.where(es_call, griegas["charm_call"], griegas["charm_put"])
+    for griega in ["veta", "speed", "color", "zomma"]:
+        resultado[griega.capitalize()] = griegas[griega]
+
+    return resultado
+
+# Tasa y dividendo implícitos por vencimiento ("02 - Modelado Matemático de Opciones/08 - Forward, Tasa y Dividendo
+# Implícitos"): la regresión de C - P contra K de cada vencimiento da su factor de descuento y su forward
+def regresion_paridad(cadena, ventana=0.4, iteraciones=3, umbral=4.0, dias_minimos=30, min_strikes=20,
+                      tasa_maxima=0.20, tasa_respaldo=0.05):
+
+    """
+    Regresión de C - P contra K para cada vencimiento de la cadena (columnas Expiration, T, strike, Type, bid y
+    ask). Usa los strikes entre (1 - ventana)·F y F, donde el put americano está fuera del dinero y su prima de
+    ejercicio anticipado es despreciable, y descarta los residuos atípicos en cada iteración. Devuelve, por
+    vencimiento, el factor de descuento y el forward implícitos.
+
+    La pendiente sólo es fiable con suficiente plazo y strikes: en los vencimientos cortos DF ≈ 1 y el error del
+    precio puede dar DF > 1 (tasas negativas). Los vencimientos con menos de 'dias_minimos', menos de
+    'min_strikes', DF fuera de (0, 1] o |r| > 'tasa_maxima' toman la tasa interpolada de los fiables ('tasa_respaldo'
+    si no hay ninguno), y su forward se recalcula con ese descuento como la mediana de K + (C - P)/DF.
+    """
+
+    # Alinear calls y puts con cotización en ambas puntas
+    cotizados = cadena[(cadena["bid"] > 0) & (cadena["ask"] > cadena["bid"])].copy()
+    cotizados["mid"] = (cotizados["bid"] + cotizados["ask"]) / 2
+    pares = cotizados.pivot_table(values="mid", index=["Expiration", "strike"], columns="Type").dropna().reset_index()
+    pares["T"] = pares["Expiration"].map(cadena.groupby("Expiration")["T"].first())
+    pares["y"] = pares["call"] - pares["put"]
+
+    # Forward inicial (DF ≈ 1) para ubicar la ventana de strikes
+    forward = pares.groupby("Expiration").apply(lambda x: np.median(x["strike"] + x["y"]), include_groups=False)
+    usar = np.ones(len(pares), dtype=bool)
+
+    for _ in range(iteraciones):
+        moneyness = (pares["strike"] / pares["Expiration"].map(forward)).values
+        usar &= (moneyness > 1 - ventana) & (moneyness <= 1)
+
+        # Mínimos cuadrados por vencimiento con sumas por grupo (todos los vencimientos a la vez)
+        w = usar.astype(float)
+        sumas = pd.DataFrame({"Expiration": pares["Expiration"], "w": w, "wx": w * pares["strike"], "wy": w * pares["y"],
+                              "wxx": w * pares["strike"] ** 2, "wxy": w * pares["strike"] * pares["y"]}
+                             ).groupby("Expiration").sum()
+        media_x = sumas["wx"] / sumas["w"]
+        media_y = sumas["wy"] / sumas["w"]
+        pendiente = (sumas["wxy"] / sumas["w"] - media_x * media_y) / (sumas["wxx"] / sumas["w"] - media_x ** 2)
+        ordenada = media_y - pendiente * media_x
+        forward = -ordenada / pendiente
+
+        # Descartar residuos atípicos (más de 'umbral' desviaciones absolutas medianas)
+        residuo = pares["y"] - pares["Expiration"].map(ordenada) - pares["Expiration"].map(pendiente) * pares["strike"]
+        escala = residuo.where(usar).abs().groupby(pares["Expiration"]).transform("median") * 1.4826
+        usar &= (residuo.abs() <= umbral * np.maximum(escala, 1e-4)).values
+
+    # Marcar los vencimientos con una pendiente fiable
+    curva = pd.DataFrame({"T": pares.groupby("Expiration")["T"].first(), "Descuento": -pendiente,
+                          "Forward": forward, "Strikes": sumas["w"].astype(int)})
+    tasa = -np.log(curva["Descuento"].where(curva["Descuento"] > 0)) / curva["T"]
+    curva["Fiable"] = ((curva["T"] >= dias_minimos / 365) & (curva["Strikes"] >= min_strikes) &
+                       (curva["Descuento"] <= 1) & (tasa.abs() <= tasa_maxima))
+
+    # Sustituir la tasa de los no fiables (interpolada en T, constante fuera del rango) y recalcular su forward
+    fiables = curva[curva["Fiable"]].sort_values("T")
+    if len(fiables):
+        tasa_sustituta = np.interp(curva["T"], fiables["T"], tasa[fiables.index])
+    else:
+        tasa_sustituta = np.full(len(curva), tasa_respaldo)
+    curva["Descuento"] = np.where(curva["Fiable"], curva["Descuento"], np.exp(-tasa_sustituta * curva["T"]))
+    forward_fijo = (pares["strike"] + pares["y"] / pares["Expiration"].map(curva["Descuento"])).where(usar)
+    curva["Forward"] = curva["Forward"].where(curva["Fiable"], forward_fijo.groupby(pares["Expiration"]).median())
+
+    return curva
+
+def tasa_dividendo_implicitos(curva, spot=None):
+
+    """
+    Convierte el factor de descuento y el forward de cada vencimiento en tasa libre de riesgo y rendimiento por
+    dividendo (continuos). Si no se da el spot, se usa el forward del vencimiento más cercano.
+    """
+
+    curva = curva.sort_values("T").copy()
+    spot = curva["Forward"].iloc[0] if spot is None else spot
+    curva["Tasa"] = -np.log(curva["Descuento"]) / curva["T"]
+    curva["Dividendo"] = curva["Tasa"] - np.log(curva["Forward"] / spot) / curva["T"]
+
+    return curva, spot
+
+# Función puntual de "01 - Delta" (referencia)
+def black_scholes_delta(S, K, T, r, sigma, q=0, tipo="call"):
+
+    """
+    Calcula la delta de una opción utilizando el modelo de BSM.
+    """
+
+    # Calcular Delta
+    d1 = (np.log(S / K) + (r - q + 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
+
+    if tipo == "call":
+        return norm.cdf(d1)
+    elif tipo == "put":
+        return norm.cdf(d1) - 1
+    else:
+        raise ValueError("El tipo debe ser 'call' o 'put'")
+
+# Cadena de SPY con todos los vencimientos (mismo formato que cargar_opciones)
+opciones_mercado = pd.read_csv("../datos/opciones.csv", index_col=0)
+fecha_datos = pd.to_datetime(opciones_mercado["lastTradeDate"]).max().tz_localize(None).normalize()
+opciones_mercado["mid"] = (opciones_mercado["bid"] + opciones_mercado["ask"]) / 2
+opciones_mercado["T"] = ((pd.to_datetime(opciones_mercado["Expiration"]) - fecha_datos).dt.days + 1) / 365
+
+# Precio del subyacente, tasa y dividendo implícitos en la paridad put-call de cada vencimiento
+curva, precio_spot = tasa_dividendo_implicitos(regresion_paridad(opciones_mercado))
+opciones_mercado["Tasa"] = opciones_mercado["Expiration"].map(curva["Tasa"])
+opciones_mercado["Dividendo"] = opciones_mercado["Expiration"].map(curva["Dividendo"])
+print(f"Precio del subyacente (paridad put-call): {precio_spot:.2f} | Tasa Mediana: {curva['Tasa'].median():.4f} | "
+      f"Dividendo Mediano: {curva['Dividendo'].median():.4f}")
+
+# Agregar las griegas a toda la cadena
+inicio = time.perf_counter()
+cadena_griegas = agregar_griegas(opciones_mercado, precio_spot, r=opciones_mercado["Tasa"].values,
+                                 q=opciones_mercado["Dividendo"].values, fecha_valoracion=fecha_datos)
+tiempo_columnar = time.perf_counter() - inicio
+print(f"\nGriegas de {len(cadena_griegas):,} contratos ({cadena_griegas['Expiration'].nunique()} vencimientos) "
+      f"en {tiempo_columnar * 1000:.1f} ms")
+
+# Cadena de 10,000 contratos frente a .apply (sólo Delta, como en "01 - Delta")
+cadena_grande = pd.concat([opciones_mercado] * 2, ignore_index=True).iloc[:10000]
+inicio = time.perf_counter()
+cadena_grande = agregar_griegas(cadena_grande, precio_spot, r=cadena_grande["Tasa"].values,
+                                q=cadena_grande["Dividendo"].values, fecha_valoracion=fecha_datos)
+tiempo_columnar = time.perf_counter() - inicio
+inicio = time.perf_counter()
+deltas_apply = cadena_grande.apply(lambda x: black_scholes_delta(S=precio_spot, K=x["strike"], T=x["T"], r=x["Tasa"],
+                                                                 sigma=x["impliedVolatility"], q=x["Dividendo"],
+                                                                 tipo=x["Type"]), axis=1)
+tiempo_apply = time.perf_counter() - inicio
+print(f"10,000 contratos: todas las griegas en {tiempo_columnar * 1000:.1f} ms | Delta con .apply en {tiempo_apply * 1000:.0f} ms")
+
+# Validación contra la función puntual (la de "01 - Delta" omite el factor exp(-qT) de la Delta con dividendos)
+deltas_apply = deltas_apply * np.exp(-cadena_grande["Dividendo"] * cadena_grande["T"])
+print(f"Diferencia máxima en Delta: {np.nanmax(np.abs(cadena_grande['Delta'] - deltas_apply)):.2e}")
+
+# Resumen de un vencimiento
+fecha_objetivo = sorted(cadena_griegas["Expiration"].unique())[15]
+vencimiento = cadena_griegas[cadena_griegas["Expiration"] == fecha_objetivo]
+cercanos_spot = vencimiento[(vencimiento["strike"] - precio_spot).abs() <= 3]
+print(f"\nGriegas cerca del dinero con vencimiento en {fecha_objetivo}:")
+print(cercanos_spot[["contractSymbol", "strike", "Type", "mid", "Valor Teórico", "Delta", "Gamma", "Theta", "Vega",
+                     "Rho"]].round(4).to_string(index=False))
+print("\nGriegas de orden superior:")
+print(cercanos_spot[["contractSymbol", "Vanna", "Volga", "Charm", "Veta", "Speed", "Color", "Zomma"]].round(6).to_string(index=False))
+
+# Graficar las griegas contra el strike
+griegas = ["Delta", "Gamma", "Theta", "Vega", "Rho"]
+colores = {
+
+    "call": "#2a9d8f",
+    "put": "#e76f51"
+
+    }
+fig, axs = plt.subplots(nrows=3, ncols=2, figsize=(22, 12), dpi=300)
+axs = axs.ravel()
+for i, griega in enumerate(griegas):
+    for tipo in ["call", "put"]:
+        datos = vencimiento[vencimiento["Type"] == tipo]
+        axs[i].plot(datos["strike"], datos[griega], label=f"{tipo.capitalize()} {griega}", color=colores[tipo], lw=2)
+    axs[i].axvline(precio_spot, color="gray", linestyle="--")
+    axs[i].set_title(f"{griega} vs Strike ({fecha_objetivo})", fontsize=12, fontweight="bold")
+    axs[i].set_xlabel("Precio Strike")
+    axs[i].set_ylabel(griega)
+    axs[i].legend()
+    axs[i].grid(True, linestyle="--", alpha=0.5)
+axs[-1].axis("off")
+plt.tight_layout()
+plt.show()
+
+# Recordatorio:
+#   - Con las griegas calculadas por columnas, agregar una griega más o un vencimiento más no cambia el número de
+#     llamadas: siempre es una sola evaluación para toda la cadena.
+#   - Las griegas usan la volatilidad implícita de cada contrato; en contratos ilíquidos (bid = 0, poca operación) esa
+#     volatilidad puede no ser confiable y conviene filtrarlos antes de agregar el riesgo.
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+# Importar librerías
+import numpy as np
+import pandas as pd
+from scipy.stats import norm, poisson
+from scipy.special import gammaln
+import time
+
+# El Implied Move del script "02 - Earnings con Opciones" resume lo que el mercado descuenta para el reporte,
+# pero el Modelo BSM sólo tiene una volatilidad constante. El Modelo de Merton añade saltos lognormales que llegan
+# según un proceso de Poisson, y su precio es una suma de precios BSM ponderada por la probabilidad de n saltos:
+#
+#   V = Σ_n  P(N_T = n) · BSM(S, K, T, r_n, σ_n)
+#
+#   con  σ_n² = σ² + n·δ² / T   y   r_n = r - λ·k + n·ln(1 + k) / T,   k = exp(μ_J + δ²/2) - 1
+
+# Función BSM vectorizada
+def precio_bsm(S, K, T, r, sigma, q=0, tipo="call"):
+
+    """
+    Calcula el precio de opciones europeas con el Modelo de BSM (acepta arreglos que se puedan transmitir).
+    """
+
+    # Obtener d1 y d2
+    d1 = (np.log(S / K) + (r - q + 0.5 * sigma ** 2) * T) / (sigma * np.sqrt(T))
+    d2 = d1 - sigma * np.sqrt(T)
+
+    # Calcular la Prima
+    if tipo == "call":
+        return S * np.exp(-q * T) * norm.cdf(d1) - K * np.exp(-r * T) * norm.cdf(d2)
+    elif tipo == "put":
+        return K * np.exp(-r * T) * norm.cdf(-d2) - S * np.exp(-q * T) * norm.cdf(-d1)
+    else:
+        raise ValueError("Tipo de Opción no válido. Usar 'call' o 'put'.")
+
+def precio_merton(S, K, T, r, sigma, lam, mu_j, delta_j, q=0, tipo="call", tolerancia=1e-10):
+
+    """
+    Precio de opciones europeas con el Modelo de Saltos de Merton. Todos los contratos se evalúan a la vez como
+    un arreglo (contratos × términos de la serie), truncando la serie cuando la masa de Poisson restante es
+    menor a la tolerancia.
+    """
+
+    # Transmitir los parámetros a una forma común y agregar el eje de la serie (n saltos)
+    S, K, T, r, sigma, lam, mu_j, delta_j, q = np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in
+                                                                  (S, K, T, r, sigma, lam, mu_j, delta_j, q)])
+    k = np.exp(mu_j + 0.5 * delta_j ** 2) - 1
+    lam_T = lam * (1 + k) * T
+
+    # Truncamiento adaptativo por contrato: cada uno usa sólo los términos que necesita su intensidad (los contratos
+    # con parámetros inválidos quedan en NaN)
+    validos = np.isfinite(lam_T) & (lam_T >= 0)
+    intensidades, posicion = np.unique(np.where(validos, lam_T, 0), return_inverse=True)
+    n_contrato = poisson.ppf(1 - tolerancia, intensidades).astype(int)[posicion].reshape(lam_T.shape) + 1
+    n_max = int(np.max(n_contrato)) if n_contrato.size else 0
+    n = np.arange(n_max + 1)
+
+    # Expandir a (..., n) para evaluar toda la serie en una sola operación
+    e = lambda x: x[..., None]
+    terminos = n <= e(n_contrato)
+    pesos = np.exp(-e(lam_T) + n * np.log(np.maximum(e(lam_T), 1e-300)) - gammaln(n + 1))
+    sigma_n = np.sqrt(e(sigma) ** 2 + n * e(delta_j) ** 2 / e(T))
+    r_n = e(r) - e(lam) * e(k) + n * np.log1p(e(k)) / e(T)
+
+    # Con intensidades muy distintas entre contratos, evaluar BSM sólo en los términos que cada uno necesita
+    if terminos.size and terminos.mean() < 0.5:
+        precios_n = np.zeros(terminos.shape)
+        argumentos = [np.broadcast_to(x, terminos.shape)[terminos] for x in (e(S), e(K), e(T), r_n, sigma_n, e(q))]
+        precios_n[terminos] = precio_bsm(*argumentos, tipo)
+    else:
+        precios_n = precio_bsm(e(S), e(K), e(T), r_n, sigma_n, e(q), tipo)
+
+    return np.where(validos, np.sum(np.where(terminos, pesos * precios_n, 0), axis=-1), np.nan)
+
+# Validar: sin saltos, Merton coincide con BSM
+S = 100
+K = np.linspace(70, 130, 61)
+T = 30 / 365
+r = 0.05
+sigma = 0.25
+
+sin_saltos = precio_merton(S, K, T, r, sigma, lam=0, mu_j=0, delta_j=0.1)
+print(f"Diferencia Máxima Merton (λ=0) vs BSM: {np.abs(sin_saltos - precio_bsm(S, K, T, r, sigma)).max():.2e}")
+
+# Comparar un call ATM con y sin salto (un salto esperado de ±8% de desviación estándar)
+con_salto = precio_merton(S, K, T, r, sigma, lam=365 / 30, mu_j=-0.5 * 0.08 ** 2, delta_j=0.08)
+print(f"Call ATM BSM: {precio_bsm(S, 100, T, r, sigma):.4f} | Call ATM Merton: {con_salto[K == 100][0]:.4f}")
+
+# ================================================
+#  Calibración del Salto a partir del Implied Move
+# ================================================
+
+def straddle_merton(S, T, r, sigma, lam, delta_j, q=0):
+
+    """
+    Precio del straddle ATM (strike = S) bajo Merton con saltos de media compensada (μ_J = -δ²/2).
+    """
+
+    mu_j = -0.5 * delta_j ** 2
+    call = precio_merton(S, S, T, r, sigma, lam, mu_j, delta_j, q, tipo="call")
+    put = precio_merton(S, S, T, r, sigma, lam, mu_j, delta_j, q, tipo="put")
+
+    return call + put
+
+def calibrar_salto_earnings(S, implied_move, T, r, sigma_base, saltos_esperados=1.0, iteraciones=50):
+
+    """
+    Encuentra, para todos los activos a la vez, la desviación del salto (δ) que reproduce el Implied Move
+    (straddle ATM en dólares) sobre la volatilidad difusiva base. Usa bisección vectorizada, pues el
+    straddle es creciente en δ.
+    """
+
+    # Intensidad que genera el número esperado de saltos hasta el vencimiento
+    S, implied_move, T, sigma_base = [np.asarray(x, dtype=float) for x in (S, implied_move, T, sigma_base)]
+    lam = saltos_esperados / T
+
+    # Si el straddle sin salto ya supera al Implied Move, el mercado no descuenta salto (δ = 0)
+    straddle_base = straddle_merton(S, T, r, sigma_base, lam, np.full_like(S, 1e-8))
+    sin_salto = straddle_base >= implied_move
+
+    # Bisección sobre δ ∈ [0, 1] para todos los activos en cada iteración
+    bajo = np.zeros_like(S)
+    alto = np.ones_like(S)
+    for _ in range(iteraciones):
+        medio = 0.5 * (bajo + alto)
+        exceso = straddle_merton(S, T, r, sigma_base, lam, medio) > implied_move
+        alto = np.where(exceso, medio, alto)
+        bajo = np.where(exceso, bajo, medio)
+
+    return np.where(sin_salto, 0.0, 0.5 * (bajo + alto)), lam
+
+# Tabla de Implied Moves (mismas columnas que el script de Earnings, aquí simulada para 100 emisoras)
+np.random.seed(42)
+num_activos = 100
+candidatos = pd.DataFrame({
+
+    "Price": np.random.uniform(20, 500, num_activos),
+    "IM Porcentaje": np.random.uniform(3, 15, num_activos),          # Straddle ATM como % del precio
+    "Vol Base": np.random.uniform(0.20, 0.45, num_activos),          # Volatilidad sin evento (p. ej. vencimiento posterior)
+    "Dias Vencimiento": np.random.randint(3, 15, num_activos)
+
+    }, index=[f"TICKER_{i:03d}" for i in range(num_activos)])
+candidatos["IM Unidades"] = candidatos["Price"] * candidatos["IM Porcentaje"] / 100
+tiempos = candidatos["Dias Vencimiento"].values / 365
+
+# Calibrar el tamaño del salto para todos los activos a la vez
+inicio = time.perf_counter()
+delta_salto, lam_salto = calibrar_salto_earnings(candidatos["Price"].values, candidatos["IM Unidades"].values,
+                                                 tiempos, r, candidatos["Vol Base"].values)
+candidatos["Salto (δ)"] = delta_salto
+print(f"\nCalibración de {num_activos} saltos: {(time.perf_counter() - inicio) * 1000:.1f} ms")
+print(candidatos[["Price", "IM Porcentaje", "Vol Base", "Dias Vencimiento", "Salto (δ)"]].head())
+
+# Valorar la cadena del evento de todas las emisoras (100 activos × 41 strikes) en una sola llamada
+moneyness = np.linspace(0.8, 1.2, 41)
+strikes = candidatos["Price"].values[:, None] * moneyness[None, :]
+inicio = time.perf_counter()
+calls_evento = precio_merton(candidatos["Price"].values[:, None], strikes, tiempos[:, None], r,
+                             candidatos["Vol Base"].values[:, None], lam_salto[:, None],
+                             -0.5 * delta_salto[:, None] ** 2, delta_salto[:, None], tipo="call")
+print(f"\nCadena del Evento: {calls_evento.size} contratos valorados en {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+# Verificar que el straddle ATM calibrado reproduce el Implied Move (en los activos con salto)
+straddle_calibrado = straddle_merton(candidatos["Price"].values, tiempos, r, candidatos["Vol Base"].values,
+                                     lam_salto, delta_salto)
+activos_con_salto = delta_salto > 0
+error_im = np.abs(straddle_calibrado - candidatos["IM Unidades"].values)[activos_con_salto]
+print(f"Activos con salto descontado: {activos_con_salto.sum()} | Error Máximo del Implied Move: {error_im.max():.2e} USD")
+
+# Recordatorio:
+#   - El Modelo de Merton agrega saltos al Movimiento Browniano Geométrico. Para eventos como earnings, el tamaño del salto
+#     (δ) explica la parte del Implied Move que la volatilidad difusiva normal no alcanza a cubrir.
+#   - Después del anuncio, el salto desaparece del precio de la opción: esa es la fuente del IV Crush que aprovechan
+#     las estrategias vendedoras de volatilidad.